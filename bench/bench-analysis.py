@@ -0,0 +1,72 @@
+# Offline telemetry analysis throughput: a month of 1 Hz samples, load + analyze.
+# Run: python bench/bench-analysis.py [days]
+# The synthetic recording has 2 fans (GPU, CPU) with one sensor each, occasional fail-safe trips
+# and app-not-running gaps, and is written in the same format as TelemetryRecorder.
+# Load + analyze is timed best of ROUNDS (the first round also pays for the page cache and imports); fails if
+# it takes longer than TARGET_SEC per 30 days of samples ("well under a second", with margin for slower hosts).
+
+import os, sys, json, time, struct, tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import numpy as np
+from Backend.TelemetryRecorder import MAGIC, VERSION, FILE_EXT, FLAG_FAILSAFE_TRIPPED
+from Backend.TelemetryAnalysis import recordDtype, loadRecordings, analyze
+
+MODES = ['Balanced', 'G_Mode', 'Custom']
+TARGET_SEC = 0.8 # Per 30 days
+ROUNDS = 5
+
+def makeRecording(path: str, days: float, seed: int = 1) -> int:
+    rng = np.random.default_rng(seed)
+    header = {
+        'version': VERSION, 'host': 'bench', 'modes': MODES,
+        'fans': [ { 'name': 'GPU', 'sensorIds': [2], 'failsafeTemp': 85 }, { 'name': 'CPU', 'sensorIds': [1], 'failsafeTemp': 95 } ],
+        'sensorCount': 2,
+    }
+    n = int(days * 86400)
+    rec = np.zeros(n, dtype=recordDtype(header))
+    ts = 1.7e9 + np.arange(n, dtype=np.float64)
+    ts[n // 3:] += 3600 # A gap: the app was not running for an hour
+    rec['ts'] = ts
+    rec['mode'] = np.repeat(rng.integers(0, len(MODES), n // 600 + 1), 600)[:n]
+    load = np.repeat(rng.random(n // 60 + 1), 60)[:n]
+    rec['temps'][:, 0] = 40 + load * 50 + rng.normal(0, 2, n)
+    rec['temps'][:, 1] = 45 + load * 55 + rng.normal(0, 2, n)
+    rec['temps'][rng.random(n) < 1e-4, 1] = -1 # Read failures
+    rec['rpms'] = np.clip(rec['temps'] * 60 - 2000, 0, 5500)
+    rec['flags'] = np.where(rec['temps'][:, 1] >= 98, FLAG_FAILSAFE_TRIPPED, 0)
+    text = json.dumps(header).encode('utf-8')
+    with open(path, 'wb') as f:
+        f.write(MAGIC + struct.pack('<I', len(text)) + text)
+        rec.tofile(f)
+    return n
+
+def main() -> int:
+    days = float(sys.argv[1]) if len(sys.argv) > 1 else 30
+    with tempfile.TemporaryDirectory() as tmp:
+        n = makeRecording(os.path.join(tmp, 'telemetry-bench' + FILE_EXT), days)
+        size = os.path.getsize(os.path.join(tmp, 'telemetry-bench' + FILE_EXT))
+        best = None # (total, load, analyze)
+        for _ in range(ROUNDS):
+            t0 = time.perf_counter()
+            groups = loadRecordings([tmp])
+            t1 = time.perf_counter()
+            reports = [ analyze(h, r, th) for h, r, th in groups ]
+            t2 = time.perf_counter()
+            if best is None or t2 - t0 < best[0]:
+                best = (t2 - t0, t1 - t0, t2 - t1)
+            del groups
+    rep = reports[0]
+    total, load, analyzeSec = best
+    print(f'{n} samples ({days:g} days, {size / 2**20:.1f} MiB), best of {ROUNDS}')
+    print(f'load {load * 1000:7.1f} ms')
+    print(f'analyze {analyzeSec * 1000:4.1f} ms')
+    print(f'total {total * 1000:6.1f} ms, {n / total / 1e6:.1f} M samples/s')
+    print(f"duration {rep['durationSec'] / 86400:.2f} days, fail-safe trips {rep['failsafeTrips']}, CPU above fail-safe {rep['fans'][1]['timeAboveFailsafeFraction']:.4f}")
+    target = TARGET_SEC * days / 30
+    ok = total <= target
+    print(f'{"OK" if ok else "FAILED"}: target {target * 1000:.0f} ms')
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
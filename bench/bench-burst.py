@@ -0,0 +1,119 @@
+# Burst capture around a fail-safe event, against the AWCC emulator in real time.
+# Run: python bench/bench-burst.py [--post-sec=5]
+# The app runs offscreen in the Custom mode with the CPU fail-safe threshold lowered to 60°C; after a few
+# seconds of idle the CPU gets a heavy load for 20 s, which G-mode cannot hold under the threshold. Checks:
+#   - sampling is at the normal rate before the trip is imminent, at the burst rate during the capture and back
+#     at the normal rate after it,
+#   - the saved capture has the pre-trigger samples, the imminent trigger, the trip, the switch to G-mode and the
+#     fan writes, and is summarized by tcc-analyze,
+#   - the per-sample cost of the idle ring buffer.
+
+import os, sys, time, argparse, tempfile
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+from benchutil import check, isolateSettings, makeApp
+
+from PySide6 import QtCore, QtWidgets
+from Backend.AWCCEmulator import makeEmulatedThermal
+from Backend.BurstCapture import BurstCapture
+from Backend.TelemetryAnalysis import loadBursts, summarizeBurst
+from Backend.ThermalBackend import ThermalBackend
+from GUI.AppGUI import TCC_GUI
+
+IDLE_SEC = 5
+LOAD_SEC = 20
+IDLE_W, LOAD_W = 5.0, 100.0
+THRESHOLD = 60
+
+def idleAddCost(samples: int = 20000) -> float:
+    # us per sample while not capturing (1 Hz samples, ring buffer of BURST_PRE_TRIGGER_SEC)
+    with tempfile.TemporaryDirectory() as tmp:
+        capture = BurstCapture(tmp, [ 'Balanced', 'G_Mode', 'Custom' ], TCC_GUI.BURST_PRE_TRIGGER_SEC)
+        capture.setTopology([ { 'name': 'CPU', 'sensorIds': [1], 'failsafeTemp': 95 }, { 'name': 'GPU', 'sensorIds': [2], 'failsafeTemp': 85 } ])
+        t0 = time.perf_counter()
+        for k in range(samples):
+            capture.add(float(k), 'Balanced', False, [ 50, 45 ], [ 1200, 1100 ])
+        return (time.perf_counter() - t0) / samples * 1e6
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Burst capture around a fail-safe event")
+    parser.add_argument("--post-sec", type=float, default=5, help="Capture length after the last trigger")
+    args = parser.parse_args()
+
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    app.setQuitOnLastWindowClosed(False)
+    ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        isolateSettings(tmp)
+        TCC_GUI.FAILSAFE_TRIGGER_DELAY_SEC = 3
+        start = time.monotonic()
+        power = lambda idx, t: LOAD_W if idx == ThermalBackend.CPUFanIdx and IDLE_SEC <= t - start < IDLE_SEC + LOAD_SEC else IDLE_W
+        thermal, _ = makeEmulatedThermal(2, 1, power= power)
+        captureDir = os.path.join(tmp, 'bursts')
+        tcc = makeApp(thermal, tmp, burstCaptureDir= captureDir, burstPostTriggerSec= args.post_sec)
+        tcc.setFailsafeTemp(ThermalBackend.CPUFanIdx, THRESHOLD)
+        tcc.setFanSpeed(ThermalBackend.CPUFanIdx, 30)
+        tcc.setMode('Custom')
+
+        # Sample times and sampling periods, seen by the evaluate stage
+        evaluate = tcc._pipeline.stages[0]
+        samples = []
+        fn = evaluate._fn
+        evaluate._fn = lambda sample: (samples.append((sample.monotonic - start, tcc._updateGaugesTask.getPeriod())), fn(sample))[1]
+
+        savedAt = []
+        loop = QtCore.QEventLoop()
+        def poll():
+            if tcc._burstCapture.isCapturing() or not os.path.isdir(captureDir) or not os.listdir(captureDir):
+                return
+            if not savedAt:
+                savedAt.append(time.monotonic() - start)
+                QtCore.QTimer.singleShot(4000, loop.quit) # Some samples after the capture
+        watch = QtCore.QTimer()
+        watch.timeout.connect(poll)
+        watch.start(50)
+        QtCore.QTimer.singleShot(90000, loop.quit)
+        loop.exec()
+        watch.stop()
+        tcc._destroy()
+
+        if not check('capture saved', bool(savedAt)):
+            return 1
+        bursts = loadBursts([ captureDir ])
+        ok &= check('one capture file', len(bursts) == 1)
+        path, header, rec = bursts[0]
+        summary = summarizeBurst(header, rec)
+        trigger = summary['trigger']['ts']
+        print(f"{os.path.basename(path)}: {os.path.getsize(path)} bytes, {summary['samples']} samples, "
+              f"{summary['from']:.1f}..{summary['to']:.1f} s around the trigger ({summary['trigger']['reason']}), trip at {summary['tripAt']} s")
+        print(f"  sample interval: pre-trigger {summary['sampleIntervalSec']['preTrigger']} s, post-trigger {summary['sampleIntervalSec']['postTrigger']} s")
+        print(f"  mode transitions {summary['modeTransitions']}")
+        print(f"  fan writes {summary['fanWrites']}")
+        print(f"  triggers {summary['triggers']}")
+        for fan in summary['fans']:
+            print(f"  {fan['name']}: {fan['tempAtTrigger']}°C at the trigger, max {fan['tempMax']}°C at {fan['tempMaxAt']} s, {fan['rpmMax']} RPM max")
+
+        # Sampling period, relative to the capture (app clock: the trigger is at a wall clock time)
+        wallToMono = trigger - (time.time() - time.monotonic()) - start
+        before = [ p for t, p in samples if t < wallToMono - 0.5 ]
+        during = [ t for t, _ in samples if wallToMono + 0.5 < t < savedAt[0] - 0.5 ]
+        after = [ (t, p) for t, p in samples if t > savedAt[0] + 1.5 ]
+        rate = (len(during) - 1) / (during[-1] - during[0]) if len(during) > 1 else 0.0
+        print(f'sampling: {len(before)} samples before the trigger, {rate:.1f}/s during the capture, period {after[-1][1] if after else None} ms after it')
+        ok &= check('normal rate before the trigger', bool(before) and all(p == TCC_GUI.TEMP_UPD_PERIOD_MS for p in before))
+        ok &= check('burst rate during the capture', rate >= 0.8 * 1000 / TCC_GUI.BURST_SAMPLE_PERIOD_MS)
+        ok &= check('normal rate after the capture', bool(after) and all(p == TCC_GUI.TEMP_UPD_PERIOD_MS for _, p in after)
+                    and all(b - a > 0.8 for (a, _), (b, _) in zip(after, after[1:])))
+        ok &= check('pre-trigger samples captured', summary['from'] is not None and summary['from'] <= -2)
+        ok &= check('imminent trigger precedes the trip', summary['trigger']['reason'] == 'imminent' and summary['tripAt'] is not None and summary['tripAt'] > 0)
+        ok &= check('switch to G-mode captured', any(mode == 'G_Mode' and t >= summary['tripAt'] for t, mode in summary['modeTransitions']))
+        ok &= check('fan writes captured', any(fanIdx == ThermalBackend.CPUFanIdx and speed == 30 for _, fanIdx, speed in summary['fanWrites']))
+        ok &= check('capture ends the post-trigger window after the last trigger', summary['to'] >= summary['triggers'][-1][0] + args.post_sec - 0.2)
+
+    cost = idleAddCost()
+    print(f'idle ring buffer: {cost:.2f} us per sample')
+    ok &= check('idle cost under 20 us per sample', cost < 20)
+    print('OK' if ok else 'FAILED')
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+# Reactive vs predictive fail-safe, replayed against the AWCC emulator's thermal model.
+# Run: python bench/bench-failsafe.py
+# Every scenario is a heat input trace for the CPU sensor, sampled at 1 Hz with a manual clock.
+# The same FailsafeTrigger and trend estimator as in the app decide when to switch to G-mode and back.
+
+import os, sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from Backend.AWCCEmulator import makeEmulatedThermal, ManualClock
+from Backend.AWCCThermal import AWCCThermal
+from Backend.FailsafeTrigger import FailsafeTrigger
+from Backend.StreamStats import StreamStats
+from GUI.AppGUI import TCC_GUI
+
+THRESHOLD = TCC_GUI.FAILSAFE_CPU_TEMP
+IDLE_W = 25.0
+
+def bursts(loadW: float, lengthsSec, gapSec: float = 180):
+    # Idle, then a load burst of each length separated by idle gaps
+    edges, t = [], 60.0
+    for length in lengthsSec:
+        edges.append((t, t + length))
+        t += length + gapSec
+    return (lambda idx, now: loadW if any(a <= now < b for a, b in edges) else IDLE_W), t
+
+SCENARIOS = [
+    # name, (power trace, duration)
+    ('bursts 135 W (eq. 101°C)', bursts(135, (30, 60, 120, 300))),
+    ('bursts 160 W (eq. 114°C)', bursts(160, (20, 40, 90))),     # Above what G-mode can hold (101°C)
+    ('sustained 120 W (eq. 93°C)', bursts(120, (600,))),   # Never reaches the threshold: must not trip
+]
+
+def run(power, durationSec: float, predictive: bool) -> dict:
+    clock = ManualClock()
+    thermal, emu = makeEmulatedThermal(1, 1, power=power, clock=clock)
+    trigger = FailsafeTrigger(TCC_GUI.FAILSAFE_TRIGGER_DELAY_SEC, TCC_GUI.FAILSAFE_RESET_AFTER_TEMP_IS_OK_FOR_SEC, TCC_GUI.FAILSAFE_PREDICT_HORIZON_SEC)
+    trigger.predictive = predictive
+    stats = StreamStats(TCC_GUI.STATS_WINDOWS_SEC, (0, 127), trendWindowSec= TCC_GUI.FAILSAFE_PREDICT_WINDOW_SEC)
+    thermal.setMode(thermal.Mode.Balanced)
+    tripped, trips, peak, above, gModeSec = False, 0, 0.0, 0.0, 0.0
+    while clock.t < durationSec:
+        clock.tick(1.0)
+        temp = thermal.readSnapshot().fanTemp(0)
+        stats.add(temp, clock.t)
+        reason = trigger.update(clock.t, [temp], [THRESHOLD], [stats.trend])
+        if not tripped and reason is not None:
+            tripped, trips = True, trips + 1
+            thermal.setMode(thermal.Mode.G_Mode)
+        elif tripped and trigger.canReset(clock.t):
+            tripped = False
+            thermal.setMode(thermal.Mode.Balanced)
+        real = emu.temps[AWCCThermal.CPUFanIdx + emu.SENSOR_ID_FIRST]
+        peak = max(peak, real)
+        above += 1.0 if real >= THRESHOLD else 0.0
+        gModeSec += 1.0 if tripped else 0.0
+    return { 'peak': peak, 'above': above, 'trips': trips, 'gMode': gModeSec }
+
+def main() -> None:
+    print(f'Threshold {THRESHOLD}°C, trend window {TCC_GUI.FAILSAFE_PREDICT_WINDOW_SEC} s, horizon {TCC_GUI.FAILSAFE_PREDICT_HORIZON_SEC} s, fan spin-up tau {makeEmulatedThermal(1, 1)[1].FAN_TAU_SEC} s')
+    print(f"{'scenario':<28} {'policy':<11} {'peak °C':>8} {'above s':>8} {'trips':>6} {'G-mode s':>9}")
+    for name, (power, duration) in SCENARIOS:
+        for predictive in (False, True):
+            r = run(power, duration, predictive)
+            print(f"{name:<28} {'predictive' if predictive else 'reactive':<11} {r['peak']:>8.1f} {r['above']:>8.0f} {r['trips']:>6} {r['gMode']:>9.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# Per-tick cost vs discovered topology, offscreen, against the AWCC emulator.
+# Run: python bench/bench-fans.py
+# Two tables, for 2, 4 and 8 fans with 1 and 2 sensors per fan:
+#   acquisition - thermal.readSnapshot() alone: WMI calls per tick must equal (unique sensors + fans),
+#   full tick   - the app's own tick: _updateGaugesTask, then the whole pipeline (evaluate, fail-safe, stats,
+#                 render, tray), with the main window shown. Per stage times come from the app's profiler.
+# Both must grow at most linearly with the fan count: the cost per fan may not go up with more fans.
+
+import os, sys, time, tempfile
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+from benchutil import check, isolateSettings, makeApp
+
+from PySide6 import QtCore, QtWidgets
+from Backend.AWCCEmulator import makeEmulatedThermal, ManualClock
+
+TICKS = 2000
+APP_TICKS = 300
+ROUNDS = 5
+FAN_COUNTS = (2, 4, 8)
+TEMPS = [ 45, 58, 66, 74, 79, 83, 88, 92, 97, 101, 94, 86, 77, 69, 61, 52 ]  # Crosses both color limits
+LINEAR_SLACK = 1.25 # Allowed growth of the cost per fan from 2 to 8 fans (timing noise)
+
+def acquisition(fanCount: int, sensorsPerFan: int) -> tuple[float, float]:
+    # (WMI calls per tick, us per tick)
+    # Frozen clock: measure the acquisition path, not the emulator's model integration
+    thermal, emu = makeEmulatedThermal(fanCount, sensorsPerFan, clock=ManualClock())
+    emu.callCount = 0
+    t0 = time.perf_counter()
+    for _ in range(TICKS):
+        snapshot = thermal.readSnapshot()
+    dt = (time.perf_counter() - t0) / TICKS * 1e6
+    calls = emu.callCount / TICKS
+    assert len(snapshot.rpms) == fanCount and all(len(t) == sensorsPerFan for t in snapshot.temps)
+    assert calls == fanCount * (sensorsPerFan + 1)
+    return calls, dt
+
+def appTicks(app: QtWidgets.QApplication, tmp: str, fanCount: int, sensorsPerFan: int) -> tuple[float, dict]:
+    # (us per full tick, best of ROUNDS; profiler stage averages in us)
+    thermal, emu = makeEmulatedThermal(fanCount, sensorsPerFan, clock=ManualClock())
+    tcc = makeApp(thermal, tmp, f'bench-{fanCount}-{sensorsPerFan}.ini')
+    tcc._updateGaugesTask.stop() # Ticks are driven by the benchmark
+    tcc._loadAppSettings()
+    tcc.showWindow()
+    app.processEvents()
+    assert len(tcc._window.thermalUnits) == fanCount
+
+    tick = tcc._updateGaugesTask.tick
+    processEvents = QtWidgets.QApplication.processEvents
+    def appTick(i: int) -> None:
+        # Force the full render path on every tick, run the deferred pipeline stages right away
+        tcc._lastRenderTs = 0.0
+        tcc._lastHistoryTs = 0.0
+        emu.temps = { sid: float(TEMPS[(i + k) % len(TEMPS)]) for k, sid in enumerate(emu.temps) }
+        tick()
+        tcc._pipeline.flush()
+        processEvents()
+
+    for i in range(50): appTick(i) # Warm-up
+    n = APP_TICKS // ROUNDS
+    best = float('inf')
+    for r in range(ROUNDS):
+        t0 = time.perf_counter()
+        for i in range(r * n, (r + 1) * n): appTick(i)
+        best = min(best, time.perf_counter() - t0)
+    stages = { name: avg * 1e6 for name, (count, avg, _) in tcc.profiler.stageTimes().items() }
+    # Let the background hardware detection finish
+    loop = QtCore.QEventLoop()
+    QtCore.QTimer.singleShot(500, loop.quit)
+    loop.exec()
+    tcc._destroy()
+    return best / n * 1e6, stages
+
+def main() -> int:
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    app.setQuitOnLastWindowClosed(False)
+    ok = True
+
+    print('acquisition (readSnapshot)')
+    print(f"{'fans':>5} {'sensors':>8} {'WMI calls/tick':>15} {'us/tick':>9} {'us/(fan+sensor)':>16}")
+    for sensorsPerFan in (1, 2):
+        for fanCount in FAN_COUNTS:
+            calls, dt = acquisition(fanCount, sensorsPerFan)
+            print(f"{fanCount:>5} {fanCount * sensorsPerFan:>8} {calls:>15.0f} {dt:>9.1f} {dt / calls:>16.2f}")
+
+    print('\nfull tick (_updateGaugesTask + pipeline)')
+    with tempfile.TemporaryDirectory() as tmp:
+        isolateSettings(tmp)
+        stageNames = None
+        for sensorsPerFan in (1, 2):
+            perFan = {}
+            for fanCount in FAN_COUNTS:
+                us, stages = appTicks(app, tmp, fanCount, sensorsPerFan)
+                if stageNames is None:
+                    stageNames = list(stages)
+                    print(f"{'fans':>5} {'sensors':>8} {'us/tick':>9} {'us/fan':>8} " + ' '.join(f'{name:>10.10}' for name in stageNames))
+                perFan[fanCount] = us / fanCount
+                print(f"{fanCount:>5} {fanCount * sensorsPerFan:>8} {us:>9.1f} {us / fanCount:>8.1f} "
+                      + ' '.join(f"{stages.get(name, 0.0):>10.1f}" for name in stageNames))
+            lo, hi = FAN_COUNTS[0], FAN_COUNTS[-1]
+            ok &= check(f'{sensorsPerFan} sensor(s) per fan: cost per fan at {hi} fans within {LINEAR_SLACK}x of {lo} fans',
+                        perFan[hi] <= perFan[lo] * LINEAR_SLACK)
+    print('OK' if ok else 'FAILED')
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
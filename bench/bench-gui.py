@@ -0,0 +1,199 @@
+# GUI hot-path benchmark suite, offscreen, against the AWCC emulator.
+# Run: python bench/bench-gui.py                   - measure and compare against the stored baseline
+#      python bench/bench-gui.py --save-baseline   - measure and store the results as the new baseline
+# Per stage: wall time (us per call) and allocations per call, measured in a separate pass under tracemalloc:
+#   peak - transient Python heap per call (bytes),
+#   net  - memory blocks retained per call (a leak, or history/statistics windows that are still filling up).
+# Exits with 1 if any stage regressed beyond the tolerance. Times are compared relative to a calibration loop
+# (fixed pure Python work) run in the same process and stored with the baseline, so a slower or faster host
+# does not read as a regression; a baseline saved without it is scaled by the median time ratio of all stages
+# (one regressed stage does not move it). Allocations are compared as they are.
+
+import os, sys, gc, json, time, argparse, platform, tempfile, statistics, tracemalloc
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+from benchutil import isolateSettings, makeApp
+
+from PySide6 import QtWidgets
+from Backend.AWCCEmulator import makeEmulatedThermal, ManualClock
+from GUI.AppGUI import TCC_GUI
+from GUI.QGauge import QGauge
+from GUI.QGaugeTrayIcon import QGaugeTrayIcon
+from GUI.ThermalUnitWidget import ThermalUnitWidget
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "bench-gui.json")
+CALLS = 2000
+TICKS = 300
+ROUNDS = 5
+TEMPS = [ 45, 58, 66, 74, 79, 83, 88, 92, 97, 101, 94, 86, 77, 69, 61, 52 ]  # Crosses both color limits
+RPMS = [ 0, 1200, 2400, 3300, 4100, 4800, 5300, 4400, 3000, 1800 ]
+
+# Regression thresholds: a stage regresses if it is worse than baseline * (1 + tolerance) AND by more than the floor
+TIME_FLOOR_US = 5.0
+PEAK_FLOOR_BYTES = 1024
+NET_FLOOR_BLOCKS = 0.5
+
+class Stage:
+    # Calls `fn(i)` for i = 0, 1, ... Widget stages are followed by event processing (layout, paint),
+    # as in the app where the event loop runs after every tick
+    def __init__(self, name: str, fn, calls: int = CALLS, events: bool = True) -> None:
+        self.name = name
+        self.calls = calls
+        if events:
+            processEvents = QtWidgets.QApplication.processEvents
+            self.fn = lambda i: (fn(i), processEvents())
+        else:
+            self.fn = fn
+
+def calibrationWork(i: int) -> None:
+    # Dict, string and sort work, roughly the mix of the hot path
+    d = {}
+    for k in range(64):
+        d[(i + k) % 48] = f'{(i + k) * 0.5:.1f}'
+    sorted(d.values())
+
+def calibrate() -> float:
+    # us per call of the calibration loop, best of ROUNDS
+    return timeStage(Stage('calibration', calibrationWork, events=False))
+
+def timeStage(stage: Stage) -> float:
+    # Best of ROUNDS: the least disturbed by the rest of the system
+    fn = stage.fn
+    for i in range(min(100, stage.calls)): fn(i) # Warm-up
+    n = max(1, stage.calls // ROUNDS)
+    best = float('inf')
+    for r in range(ROUNDS):
+        t0 = time.perf_counter()
+        for i in range(r * n, (r + 1) * n): fn(i)
+        best = min(best, time.perf_counter() - t0)
+    return best / n * 1e6
+
+def allocStage(stage: Stage) -> tuple[float, float]:
+    # (peak transient bytes per call, net retained blocks per call)
+    fn = stage.fn
+    calls = max(1, stage.calls // 10)
+    fn(0)
+    gc.collect()
+    tracemalloc.start()
+    peak = 0
+    blocks0 = sys.getallocatedblocks()
+    for i in range(calls):
+        tracemalloc.reset_peak()
+        current, _ = tracemalloc.get_traced_memory()
+        fn(i)
+        peak += tracemalloc.get_traced_memory()[1] - current
+    gc.collect()
+    net = (sys.getallocatedblocks() - blocks0) / calls
+    tracemalloc.stop()
+    return peak / calls, max(0.0, net)
+
+def buildStages(app: QtWidgets.QApplication, tmp: str) -> tuple[list[Stage], TCC_GUI]:
+    isolateSettings(tmp)
+    thermal, emu = makeEmulatedThermal(2, 1, clock=ManualClock())
+    tcc = makeApp(thermal, tmp)
+    tcc._updateGaugesTask.stop() # Ticks are driven by the benchmark
+    tcc._loadAppSettings()
+    tcc.showWindow()
+    app.processEvents()
+    window = tcc._window
+    unit: ThermalUnitWidget = window.thermalUnits[0]
+
+    gauge: QGauge = unit._tempBar # Visible, styled: the stylesheet update re-polishes it
+    tray = QGaugeTrayIcon([ TCC_GUI.GPU_COLOR_LIMITS, TCC_GUI.CPU_COLOR_LIMITS ])
+    snapshot = thermal.readSnapshot()
+
+    tick = tcc._updateGaugesTask.tick
+    def appTick(i: int) -> None:
+        # Force the full render path on every tick, run the deferred pipeline stages right away
+        tcc._lastRenderTs = 0.0
+        tcc._lastHistoryTs = 0.0
+        emu.temps = { sid: float(TEMPS[(i + k) % len(TEMPS)]) for k, sid in enumerate(emu.temps) }
+        tick()
+        tcc._pipeline.flush()
+
+    stages = [
+        Stage('QGauge.setValue', lambda i: gauge.setValue(TEMPS[i % len(TEMPS)])),
+        Stage('QGauge._updateColor', lambda i: gauge._updateColor()),
+        Stage('ThermalUnitWidget.setTemp', lambda i: unit.setTemp(TEMPS[i % len(TEMPS)])),
+        Stage('ThermalUnitWidget.setFanRPM', lambda i: unit.setFanRPM(RPMS[i % len(RPMS)])),
+        Stage('ThermalUnitWidget.addHistorySample', lambda i: unit.addHistorySample(TEMPS[i % len(TEMPS)], RPMS[i % len(RPMS)])),
+        Stage('QGaugeTrayIcon.update', lambda i: tray.update([ TEMPS[i % len(TEMPS)], TEMPS[(i + 5) % len(TEMPS)] ], i % 2 == 0), events=False),
+        Stage('tray tooltip', lambda i: tcc._trayToolTip(snapshot, (88, 74), tcc._mode), events=False),
+        Stage('updateAppState', appTick, TICKS),
+    ]
+    return stages, tcc
+
+def measure() -> dict:
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    results = { 'calibration': { 'us': round(calibrate(), 2) } }
+    with tempfile.TemporaryDirectory() as tmp:
+        stages, tcc = buildStages(app, tmp)
+        for stage in stages:
+            us = timeStage(stage)
+            peak, net = allocStage(stage)
+            results[stage.name] = { 'us': round(us, 2), 'peakBytes': round(peak), 'netBlocks': round(net, 2) }
+        # Per-stage breakdown of the ticks above, from the app's own profiler
+        for name, (count, avg, _) in tcc.profiler.stageTimes().items():
+            results[f'updateAppState/{name}'] = { 'us': round(avg * 1e6, 2) }
+        tcc._destroy()
+    return results
+
+def hostScale(results: dict, baseline: dict) -> float:
+    # How much slower this host is than the baseline's: calibration loop time ratio, else the median stage time ratio
+    now, base = results.get('calibration', {}).get('us'), baseline.get('calibration', {}).get('us')
+    if now and base:
+        return now / base
+    ratios = [ res['us'] / baseline[name]['us'] for name, res in results.items() if name != 'calibration' and baseline.get(name, {}).get('us') and 'us' in res ]
+    return statistics.median(ratios) if ratios else 1.0
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    regressions = []
+    scale = hostScale(results, baseline)
+    limits = (('us', TIME_FLOOR_US, 'us', scale), ('peakBytes', PEAK_FLOOR_BYTES, 'B peak', 1.0), ('netBlocks', NET_FLOOR_BLOCKS, 'blocks net', 1.0))
+    for name, res in results.items():
+        base = baseline.get(name)
+        if base is None or name == 'calibration': continue
+        for key, floor, units, keyScale in limits:
+            if key not in res or key not in base: continue
+            expected = base[key] * keyScale
+            if res[key] > expected * (1 + tolerance) and res[key] - expected > floor * keyScale:
+                regressions.append(f'{name}: {res[key]} {units} (baseline {base[key]}, {expected:.2f} on this host)' if keyScale != 1.0 else f'{name}: {res[key]} {units} (baseline {base[key]})')
+    return regressions
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="GUI hot-path benchmarks")
+    parser.add_argument("--save-baseline", action="store_true", help="Store the results as the new baseline")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline file")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="Allowed relative slowdown/growth before a stage counts as regressed")
+    args = parser.parse_args()
+
+    results = measure()
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+
+    print(f"{'stage':<38} {'us/call':>9} {'base':>9} {'peak B':>8} {'base':>8} {'net blk':>8}")
+    for name, res in results.items():
+        base = (baseline or {}).get(name, {})
+        fmt = lambda d, k: '-' if k not in d else f'{d[k]:g}'
+        print(f"{name:<38} {fmt(res, 'us'):>9} {fmt(base, 'us'):>9} {fmt(res, 'peakBytes'):>8} {fmt(base, 'peakBytes'):>8} {fmt(res, 'netBlocks'):>8}")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, 'w') as f:
+            json.dump({ 'machine': f'{platform.platform()} / Python {platform.python_version()}', 'results': results }, f, indent=2)
+            f.write('\n')
+        print(f'Baseline saved to {args.baseline}')
+        return 0
+    if baseline is None:
+        print('No baseline, run with --save-baseline first')
+        return 0
+    print(f"host speed: {hostScale(results, baseline):.2f}x the baseline's times ({'calibration loop' if 'calibration' in baseline else 'median of the stages'})")
+    regressions = compare(results, baseline, args.tolerance)
+    for line in regressions:
+        print(f'REGRESSION {line}')
+    print('OK' if not regressions else f'{len(regressions)} regression(s)')
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+# Linux hwmon backend against a fake sysfs tree in a temporary directory.
+# Run: python bench/bench-hwmon.py
+# Checks topology discovery, value conversion, fan speed and mode writes, then measures
+# snapshot reads per second: open attribute files + pread vs reopening every file on every read.
+
+import os, sys, time, tempfile
+from typing import Optional
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from Backend.HwmonThermal import HwmonThermal, NoHwmonDevice
+from Backend.ThermalBackend import ThermalBackend, ThermalSnapshot
+
+SNAPSHOTS = 20000
+
+def write(path: str, value) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(f'{value}\n')
+
+def makeFakeSysfs(root: str) -> None:
+    # hwmon0: unrelated device, hwmon1: alienware-wmi with 2 fans (GPU listed first) and 3 sensors
+    write(f'{root}/class/hwmon/hwmon0/name', 'acpitz')
+    write(f'{root}/class/hwmon/hwmon0/temp1_input', 45000)
+    dev = f'{root}/class/hwmon/hwmon1'
+    write(f'{dev}/name', 'alienware_wmi')
+    for idx, label, rpm in ((1, 'GPU Fan', 2400), (2, 'CPU Fan', 3100)):
+        write(f'{dev}/fan{idx}_label', label)
+        write(f'{dev}/fan{idx}_input', rpm)
+        write(f'{dev}/fan{idx}_boost', 0)
+    for idx, label, milli in ((1, 'CPU', 71500), (2, 'GPU', 64400), (3, 'Ambient', 38000)):
+        write(f'{dev}/temp{idx}_label', label)
+        write(f'{dev}/temp{idx}_input', milli)
+    write(f'{root}/firmware/acpi/platform_profile', 'balanced')
+    write(f'{root}/firmware/acpi/platform_profile_choices', 'quiet balanced balanced-performance performance custom')
+
+def read(path: str) -> str:
+    with open(path) as f:
+        return f.read().strip()
+
+class ReopenReader:
+    # Reference: open + read + close of every attribute on every snapshot
+    def __init__(self, paths) -> None:
+        self._paths = paths
+    def readSnapshot(self) -> list:
+        res = []
+        for path in self._paths:
+            with open(path) as f:
+                res.append(int(f.read()))
+        return res
+
+def check(root: str) -> None:
+    hw = HwmonThermal(root)
+    assert isinstance(hw, ThermalBackend)
+    assert hw.getFanCount() == 2
+    # CPU fan first, its related sensor is the "CPU" temp; the unlabeled ambient sensor is not related to any fan
+    assert hw.getFanRelatedSensorIds(ThermalBackend.CPUFanIdx) == (1,)
+    assert hw.getFanRelatedSensorIds(ThermalBackend.GPUFanIdx) == (2,)
+    snapshot = hw.readSnapshot()
+    assert snapshot == ThermalSnapshot(((72,), (64,)), (3100, 2400)), snapshot
+    # Values are re-read from the open files
+    write(f'{root}/class/hwmon/hwmon1/temp1_input', 90000)
+    write(f'{root}/class/hwmon/hwmon1/fan2_input', 4800)
+    assert hw.readSnapshot() == ThermalSnapshot(((90,), (64,)), (4800, 2400))
+    assert hw.getFanRelatedTemp(ThermalBackend.CPUFanIdx) == 90 and hw.getFanRPM(ThermalBackend.CPUFanIdx) == 4800
+    # Control
+    # Speeds are 0..120 (the slider range): 120 is full speed
+    assert hw.setFanSpeed(ThermalBackend.CPUFanIdx, 60) and read(f'{root}/class/hwmon/hwmon1/fan2_boost') == '127'
+    assert hw.setFanSpeed(ThermalBackend.GPUFanIdx, 120) and read(f'{root}/class/hwmon/hwmon1/fan1_boost') == '255'
+    assert hw.setMode(hw.Mode.G_Mode) and read(f'{root}/firmware/acpi/platform_profile') == 'performance'
+    assert hw.setMode(hw.Mode.Custom) and read(f'{root}/firmware/acpi/platform_profile') == 'custom'
+    assert hw.setMode(hw.Mode.Balanced) and read(f'{root}/firmware/acpi/platform_profile') == 'balanced'
+    # A failed read is None, not an exception
+    write(f'{root}/class/hwmon/hwmon1/temp2_input', '')
+    assert hw.readSnapshot().temps[ThermalBackend.GPUFanIdx] == (None,)
+    write(f'{root}/class/hwmon/hwmon1/temp2_input', 64400)
+    # A labeled fan without a matching sensor has no related sensors (and cannot trip the fail-safe)
+    os.unlink(f'{root}/class/hwmon/hwmon1/temp2_input')
+    assert HwmonThermal(root).getFanRelatedSensorIds(ThermalBackend.GPUFanIdx) == ()
+    write(f'{root}/class/hwmon/hwmon1/temp2_input', 64400)
+    hw.close()
+    checkPwm(root)
+    try:
+        HwmonThermal(os.path.join(root, 'nothing'))
+        assert False
+    except NoHwmonDevice:
+        pass
+    print('checks: ok')
+
+def makeSmm(root: str, profileChoices: Optional[str]) -> str:
+    dev = f'{root}/class/hwmon/hwmon0'
+    write(f'{dev}/name', 'dell_smm')
+    for idx, label in ((1, 'Processor Fan'), (2, 'Video Fan')):
+        write(f'{dev}/fan{idx}_label', label)
+        write(f'{dev}/fan{idx}_input', 2000)
+        write(f'{dev}/pwm{idx}', 128)
+        write(f'{dev}/pwm{idx}_enable', 2)
+    if profileChoices is not None:
+        write(f'{root}/firmware/acpi/platform_profile_choices', profileChoices)
+    return dev
+
+def checkPwm(root: str) -> None:
+    # dell-smm: pwmN is honoured in manual control only, automatic control is restored outside of the Custom mode and on close
+    root = os.path.join(root, 'smm')
+    dev = makeSmm(root, 'balanced performance')
+    hw = HwmonThermal(root)
+    assert hw.setMode(hw.Mode.Custom) and read(f'{root}/firmware/acpi/platform_profile') == 'balanced' # No custom profile
+    assert hw.setFanSpeed(ThermalBackend.CPUFanIdx, 120) and read(f'{dev}/pwm1') == '255' and read(f'{dev}/pwm1_enable') == '1'
+    assert read(f'{dev}/pwm2_enable') == '2'
+    assert hw.setMode(hw.Mode.Balanced) and read(f'{dev}/pwm1_enable') == '2'
+    # Low speeds do not go under the manual minimum, 0 keeps the firmware's curve
+    assert hw.setFanSpeed(ThermalBackend.GPUFanIdx, 30) and read(f'{dev}/pwm2') == str(HwmonThermal.PWM_MANUAL_MIN) and read(f'{dev}/pwm2_enable') == '1'
+    assert hw.setFanSpeed(ThermalBackend.GPUFanIdx, 90) and read(f'{dev}/pwm2') == '191'
+    assert hw.setFanSpeed(ThermalBackend.GPUFanIdx, 0) and read(f'{dev}/pwm2') == '191' and read(f'{dev}/pwm2_enable') == '2'
+    assert hw.setFanSpeed(ThermalBackend.GPUFanIdx, 30) and read(f'{dev}/pwm2_enable') == '1'
+    hw.close()
+    assert read(f'{dev}/pwm2_enable') == '2'
+
+    # dell-smm only, no platform profile: every mode succeeds, Balanced and G-mode restore automatic control
+    root = os.path.join(root, 'noprofile')
+    dev = makeSmm(root, None)
+    hw = HwmonThermal(root)
+    assert hw.setMode(hw.Mode.Balanced) and not os.path.exists(f'{root}/firmware/acpi/platform_profile')
+    assert hw.setMode(hw.Mode.Custom) and hw.setFanSpeed(ThermalBackend.CPUFanIdx, 60) and read(f'{dev}/pwm1_enable') == '1'
+    assert hw.setMode(hw.Mode.G_Mode) and read(f'{dev}/pwm1_enable') == '2'
+    assert not os.path.exists(f'{root}/firmware/acpi/platform_profile')
+    hw.close()
+
+def bench(name: str, reader) -> None:
+    reader.readSnapshot()
+    t0 = time.perf_counter()
+    for _ in range(SNAPSHOTS):
+        reader.readSnapshot()
+    dt = time.perf_counter() - t0
+    print(f'{name:<22} {SNAPSHOTS / dt:>10.0f} snapshots/s {dt / SNAPSHOTS * 1e6:>8.1f} us/snapshot')
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as root:
+        makeFakeSysfs(root)
+        check(root)
+        dev = f'{root}/class/hwmon/hwmon1'
+        hw = HwmonThermal(root)
+        bench('pread (open files)', hw)
+        bench('reopen every read', ReopenReader([f'{dev}/temp1_input', f'{dev}/temp2_input', f'{dev}/fan1_input', f'{dev}/fan2_input']))
+        hw.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# Hotkey-to-mode-applied latency with a slow notification sink, offscreen, against the AWCC emulator.
+# Run: python bench/bench-notify.py
+# A burst of G-key presses is replayed at a fixed interval. With the dispatcher the latency must not
+# depend on the sink, and the burst collapses into a few notifications.
+
+import os, time, tempfile, statistics
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+from benchutil import isolateSettings, makeApp
+
+from PySide6 import QtWidgets
+from Backend.AWCCEmulator import makeEmulatedThermal, ManualClock
+from GUI.Notifications import RecordingSink
+
+PRESSES = 12
+PRESS_INTERVAL_SEC = 0.05
+SINK_DELAY_SEC = 0.15   # Roughly what a WinRT toast call costs
+
+class InlineDispatcher:
+    # Reference: the old behaviour, the sink is called on the GUI thread
+    def __init__(self, sink) -> None:
+        self._sink = sink
+    def post(self, notification) -> None:
+        self._sink.show(notification)
+    def stop(self, timeoutSec: float = 0) -> None:
+        pass
+
+def run(inline: bool, tmp: str) -> None:
+    thermal, emu = makeEmulatedThermal(2, 1, clock=ManualClock())
+    sink = RecordingSink(SINK_DELAY_SEC)
+    tcc = makeApp(thermal, tmp, notificationSink=sink)
+    if inline:
+        tcc._notifier.stop()
+        tcc._notifier = InlineDispatcher(sink)
+
+    applied: list[float] = []
+    setMode = thermal.setMode
+    def setModeTimed(mode):
+        res = setMode(mode)
+        applied.append(time.perf_counter())
+        return res
+    thermal.setMode = setModeTimed
+
+    t0 = time.perf_counter()
+    scheduled = []
+    for k in range(PRESSES):
+        target = t0 + k * PRESS_INTERVAL_SEC
+        while time.perf_counter() < target:
+            time.sleep(0.0005)
+        scheduled.append(target)
+        tcc._gModeKeySignal.emit()
+    handlerDone = time.perf_counter()
+    tcc._notifier.stop(PRESSES * SINK_DELAY_SEC + 1)
+    tcc._destroy()
+
+    latencies = [ (a - s) * 1000 for a, s in zip(applied, scheduled) ]
+    print(f"{'inline' if inline else 'dispatcher':>10}: "
+          f"latency median {statistics.median(latencies):7.2f} ms, max {max(latencies):7.2f} ms, "
+          f"burst handled in {(handlerDone - t0) * 1000:6.0f} ms, notifications shown {len(sink.shown)}/{PRESSES}")
+
+def main() -> None:
+    app = QtWidgets.QApplication([])
+    print(f"{PRESSES} G-key presses every {PRESS_INTERVAL_SEC * 1000:.0f} ms, sink takes {SINK_DELAY_SEC * 1000:.0f} ms per notification")
+    with tempfile.TemporaryDirectory() as tmp:
+        isolateSettings(tmp)
+        run(inline=True, tmp=tmp)
+        run(inline=False, tmp=tmp)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# Acquisition pipeline under a slow UI: does the control path keep its pace?
+# Run: python bench/bench-pipeline.py [--render-ms=300] [--period-ms=100] [--seconds=6]
+# The app runs offscreen against the emulator with a fast sampling period, and every gauge update is made
+# artificially slow. Reported per configuration: fail-safe evaluations per second, the longest gap between
+# two evaluations, renders and dropped frames, recorded samples (must equal the evaluated ones), and the
+# pipeline's own per-stage report. "unthrottled" is the same pipeline with the render duty limit off.
+# Either way the control thread must keep the pace: at least RATE_MIN of the sampling rate, and no gap between
+# two evaluations longer than the sampling period (plus the timer slack).
+
+import os, sys, time, argparse, tempfile
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+from benchutil import check, isolateSettings, makeApp
+
+from PySide6 import QtCore, QtWidgets
+from Backend.AWCCEmulator import makeEmulatedThermal
+from Backend.TelemetryAnalysis import loadRecordings
+from GUI.AppGUI import TCC_GUI, PowerBudget
+
+RATE_MIN = 0.9
+
+def runOnce(app: QtWidgets.QApplication, tmp: str, renderMs: float, periodMs: int, seconds: float, maxDuty) -> dict:
+    TCC_GUI.TEMP_UPD_PERIOD_MS = periodMs
+    TCC_GUI.POWER_BUDGETS = { source: PowerBudget(periodMs, periodMs, periodMs) for source in TCC_GUI.POWER_BUDGETS }
+    TCC_GUI.RENDER_MAX_DUTY = maxDuty
+    recordDir = tempfile.mkdtemp(dir= tmp)
+    thermal, _ = makeEmulatedThermal(2, 1)
+    tcc = makeApp(thermal, tmp, recordDir= recordDir)
+    tcc.showWindow()
+    window = tcc._window
+    setGauges = window.setGauges
+    def slowSetGauges(*args):
+        time.sleep(renderMs / 1000)
+        setGauges(*args)
+    window.setGauges = slowSetGauges
+
+    evaluate = tcc._pipeline.stages[0]
+    evalTimes = []
+    fn = evaluate._fn
+    evaluate._fn = lambda sample: (evalTimes.append(time.perf_counter()), fn(sample))[1]
+
+    loop = QtCore.QEventLoop()
+    QtCore.QTimer.singleShot(int(seconds * 1000), loop.quit)
+    start = time.perf_counter()
+    loop.exec()
+    elapsed = time.perf_counter() - start # The coarse timer may quit the loop a bit early
+    report = tcc._pipeline.summary()
+    render = next(st for st in tcc._pipeline.stages if st.name == 'render')
+    tcc._destroy()
+    recorded = sum(len(rec) for _, rec, _ in loadRecordings([ recordDir ]))
+    gaps = [ b - a for a, b in zip(evalTimes, evalTimes[1:]) ]
+    return {
+        'evaluations': len(evalTimes),
+        'perSec': sum(1 for t in evalTimes if t <= start + elapsed) / elapsed,
+        'maxGapMs': max(gaps) * 1000 if gaps else 0.0,
+        'renders': render.runs,
+        'dropped': render.queue.dropped,
+        'evaluated': evaluate.runs,
+        'recorded': recorded,
+        'report': report,
+    }
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Acquisition pipeline under a slow UI")
+    parser.add_argument("--render-ms", type=float, default=300, help="Artificial gauge update time")
+    parser.add_argument("--period-ms", type=int, default=100, help="Sampling period")
+    parser.add_argument("--seconds", type=float, default=6)
+    args = parser.parse_args()
+
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    app.setQuitOnLastWindowClosed(False)
+    ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        isolateSettings(tmp)
+        for name, maxDuty in (('unthrottled', None), ('pipeline', TCC_GUI.RENDER_MAX_DUTY)):
+            res = runOnce(app, tmp, args.render_ms, args.period_ms, args.seconds, maxDuty)
+            print(f"{name}: {res['evaluations']} evaluations ({res['perSec']:.1f}/s, target {1000 / args.period_ms:.1f}/s), "
+                  f"max gap {res['maxGapMs']:.0f} ms, {res['renders']} renders, {res['dropped']} dropped, {res['recorded']} recorded")
+            print(res['report'])
+            ok &= check(f'{name}: recording keeps every sample', res['recorded'] == res['evaluated'])
+            ok &= check(f'{name}: evaluation rate at least {RATE_MIN:.0%} of the sampling rate', res['perSec'] >= RATE_MIN * 1000 / args.period_ms)
+            ok &= check(f'{name}: no evaluation gap longer than the sampling period', res['maxGapMs'] <= args.period_ms + TCC_GUI.TIMER_SLACK_MS)
+    print('OK' if ok else 'FAILED')
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,324 @@
+# Process rules: incremental scanner vs. full re-enumeration, plus rule selection and debounce checks.
+# Run: python bench/bench-procscan.py [--procs=1000] [--churn=5] [--scans=200] [--real]
+# A fake /proc tree with `procs` processes is built in a temp dir, `churn` processes exit and as many start
+# between scans. The naive scanner looks up every process name on every scan (what matching all processes
+# each tick costs), the incremental one only looks up the new pids.
+# The Windows provider runs against a fake kernel32/psapi that counts the calls: per scan it may make one
+# EnumProcesses(), one wait per MAXIMUM_WAIT_OBJECTS known processes and a few calls per started/exited process
+# (and per process it cannot open), never one per running process.
+# --real additionally times both against this machine's /proc (Linux).
+
+import os, sys, math, time, ctypes, shutil, random, argparse, tempfile
+from collections import Counter
+from benchutil import check
+
+from Backend.ProcessScanner import ProcfsProcessProvider, ProcessProvider, ProcessScanner, WindowsProcessProvider, normalizeExeName
+from Backend.ProcessRules import ProcessRule, ProcessRuleMatcher
+from Backend.AWCCEmulator import ManualClock
+
+NAMES = [ 'systemd', 'bash', 'python3', 'code', 'firefox', 'kworker', 'pipewire', 'sshd', 'dbus-daemon', 'Xorg' ]
+
+class FakeProc:
+    def __init__(self, root: str, seed: int = 1) -> None:
+        self.root = root
+        self.rnd = random.Random(seed)
+        self.nextPid = 100
+        self.pids: list[int] = []
+
+    def spawn(self, name: str) -> int:
+        pid = self.nextPid
+        self.nextPid += 1
+        path = os.path.join(self.root, str(pid))
+        os.mkdir(path)
+        with open(os.path.join(path, 'cmdline'), 'wb') as f:
+            f.write(f'/usr/bin/{name}\0--flag\0'.encode())
+        with open(os.path.join(path, 'comm'), 'w') as f:
+            f.write(name[:15] + '\n')
+        self.pids.append(pid)
+        return pid
+
+    def kill(self, pid: int) -> None:
+        shutil.rmtree(os.path.join(self.root, str(pid)))
+        self.pids.remove(pid)
+
+    def churn(self, n: int) -> None:
+        for pid in self.rnd.sample(self.pids, n):
+            self.kill(pid)
+        for _ in range(n):
+            self.spawn(self.rnd.choice(NAMES))
+
+class TableProvider(ProcessProvider):
+    # In memory: pid -> (start key, exe name)
+    def __init__(self) -> None:
+        self.table: dict[int, tuple[int, str]] = {}
+    def listProcesses(self):
+        return [ (pid, start) for pid, (start, _) in self.table.items() ]
+    def exeName(self, pid: int):
+        return self.table[pid][1] if pid in self.table else None
+
+class FakeWin32:
+    # Stand-in for kernel32 and psapi, counts the calls. Windows semantics that matter here: a pid is reused
+    # (lowest free one first) only when no handle to the process that had it is open, and an exited process
+    # stays enumerated until then. Protected processes cannot be opened
+    WAIT_TIMEOUT = 0x102
+
+    def __init__(self, seed: int = 1) -> None:
+        self.rnd = random.Random(seed)
+        self.calls: Counter[str] = Counter()
+        self.procs: dict[int, list] = {}    # pid -> [creation time, name, exited, open handles, protected]
+        self.handles: dict[int, int] = {}   # handle -> pid
+        self._nextHandle = 4
+        self._clock = 1000
+
+    def spawn(self, name: str, protected: bool = False) -> int:
+        pid = 4
+        while pid in self.procs:
+            pid += 4
+        self._clock += 1
+        self.procs[pid] = [ self._clock, name, False, 0, protected ]
+        return pid
+
+    def exit(self, pid: int) -> None:
+        self.procs[pid][2] = True
+        self._reap(pid)
+
+    def running(self) -> list[int]:
+        return [ pid for pid, p in self.procs.items() if not p[2] ]
+
+    def churn(self, n: int) -> None:
+        for pid in self.rnd.sample(self.running(), n):
+            self.exit(pid)
+        for _ in range(n):
+            self.spawn(self.rnd.choice(NAMES))
+
+    def hold(self, pid: int) -> int:
+        # A handle opened by some other program
+        return self.OpenProcess(0, False, pid)
+
+    def _reap(self, pid: int) -> None:
+        p = self.procs[pid]
+        if p[2] and p[3] == 0:
+            del self.procs[pid]
+
+    def EnumProcesses(self, pids, size, needed) -> int:
+        self.calls['EnumProcesses'] += 1
+        for i, pid in enumerate(list(self.procs)[:len(pids)]):
+            pids[i] = pid
+        needed._obj.value = len(self.procs) * ctypes.sizeof(pids._type_)
+        return 1
+
+    def OpenProcess(self, access, inherit, pid):
+        self.calls['OpenProcess'] += 1
+        p = self.procs.get(pid)
+        if p is None or p[4]:
+            return None
+        handle = self._nextHandle
+        self._nextHandle += 4
+        self.handles[handle] = pid
+        p[3] += 1
+        return handle
+
+    def GetProcessTimes(self, handle, creation, exit, kernel, user) -> int:
+        self.calls['GetProcessTimes'] += 1
+        creation._obj.value = self.procs[self.handles[handle]][0]
+        return 1
+
+    def CloseHandle(self, handle) -> int:
+        self.calls['CloseHandle'] += 1
+        pid = self.handles.pop(handle)
+        self.procs[pid][3] -= 1
+        self._reap(pid)
+        return 1
+
+    def WaitForMultipleObjects(self, count, handles, waitAll, timeoutMs) -> int:
+        self.calls['WaitForMultipleObjects'] += 1
+        for i in range(count):
+            if self.procs[self.handles[handles[i]]][2]:
+                return i
+        return self.WAIT_TIMEOUT
+
+    def QueryFullProcessImageNameW(self, handle, flags, buf, size) -> int:
+        self.calls['QueryFullProcessImageNameW'] += 1
+        buf.value = f'C:\\Program Files\\{self.procs[self.handles[handle]][1]}.exe'
+        return 1
+
+def fakeWindowsProvider(fake: FakeWin32) -> WindowsProcessProvider:
+    return WindowsProcessProvider(kernel32= fake, psapi= fake)
+
+def naiveScan(provider: ProcessProvider) -> Counter:
+    # Re-enumerate and look up every process
+    running = Counter()
+    for pid, _ in provider.listProcesses():
+        exe = provider.exeName(pid)
+        if exe:
+            running[normalizeExeName(exe)] += 1
+    return running
+
+def timeScans(provider: ProcessProvider, scans: int, churn, useNaive: bool) -> float:
+    scanner = ProcessScanner(provider)
+    scanner.scan() # Initial enumeration, not counted
+    total = 0.0
+    for _ in range(scans):
+        churn()
+        t0 = time.perf_counter()
+        if useNaive:
+            naiveScan(provider)
+        else:
+            scanner.scan()
+        total += time.perf_counter() - t0
+    return total / scans * 1e6
+
+def checks(root: str) -> bool:
+    fake = FakeProc(root, seed= 2)
+    for i in range(50): fake.spawn(NAMES[i % len(NAMES)])
+    provider = ProcfsProcessProvider(root)
+    scanner = ProcessScanner(provider)
+    ok = True
+    scanner.scan()
+    ok &= check('initial scan matches the naive one', scanner.running == naiveScan(provider))
+    lookups = scanner.lookups
+    for _ in range(20):
+        fake.churn(3)
+        scanner.scan()
+    ok &= check('incremental state matches the naive one after churn', scanner.running == naiveScan(provider))
+    ok &= check('only new processes are looked up', scanner.lookups - lookups == 20 * 3)
+
+    gamePid = fake.spawn('Game.exe')
+    started, _ = scanner.scan()
+    ok &= check('started process is reported, normalized', started == [ 'game' ])
+    fake.kill(gamePid)
+    _, exited = scanner.scan()
+    ok &= check('exited process is reported', exited == [ 'game' ] and 'game' not in scanner.running)
+
+    # A pid reused between two scans is a new process
+    table = TableProvider()
+    table.table = { 10: (1, 'bash'), 11: (1, 'game.exe') }
+    scanner = ProcessScanner(table)
+    scanner.scan()
+    table.table[11] = (2, 'notepad.exe')
+    started, exited = scanner.scan()
+    ok &= check('reused pid is reported as exit + start', started == [ 'notepad' ] and exited == [ 'game' ] and 'game' not in scanner.running)
+
+    # Windows provider: state, pid reuse, exits while a handle is held elsewhere, protected processes
+    fake = FakeWin32(seed= 3)
+    for i in range(200): fake.spawn(NAMES[i % len(NAMES)], protected= i % 50 == 0)
+    scanner = ProcessScanner(fakeWindowsProvider(fake))
+    expected = lambda: Counter(normalizeExeName(fake.procs[pid][1]) for pid in fake.running() if not fake.procs[pid][4])
+    scanner.scan()
+    ok &= check('windows: initial scan sees every process that can be opened', scanner.running == expected())
+    for _ in range(20):
+        fake.churn(3)
+        scanner.scan()
+    ok &= check('windows: incremental state matches after churn', scanner.running == expected())
+    gamePid = fake.spawn('Game')
+    scanner.scan()
+    fake.exit(gamePid)
+    notepadPid = fake.spawn('notepad') # The game's handle is still open in the provider: no reuse yet
+    started, exited = scanner.scan()
+    reusePid = fake.spawn('blender')
+    started2, _ = scanner.scan()
+    ok &= check('windows: pid of a watched process is not reused before its exit is seen',
+                notepadPid != gamePid and exited == [ 'game' ] and started == [ 'notepad' ])
+    ok &= check('windows: freed pid is reused and reported as a new process', reusePid == gamePid and started2 == [ 'blender' ])
+    heldPid = fake.spawn('editor')
+    scanner.scan()
+    fake.hold(heldPid)
+    fake.exit(heldPid) # Stays enumerated: another program has a handle to it
+    _, exited = scanner.scan()
+    started, _ = scanner.scan()
+    ok &= check('windows: exit is seen while another handle keeps the process enumerated',
+                exited == [ 'editor' ] and started == [] and 'editor' not in scanner.running and heldPid in fake.procs)
+    fake.calls.clear()
+    scanner.scan()
+    protected = sum(1 for p in fake.procs.values() if p[4])
+    ok &= check('windows: only the held exited process and the protected ones are reopened',
+                fake.calls['OpenProcess'] == 1 + protected and fake.calls['CloseHandle'] == 1)
+    scanner.close()
+    ok &= check('windows: close() releases every handle', all(p[3] == 0 for pid, p in fake.procs.items() if pid != heldPid))
+
+    # Rule selection and debounce
+    clock = ManualClock()
+    rules = [ ProcessRule('game', 'G_Mode', {}), ProcessRule('blender', 'Custom', { 'cpu': 80 }) ]
+    matcher = ProcessRuleMatcher(rules, 6, clock= clock)
+    ok &= check('first rule wins', matcher.match({ 'blender': 1, 'game': 1 }) == rules[0])
+    ok &= check('no rule while nothing matches', not matcher.update({ 'bash': 1 }) and matcher.active is None)
+    changes = 0
+    for t in range(30): # A launcher that restarts the game every 2 s: never stable for 6 s
+        clock.tick(1)
+        changes += matcher.update({ 'game': 1 } if t % 4 < 2 else {})
+    ok &= check('flapping process does not switch the mode', changes == 0 and matcher.active is None)
+    def switchDelay(running: dict) -> tuple[int, int]:
+        # (seconds until the active rule changed, number of changes)
+        changes, delay = 0, None
+        for t in range(12):
+            if matcher.update(running):
+                changes += 1
+                delay = delay if delay is not None else t
+            clock.tick(1)
+        return delay, changes
+    ok &= check('stable match is applied once, after the debounce', switchDelay({ 'blender': 1 }) == (6, 1) and matcher.active == rules[1])
+    matcher.update({})
+    clock.tick(3)
+    ok &= check('short gap keeps the rule', not matcher.update({ 'blender': 1 }) and matcher.active == rules[1])
+    clock.tick(1)
+    ok &= check('rule is dropped after the process is gone for the debounce', switchDelay({}) == (6, 1) and matcher.active is None)
+    return ok
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Process scanner benchmark")
+    parser.add_argument("--procs", type=int, default=1000, help="Processes in the fake /proc")
+    parser.add_argument("--churn", type=int, default=5, help="Processes replaced between scans")
+    parser.add_argument("--scans", type=int, default=200, help="Scans to time")
+    parser.add_argument("--real", action="store_true", help="Also time against the real /proc")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        checksRoot = os.path.join(root, 'checks')
+        os.mkdir(checksRoot)
+        ok = checks(checksRoot)
+
+        procRoot = os.path.join(root, 'proc')
+        os.mkdir(procRoot)
+        fake = FakeProc(procRoot)
+        for i in range(args.procs): fake.spawn(NAMES[i % len(NAMES)])
+        provider = ProcfsProcessProvider(procRoot)
+        churn = lambda: fake.churn(args.churn)
+        incremental = timeScans(provider, args.scans, churn, False)
+        naive = timeScans(provider, args.scans, churn, True)
+        print(f'fake /proc, {args.procs} processes, {args.churn} replaced per scan:')
+        print(f'  incremental {incremental:9.0f} us/scan, {args.churn} lookups/scan')
+        print(f'  naive       {naive:9.0f} us/scan, {args.procs} lookups/scan ({naive / incremental:.1f}x)')
+
+    # Windows provider: calls per scan, against a fake with the same process count and churn
+    fake = FakeWin32()
+    for i in range(args.procs): fake.spawn(NAMES[i % len(NAMES)])
+    scanner = ProcessScanner(fakeWindowsProvider(fake))
+    scanner.scan()
+    fake.calls.clear()
+    for _ in range(args.scans):
+        fake.churn(args.churn)
+        scanner.scan()
+    perScan = { name: count / args.scans for name, count in fake.calls.items() }
+    total = sum(perScan.values())
+    # EnumProcesses, the waits, and per exited process: one more wait and CloseHandle, per started one: OpenProcess,
+    # GetProcessTimes and QueryFullProcessImageNameW
+    bound = 1 + math.ceil(args.procs / WindowsProcessProvider.MAXIMUM_WAIT_OBJECTS) + args.churn * 5
+    print(f'fake Windows, {args.procs} processes, {args.churn} replaced per scan:')
+    print(f'  incremental {total:9.1f} calls/scan (' + ', '.join(f'{name} {n:g}' for name, n in perScan.items()) + ')')
+    print(f'  per process {1 + 3 * args.procs:9d} calls/scan (OpenProcess, GetProcessTimes, CloseHandle for every pid)')
+    ok &= check(f'windows: at most {bound} calls per scan', total <= bound)
+
+    if args.real and os.path.isdir('/proc'):
+        provider = ProcfsProcessProvider()
+        count = len(provider.listProcesses())
+        incremental = timeScans(provider, args.scans, lambda: None, False)
+        naive = timeScans(provider, min(args.scans, 50), lambda: None, True)
+        print(f'/proc, {count} processes:')
+        print(f'  incremental {incremental:9.0f} us/scan')
+        print(f'  naive       {naive:9.0f} us/scan ({naive / incremental:.1f}x)')
+
+    print('OK' if ok else 'FAILED')
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
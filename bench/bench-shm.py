@@ -0,0 +1,128 @@
+# Shared-memory snapshot reads per second and a torn-read check under concurrent writes.
+# Run: python bench/bench-shm.py
+# The writer is a separate Python process (like the app) publishing either at 1 Hz or as fast as it can.
+# Every published snapshot is self-consistent (ts, mode, flags, temps and RPMs are derived from the same counter),
+# so a torn read is detectable. Reference: one request/response round trip over a pipe per read.
+# Also checks that a segment left behind by a dead publisher is replaced, and one of a live publisher is not.
+
+import os, sys, json, time, subprocess, threading
+from multiprocessing import shared_memory
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from Backend.SnapshotPublisher import SnapshotPublisher, SnapshotReader, SegmentInUse, MAGIC, VERSION, _PREFIX, _HEADER_OFFSET
+
+MODES = ['Balanced', 'G_Mode', 'Custom']
+FANS = [ { 'name': 'CPU', 'sensorIds': [1, 3] }, { 'name': 'GPU', 'sensorIds': [2] }, { 'name': 'Fan 3', 'sensorIds': [4] } ]
+DURATION_SEC = 2.0
+MAX_STALE_FRACTION = 0.01 # Reads that may return the previous snapshot during the write storm
+
+def values(k: int) -> tuple:
+    return float(k), MODES[k % 3], k % 2 == 1, [ k % 30000 ] * 4, [ k ] * 3
+
+def isConsistent(raw: tuple) -> bool:
+    seq, ts, mode, flags = raw[:4]
+    k = int(ts)
+    return raw[4:8] == (k % 30000,) * 4 and raw[8:] == (k,) * 3 and mode == k % 3 and flags == k % 2
+
+def runWriter(name: str, storm: bool) -> None:
+    # Child process: publish until stdin is closed, then report the number of writes
+    stop = threading.Event()
+    threading.Thread(target= lambda: (sys.stdin.read(), stop.set()), daemon=True).start()
+    pub = SnapshotPublisher(MODES, FANS, name)
+    k = 0
+    pub.publish(*values(k))
+    print('ready', flush=True)
+    while not stop.is_set():
+        k += 1
+        pub.publish(*values(k))
+        if not storm:
+            stop.wait(1.0)
+    pub.close()
+    print(k, flush=True)
+
+def runEcho() -> None:
+    # Child process: answer every request line with a snapshot
+    k = 0
+    for _ in sys.stdin:
+        k += 1
+        sys.stdout.write(repr(values(k)) + '\n')
+        sys.stdout.flush()
+
+def spawn(*args: str) -> subprocess.Popen:
+    return subprocess.Popen([sys.executable, os.path.abspath(__file__), *args], stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+
+def benchShm(storm: bool) -> None:
+    name = f'tcc-bench-{os.getpid()}-{int(storm)}'
+    proc = spawn('--writer', name, 'storm' if storm else 'slow')
+    assert proc.stdout.readline().strip() == 'ready'
+    reader = SnapshotReader(name)
+    reads = torn = 0
+    lastSeq = 0
+    t0 = time.perf_counter()
+    end = t0 + DURATION_SEC
+    while True:
+        raw = reader.readRaw()
+        reads += 1
+        if not isConsistent(raw) or raw[0] < lastSeq:
+            torn += 1
+        lastSeq = raw[0]
+        if reads & 0xFF == 0 and time.perf_counter() > end:
+            break
+    dt = time.perf_counter() - t0
+    t1 = time.perf_counter()
+    for _ in range(20000):
+        reader.read() # Unpacked into a PublishedSnapshot
+    dtRead = (time.perf_counter() - t1) / 20000
+    proc.stdin.close()
+    writes = int(proc.stdout.readline())
+    proc.wait()
+    reader.close()
+    label = 'write storm' if storm else 'writer at 1 Hz'
+    print(f'shm readRaw, {label:<14} {reads / dt:>10,.0f} reads/s   read() {1 / dtRead:>9,.0f}/s   writes {writes:>9,}   retries {reader.retries:>10,}   torn {torn}   stale {reader.staleReads}')
+    assert torn == 0, 'torn reads'
+    assert reader.staleReads <= reads * MAX_STALE_FRACTION, 'too many stale reads'
+
+def checkStaleSegment() -> None:
+    name = f'tcc-bench-{os.getpid()}-stale'
+    dead = subprocess.Popen([sys.executable, '-c', '']) # A pid that is not running any more
+    dead.wait()
+    header = json.dumps({ 'version': VERSION, 'modes': MODES, 'fans': FANS, 'sensorCount': 4, 'pid': dead.pid }).encode('utf-8')
+    stale = shared_memory.SharedMemory(name, create=True, size=1024)
+    _PREFIX.pack_into(stale.buf, 0, MAGIC, VERSION, len(header), 1016)
+    stale.buf[_HEADER_OFFSET:_HEADER_OFFSET + len(header)] = header
+    stale.close()
+    pub = SnapshotPublisher(MODES, FANS, name)
+    assert pub.header['pid'] == os.getpid()
+    try:
+        SnapshotPublisher(MODES, FANS, name)
+        assert False, 'live segment replaced'
+    except SegmentInUse as ex:
+        print(f'stale segment replaced, live one kept: {ex}')
+    pub.close()
+
+def benchPipe() -> None:
+    proc = spawn('--echo')
+    reads = 0
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < DURATION_SEC:
+        proc.stdin.write('\n')
+        proc.stdin.flush()
+        proc.stdout.readline()
+        reads += 1
+    dt = time.perf_counter() - t0
+    proc.stdin.close()
+    proc.wait()
+    print(f'pipe request/response      {reads / dt:>10,.0f} reads/s')
+
+def main() -> None:
+    if sys.argv[1:2] == ['--writer']:
+        return runWriter(sys.argv[2], sys.argv[3] == 'storm')
+    if sys.argv[1:2] == ['--echo']:
+        return runEcho()
+    checkStaleSegment()
+    benchShm(storm= False)
+    benchShm(storm= True)
+    benchPipe()
+
+if __name__ == "__main__":
+    main()
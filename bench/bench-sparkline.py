@@ -0,0 +1,99 @@
+# Offscreen benchmark: per-sample paint cost of QSparkline vs visible history width.
+# Run: python bench/bench-sparkline.py
+# Reported per width: addSample() (painting the new column into the ring buffer pixmap) and the repaint of the
+# widget (two blits of the visible area), vs a naive widget that rebuilds the full path on every sample.
+# Checks: addSample() costs the same for every width (within FLAT_RATIO), the total stays far below the naive one.
+
+import os, sys, time, math
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from PySide6 import QtGui, QtWidgets
+from GUI.QSparkline import QSparkline
+from GUI.AppColors import Colors
+
+SAMPLES = 2000
+WIDTHS = (100, 400, 1600, 3200)
+FLAT_RATIO = 1.5    # Max/min addSample() cost across the widths
+
+class NaiveSparkline(QtWidgets.QWidget):
+    # Reference: rebuilds the full path on every sample
+    def __init__(self) -> None:
+        super().__init__()
+        self._values: list[int] = []
+    def addSample(self, values) -> None:
+        self._values.append(values[0])
+        self._values = self._values[-(self.width() // 2 + 1):]
+        self.update()
+    def paintEvent(self, event) -> None:
+        painter = QtGui.QPainter(self)
+        painter.fillRect(self.rect(), QtGui.QColor(Colors.DARK_GREY.value))
+        path = QtGui.QPainterPath()
+        x = self.width() - len(self._values) * 2
+        for i, v in enumerate(self._values):
+            y = self.height() - 1 - v * (self.height() - 1) // 110
+            path.lineTo(x, y) if i else path.moveTo(x, y)
+            x += 2
+        painter.setPen(QtGui.QColor(Colors.GREEN.value))
+        painter.drawPath(path)
+        painter.end()
+
+def run(widget: QtWidgets.QWidget, app: QtWidgets.QApplication) -> tuple[float, float]:
+    # -> (addSample, repaint) us/sample
+    widget.show()
+    app.processEvents()
+    # Fill the visible history first, then measure
+    for i in range(widget.width()):
+        widget.addSample((50 + int(40 * math.sin(i / 20)), 3000))
+    app.processEvents()
+    add = paint = 0.0
+    for i in range(SAMPLES):
+        t0 = time.perf_counter()
+        widget.addSample((50 + int(40 * math.sin(i / 20)), 3000 + i % 1000))
+        t1 = time.perf_counter()
+        widget.repaint() if isinstance(widget, NaiveSparkline) else None
+        app.processEvents()
+        add += t1 - t0
+        paint += time.perf_counter() - t1
+    widget.hide()
+    return add / SAMPLES * 1e6, paint / SAMPLES * 1e6
+
+def main() -> int:
+    app = QtWidgets.QApplication([])
+    print(f"{'width px':>10} {'addSample us':>13} {'repaint us':>11} {'total us':>9} {'naive us':>9}")
+    adds, totals, naives = [], [], []
+    makeSpark = lambda: QSparkline(None, [QSparkline.Series((0, 110), Colors.GREEN.value), QSparkline.Series((0, 5500), Colors.BLUE.value)])
+    warmup = makeSpark()
+    warmup.resize(WIDTHS[0], 40)
+    run(warmup, app)
+    for w in WIDTHS:
+        spark = makeSpark()
+        spark.resize(w, 40)
+        naive = NaiveSparkline()
+        naive.resize(w, 40)
+        add, paint = run(spark, app)
+        naiveTotal = sum(run(naive, app))
+        adds.append(add)
+        totals.append(add + paint)
+        naives.append(naiveTotal)
+        print(f"{w:>10} {add:>13.1f} {paint:>11.1f} {add + paint:>9.1f} {naiveTotal:>9.1f}")
+    ok = True
+    if max(adds) > FLAT_RATIO * min(adds):
+        print(f'FAIL addSample() cost depends on the width: {min(adds):.1f}..{max(adds):.1f} us')
+        ok = False
+    if totals[-1] * 5 > naives[-1]:
+        print(f'FAIL at {WIDTHS[-1]} px not even 5x cheaper than the naive repaint')
+        ok = False
+
+    # Hidden widget must not paint at all
+    spark = QSparkline(None, [QSparkline.Series((0, 110), Colors.GREEN.value)])
+    spark.resize(1600, 40)
+    t0 = time.perf_counter()
+    for i in range(SAMPLES):
+        spark.addSample((i % 100,))
+    print(f"hidden: {(time.perf_counter() - t0) / SAMPLES * 1e6:.2f} us/sample")
+    print('OK' if ok else 'FAILED')
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+# Start-up: time from process start until the saved thermal state is applied, against the AWCC emulator.
+# Run: python bench/bench-startup.py [--runs=5]
+# Every run is a fresh process (interpreter start-up and imports included), with the saved Custom mode and fan speeds:
+#   before - the state is applied by the GUI, once it is up: Qt and the whole TCC_GUI, then the saved mode and fan speeds,
+#   after  - the fast path of tcc-g15.py: the saved state is applied right away, the GUI adopts it.
+# Reported: median time to the last control write (mode applied), time until the GUI is up, number of control writes.
+
+import os, sys, json, time, argparse, tempfile, statistics, subprocess
+BENCH = os.path.abspath(__file__)
+sys.path.insert(0, os.path.join(os.path.dirname(BENCH), "..", "src"))
+
+FAN_SPEEDS = (70, 40)
+
+def child(kind: str, stateDir: str) -> None:
+    # One app start-up, mirrors tcc-g15.py main(). Prints the control writes and the time the GUI is up (unix time)
+    from Backend.AWCCEmulator import makeEmulatedThermal
+    from Backend.ThermalState import loadThermalState, applyThermalState
+    statePath = os.path.join(stateDir, 'last-state.bin')
+    awcc, emu = makeEmulatedThermal(2, 1, clock= time.time)
+    restoredState = None
+    if kind == 'after':
+        state = loadThermalState(statePath)
+        if state is not None and applyThermalState(awcc, state):
+            restoredState = state
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6 import QtCore, QtWidgets
+    from Backend.PowerSource import StaticPowerSourceProvider
+    from GUI.AppGUI import TCC_GUI
+    from GUI.Notifications import RecordingSink
+    app = QtWidgets.QApplication([])
+    app.setQuitOnLastWindowClosed(False)
+    tcc = TCC_GUI(awcc, powerSource= StaticPowerSourceProvider(), notificationSink= RecordingSink(), statePath= statePath, restoredState= restoredState)
+    if kind == 'seed':
+        for idx, speed in enumerate(FAN_SPEEDS):
+            tcc.setFanSpeed(idx, speed)
+        tcc.setMode('Custom')
+        tcc._saveAppSettings()
+    ready = time.time()
+    state = [ tcc.getMode(), [ tcc.getFanSpeed(idx) for idx in range(len(FAN_SPEEDS)) ] ]
+    hw = [ emu.mode, list(emu.addonPercent) ]
+    QtCore.QTimer.singleShot(500, app.quit) # Let the background hardware detection finish
+    app.exec()
+    tcc._destroy()
+    writes = [ [ t, arg ] for t, method, arg in emu.log if method == 'Thermal_Control' ]
+    print('RESULT ' + json.dumps({ 'writes': writes, 'ready': ready, 'state': state, 'hw': hw }))
+
+def run(kind: str, env: dict, stateDir: str) -> dict:
+    start = time.time()
+    out = subprocess.run([ sys.executable, BENCH, f'--child={kind}', f'--state-dir={stateDir}' ], env= env, capture_output= True, text= True, check= True).stdout
+    res = json.loads(next(line for line in out.splitlines() if line.startswith('RESULT '))[7:])
+    res['applied'] = (res['writes'][-1][0] - start) * 1000 if res['writes'] else None
+    res['ready'] = (res['ready'] - start) * 1000
+    return res
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Time to the saved thermal state at start-up")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--child")
+    parser.add_argument("--state-dir")
+    args = parser.parse_args()
+    if args.child:
+        child(args.child, args.state_dir)
+        return 0
+
+    ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        # Settings and the saved state go to the temp dir
+        env = dict(os.environ, HOME= tmp, XDG_CONFIG_HOME= os.path.join(tmp, 'config'), QT_QPA_PLATFORM= 'offscreen')
+        stateDir = os.path.join(tmp, 'state')
+        run('seed', env, stateDir)
+        results = {}
+        for kind in ('before', 'after'):
+            runs = [ run(kind, env, stateDir) for _ in range(args.runs) ]
+            results[kind] = runs
+            last = runs[-1]
+            print(f"{kind:<7} mode applied {statistics.median(r['applied'] for r in runs):7.1f} ms, GUI up {statistics.median(r['ready'] for r in runs):7.1f} ms, "
+                  f"{len(last['writes'])} control writes, state {last['state']}")
+            if last['state'] != [ 'Custom', list(FAN_SPEEDS) ] or last['hw'] != [ 0, list(FAN_SPEEDS) ]:
+                print(f'FAIL {kind}: saved state not restored ({last["state"]}, hardware {last["hw"]})')
+                ok = False
+            if len(last['writes']) != 1 + len(FAN_SPEEDS):
+                print(f'FAIL {kind}: the mode and the fan speeds are not written exactly once ({len(last["writes"])} control writes)')
+                ok = False
+        before = statistics.median(r['applied'] for r in results['before'])
+        after = statistics.median(r['applied'] for r in results['after'])
+        print(f'mode applied {before / after:.1f}x sooner')
+        if after >= before:
+            ok = False
+    print('OK' if ok else 'FAILED')
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
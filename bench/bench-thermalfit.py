@@ -0,0 +1,128 @@
+# Thermal model identification against the AWCC emulator, whose model is known:
+#   C = 40 J/K, G0 = 0.5 W/K, G1 = 0.35 W/K per 1000 RPM, T_ambient = 30°C
+# Run: python bench/bench-thermalfit.py [--hours=12] [--seed=1]
+# The recording is sampled at 1 Hz like the app does (integer °C), with a random workload (5..60 W per sensor,
+# changing every 1..15 min) and random switches between Balanced, G-mode and Custom (random fan speeds).
+# Checks:
+#   - fitted rates and ambient temperature vs the emulator constants,
+#   - the heaviest fitted workload vs the real one,
+#   - the suggested Custom fan speeds, applied in the emulator under that workload, settle at or just below the targets,
+#   - fit time for a week of samples.
+
+import sys, time, argparse
+from benchutil import check
+
+import numpy as np
+from Backend.AWCCEmulator import AWCCEmulator, makeEmulatedThermal, ManualClock
+from Backend.TelemetryAnalysis import recordDtype
+from Backend.ThermalModelFit import fitSensorModels, suggestFanSpeeds
+
+MODES = ['Balanced', 'G_Mode', 'Custom']
+FANS = ['CPU', 'GPU']
+TARGETS = { 'CPU': 62, 'GPU': 60 }
+LOAD_QUANTILE = 0.99
+
+IDLE_RATE = AWCCEmulator.CONDUCTANCE_IDLE / AWCCEmulator.HEAT_CAPACITY
+RPM_RATE = AWCCEmulator.CONDUCTANCE_PER_KRPM / AWCCEmulator.HEAT_CAPACITY
+
+def workload(n: int, rng: np.random.Generator) -> np.ndarray:
+    # Piecewise constant heat input, W per second of the run
+    power = np.empty(n)
+    t = 0
+    while t < n:
+        d = int(rng.integers(60, 900))
+        power[t:t + d] = rng.uniform(5, 60)
+        t += d
+    return power
+
+def simulate(hours: float, seed: int) -> tuple[dict, np.ndarray, list[np.ndarray]]:
+    rng = np.random.default_rng(seed)
+    n = int(hours * 3600)
+    power = [ workload(n, rng) for _ in FANS ]
+    clock = ManualClock()
+    thermal, _ = makeEmulatedThermal(len(FANS), 1, clock= clock, power= lambda idx, t: power[idx][min(int(t), n - 1)])
+    header = {
+        'version': 1, 'host': 'emulator', 'modes': MODES,
+        'fans': [ { 'name': name, 'sensorIds': list(thermal.getFanRelatedSensorIds(idx)), 'failsafeTemp': 95 } for idx, name in enumerate(FANS) ],
+        'sensorCount': len(FANS),
+    }
+    rec = np.zeros(n, dtype= recordDtype(header))
+    mode, nextSwitch = 0, 0
+    for k in range(n):
+        if k >= nextSwitch:
+            mode = int(rng.choice(len(MODES), p= [ 0.5, 0.2, 0.3 ]))
+            thermal.setMode(thermal.Mode[MODES[mode]])
+            if MODES[mode] == 'Custom':
+                for idx in range(len(FANS)):
+                    thermal.setFanSpeed(idx, int(rng.integers(0, 101)))
+            nextSwitch = k + int(rng.integers(300, 1800))
+        clock.tick(1)
+        snapshot = thermal.readSnapshot()
+        rec[k] = (float(k), mode, 0, [ temps[0] for temps in snapshot.temps ], snapshot.rpms)
+    return header, rec, power
+
+def steadyTemps(speeds: list[int], heat: list[float]) -> list[float]:
+    # Emulator in the Custom mode under a constant workload, after 15 min
+    clock = ManualClock()
+    thermal, emu = makeEmulatedThermal(len(FANS), 1, clock= clock, power= lambda idx, t: heat[idx])
+    thermal.setMode(thermal.Mode.Custom)
+    for idx, speed in enumerate(speeds):
+        thermal.setFanSpeed(idx, speed)
+    clock.tick(900)
+    emu._sync()
+    return [ emu.temps[sid] for sid in sorted(emu.temps) ]
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Thermal model fit accuracy and speed")
+    parser.add_argument("--hours", type=float, default=12, help="Length of the emulated recording")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    header, rec, power = simulate(args.hours, args.seed)
+    print(f'emulated {len(rec)} samples in {time.perf_counter() - t0:.1f} s')
+
+    t0 = time.perf_counter()
+    models = fitSensorModels(header, rec)
+    print(f'fit {(time.perf_counter() - t0) * 1000:.0f} ms')
+
+    ok = True
+    heat = []
+    for idx, model in enumerate(models):
+        name = FANS[idx]
+        if not check(f'{name}: model fitted', model is not None):
+            return 1
+        print(f'  ambient {model.ambient:.2f} (30), G0/C {model.idleRate:.5f} ({IDLE_RATE:.5f}), G1/C {model.rpmRate:.5f} ({RPM_RATE:.5f}) per 1000 RPM, residual {model.residualStd:.4f} K/s')
+        ok &= check(f'{name}: ambient within 1.5°C', abs(model.ambient - AWCCEmulator.T_AMBIENT) <= 1.5)
+        ok &= check(f'{name}: G0/C within 15%', abs(model.idleRate / IDLE_RATE - 1) <= 0.15)
+        ok &= check(f'{name}: G1/C within 5%', abs(model.rpmRate / RPM_RATE - 1) <= 0.05)
+        fitted = float(np.quantile(model.heatRates, LOAD_QUANTILE)) * AWCCEmulator.HEAT_CAPACITY
+        real = float(np.quantile(power[idx], LOAD_QUANTILE))
+        print(f'  heaviest workload {fitted:.1f} W ({real:.1f} W)')
+        ok &= check(f'{name}: heaviest workload within 10%', abs(fitted / real - 1) <= 0.1)
+        heat.append(real)
+
+    suggestions = suggestFanSpeeds(header, rec, models, TARGETS, LOAD_QUANTILE)
+    speeds = [ s['speed'] for s in suggestions ]
+    temps = steadyTemps(speeds, heat)
+    lower = steadyTemps([ max(0, s - 10) for s in speeds ], heat)
+    for s, temp, lowerTemp in zip(suggestions, temps, lower):
+        print(f"  {s['name']}: target {s['target']}°C -> speed {s['speed']}, steady {temp:.1f}°C (speed - 10: {lowerTemp:.1f}°C)")
+        ok &= check(f"{s['name']}: suggested speed keeps the target", temp <= s['target'] + 1)
+        ok &= check(f"{s['name']}: suggested speed is not excessive", lowerTemp > s['target'])
+
+    # A week of samples: the emulated recording repeated
+    reps = int(np.ceil(7 * 86400 / len(rec)))
+    week = np.concatenate([ rec ] * reps)
+    week['ts'] = np.arange(len(week), dtype= np.float64)
+    t0 = time.perf_counter()
+    fitSensorModels(header, week)
+    elapsed = time.perf_counter() - t0
+    print(f'week ({len(week)} samples): fit {elapsed:.2f} s')
+    ok &= check('a week fits within 10 s', elapsed < 10)
+
+    print('OK' if ok else 'FAILED')
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
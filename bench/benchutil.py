@@ -0,0 +1,27 @@
+# Shared by the benchmarks: check reporting and the offscreen app fixture.
+# The benchmarks are run as scripts (python bench/bench-x.py), so this directory is on sys.path: `import benchutil`.
+# The app is only imported by the fixture, the benchmarks without Qt use `check` alone.
+
+import os, sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+def check(name: str, ok: bool) -> bool:
+    print(f"{'ok  ' if ok else 'FAIL'} {name}")
+    return ok
+
+def isolateSettings(tmp: str) -> None:
+    # Keep the benchmark away from the user's settings, start from the defaults
+    from PySide6 import QtCore
+    for fmt in (QtCore.QSettings.NativeFormat, QtCore.QSettings.IniFormat):
+        QtCore.QSettings.setPath(fmt, QtCore.QSettings.UserScope, tmp)
+
+def makeApp(thermal, tmp: str, settingsName: str = 'bench.ini', **kwargs):
+    # The app on a static power source, notifications recorded (unless `notificationSink` is given), settings in `tmp`
+    from PySide6 import QtCore
+    from Backend.PowerSource import StaticPowerSourceProvider
+    from GUI.AppGUI import TCC_GUI
+    from GUI.Notifications import RecordingSink
+    kwargs.setdefault('notificationSink', RecordingSink())
+    tcc = TCC_GUI(thermal, powerSource= StaticPowerSourceProvider(), **kwargs)
+    tcc.settings = QtCore.QSettings(os.path.join(tmp, settingsName), QtCore.QSettings.IniFormat)
+    return tcc
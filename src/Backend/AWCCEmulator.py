@@ -0,0 +1,142 @@
+import time
+from typing import Callable, Optional, Tuple
+
+class AWCCEmulator:
+    # Stand-in for the `AWCCWmiMethodFunction` WMI object, to be wrapped with `AWCCWmiWrapper`.
+    # Implements the known methods (Thermal_Information, GetFanSensors, Thermal_Control) on top of
+    # a first-order thermal model per sensor:
+    #   C * dT/dt = P(t) - (G0 + G1 * rpm / 1000) * (T - T_AMBIENT)
+    # Fan RPM follows its target with a first-order lag (spin-up time constant).
+    # Time is taken from `clock` (monotonic by default); pass a manual clock for deterministic runs.
+
+    FAN_ID_FIRST = 0x32
+    SENSOR_ID_FIRST = 0x01
+
+    T_AMBIENT = 30.0
+    HEAT_CAPACITY = 40.0            # C, J/K
+    CONDUCTANCE_IDLE = 0.5          # G0, W/K
+    CONDUCTANCE_PER_KRPM = 0.35     # G1, W/K per 1000 RPM
+    FAN_MAX_RPM = 5000
+    FAN_TAU_SEC = 3.0               # Fan spin-up/down time constant
+    BALANCED_CURVE = (50, 90)       # Balanced mode: RPM ramps from 0 to 80% of max between these temps
+
+    MODE_CUSTOM = 0
+    MODE_BALANCED = (0x97, 0xA0)
+    MODE_G_MODE = 0xAB
+
+    def __init__(
+        self,
+        fanCount: int = 2,
+        sensorsPerFan: int = 1,
+        power: Optional[Callable[[int, float], float]] = None,
+        clock: Callable[[], float] = time.monotonic,
+        ustt: bool = True
+    ) -> None:
+        # power(sensorIdx, t) -> heat input in watts
+        self.fanIds = tuple(self.FAN_ID_FIRST + i for i in range(fanCount))
+        self.fanSensorIds = tuple(
+            tuple(self.SENSOR_ID_FIRST + f * sensorsPerFan + s for s in range(sensorsPerFan)) for f in range(fanCount)
+        )
+        self._sensorFan = { sid: f for f, sids in enumerate(self.fanSensorIds) for sid in sids }
+        self._power = power or (lambda idx, t: 25.0)
+        self._clock = clock
+        self._ustt = ustt
+        self._t = clock()
+        self.temps = { sid: self.T_AMBIENT for sid in self._sensorFan }
+        self.rpms = [0.0] * fanCount
+        self.addonPercent = [0] * fanCount
+        self.mode = self.MODE_BALANCED[0]
+        self.callCount = 0
+        self.log: list[Tuple[float, str, int]] = []    # (t, method, arg) of every control call
+
+    # Model
+
+    def advance(self, dt: float) -> None:
+        # Integrate the model by `dt` seconds (sub-stepped for stability)
+        steps = max(1, int(dt / 0.1 + 0.5))
+        h = dt / steps
+        for _ in range(steps):
+            self._t += h
+            for f in range(len(self.fanIds)):
+                target = self._targetRPM(f)
+                self.rpms[f] += (target - self.rpms[f]) * min(1.0, h / self.FAN_TAU_SEC)
+            for sid, f in self._sensorFan.items():
+                T = self.temps[sid]
+                g = self.CONDUCTANCE_IDLE + self.CONDUCTANCE_PER_KRPM * self.rpms[f] / 1000
+                self.temps[sid] = T + h * (self._power(sid - self.SENSOR_ID_FIRST, self._t) - g * (T - self.T_AMBIENT)) / self.HEAT_CAPACITY
+
+    def _sync(self) -> None:
+        now = self._clock()
+        if now > self._t:
+            self.advance(now - self._t)
+        self._t = now
+
+    def _targetRPM(self, fanIdx: int) -> float:
+        if self.mode == self.MODE_G_MODE:
+            return self.FAN_MAX_RPM
+        hottest = max((self.temps[sid] for sid in self.fanSensorIds[fanIdx]), default=self.T_AMBIENT)
+        lo, hi = self.BALANCED_CURVE
+        curve = min(1.0, max(0.0, (hottest - lo) / (hi - lo))) * 0.8 * self.FAN_MAX_RPM
+        if self.mode == self.MODE_CUSTOM:
+            curve += self.addonPercent[fanIdx] / 100 * self.FAN_MAX_RPM
+        return min(curve, self.FAN_MAX_RPM)
+
+    # WMI methods
+
+    def Thermal_Information(self, arg: int) -> Tuple[int]:
+        self.callCount += 1
+        self._sync()
+        op, devId = arg & 0xFF, (arg >> 8) & 0xFF
+        if op == 4 and devId in self.temps:
+            return (int(round(self.temps[devId])),)
+        if devId in self.fanIds:
+            f = self.fanIds.index(devId)
+            if op == 5: return (int(round(self.rpms[f])),)
+            if op == 6: return (int(round(self.rpms[f] * 100 / self.FAN_MAX_RPM)),)
+        return (0xFFFFFFFF,)
+
+    def GetFanSensors(self, arg: int) -> Tuple[int]:
+        self.callCount += 1
+        op, fanId, idx = arg & 0xFF, (arg >> 8) & 0xFF, (arg >> 16) & 0xFF
+        if fanId not in self.fanIds:
+            return (0,) if op == 1 else (0xFFFFFFFF,)
+        sids = self.fanSensorIds[self.fanIds.index(fanId)]
+        if op == 1: return (len(sids),)
+        if op == 2 and idx < len(sids): return (sids[idx],)
+        return (0xFFFFFFFF,)
+
+    def Thermal_Control(self, arg: int) -> Tuple[int]:
+        self.callCount += 1
+        self._sync()
+        op = arg & 0xFF
+        self.log.append((self._t, 'Thermal_Control', arg))
+        if op == 1:
+            mode = (arg >> 8) & 0xFF
+            if mode == self.MODE_BALANCED[1] and not self._ustt:
+                return (0xFFFFFFFF,)
+            if mode not in (self.MODE_CUSTOM, self.MODE_G_MODE) + self.MODE_BALANCED:
+                return (0xFFFFFFFF,)
+            self.mode = mode
+            return (0,)
+        if op == 2:
+            fanId, speed = (arg >> 8) & 0xFF, (arg >> 16) & 0xFF
+            if fanId not in self.fanIds: return (0xFFFFFFFF,)
+            self.addonPercent[self.fanIds.index(fanId)] = speed
+            return (0,)
+        return (0xFFFFFFFF,)
+
+class ManualClock:
+    # Deterministic clock for the emulator
+    def __init__(self, t: float = 0.0) -> None:
+        self.t = t
+    def __call__(self) -> float:
+        return self.t
+    def tick(self, dt: float) -> None:
+        self.t += dt
+
+def makeEmulatedThermal(fanCount: int = 2, sensorsPerFan: int = 1, **kwargs):
+    # Build an `AWCCThermal` backed by the emulator. Returns (thermal, emulator)
+    from Backend.AWCCWmiWrapper import AWCCWmiWrapper
+    from Backend.AWCCThermal import AWCCThermal
+    emu = AWCCEmulator(fanCount, sensorsPerFan, **kwargs)
+    return AWCCThermal(AWCCWmiWrapper(emu)), emu
@@ -1,6 +1,7 @@
-from typing import Optional, NewType
+import threading
+from typing import Optional, NewType, Tuple
 from Backend.AWCCWmiWrapper import AWCCWmiWrapper
-from wmi import WMI # type: ignore
+from Backend.ThermalBackend import ThermalBackend, ThermalSnapshot
 
 class NoAWCCWMIClass(Exception):
     def __init__(self) -> None:
@@ -10,28 +11,65 @@ class CannotInstAWCCWMI(Exception):
     def __init__(self) -> None:
         super().__init__("Couldn't instantiate AWCC WMI class")
 
-class AWCCThermal:
-    Mode = AWCCWmiWrapper.ThermalMode
+class AWCCThermal(ThermalBackend):
+    # Windows: Alienware Control Center WMI interface
     ModeType = NewType("ModeType", AWCCWmiWrapper.ThermalMode)
-    CPUFanIdx = 0
-    GPUFanIdx = 1
 
     def __init__(self, awcc: Optional[AWCCWmiWrapper] = None) -> None:
+        # A WMI connection (COM object) is used on the thread that made it: other threads (the app's control loop)
+        # get their own connection, made on first use. A given `awcc` is used as is on any thread
+        self._ownerThreadId = threading.get_ident()
+        self._threadLocal: Optional[threading.local] = None
         if awcc is None:
-            try:
-                awccClass = WMI(namespace="root\\WMI").AWCCWmiMethodFunction
-            except Exception as ex:
-                print(ex)
-                raise NoAWCCWMIClass()
-            try:
-                awcc = AWCCWmiWrapper(awccClass()[0])
-            except Exception as ex:
-                print(ex)
-                raise CannotInstAWCCWMI()
-        self._awcc = awcc
+            awcc = self._connect()
+            self._threadLocal = threading.local()
+        self._ownerAwcc = awcc
         self._fanIdsAndRelatedSensorsIds = self._awcc.GetFanIdsAndRelatedSensorsIds()
         self._fanIds = [ id for id, _ in self._fanIdsAndRelatedSensorsIds ]
         self._sensorIds = [ id for _, ids in self._fanIdsAndRelatedSensorsIds for id in ids ]
+        self._uniqueSensorIds = list(dict.fromkeys(self._sensorIds))
+
+    @staticmethod
+    def _connect() -> AWCCWmiWrapper:
+        from wmi import WMI # type: ignore
+        try:
+            awccClass = WMI(namespace="root\\WMI").AWCCWmiMethodFunction
+        except Exception as ex:
+            print(ex)
+            raise NoAWCCWMIClass()
+        try:
+            return AWCCWmiWrapper(awccClass()[0])
+        except Exception as ex:
+            print(ex)
+            raise CannotInstAWCCWMI()
+
+    @property
+    def _awcc(self) -> AWCCWmiWrapper:
+        local = self._threadLocal
+        if local is None or threading.get_ident() == self._ownerThreadId:
+            return self._ownerAwcc
+        awcc = getattr(local, 'awcc', None)
+        if awcc is None:
+            import pythoncom # type: ignore
+            pythoncom.CoInitialize()
+            awcc = local.awcc = self._connect()
+        return awcc
+
+    def getFanCount(self) -> int:
+        return len(self._fanIds)
+
+    def getFanRelatedSensorIds(self, fanIdx: int) -> Tuple[int, ...]:
+        if fanIdx >= len(self._fanIdsAndRelatedSensorsIds):
+            return ()
+        return self._fanIdsAndRelatedSensorsIds[fanIdx][1]
+
+    def readSnapshot(self) -> ThermalSnapshot:
+        # Read every sensor (once, even if shared between fans) and every fan in one pass
+        temps = { sensorId: self._awcc.GetSensorTemperature(sensorId) for sensorId in self._uniqueSensorIds }
+        return ThermalSnapshot(
+            tuple(tuple(temps[sensorId] for sensorId in ids) for _, ids in self._fanIdsAndRelatedSensorsIds),
+            tuple(self._awcc.GetFanRPM(fanId) for fanId in self._fanIds)
+        )
 
     def getAllTemp(self) -> list[Optional[int]]:
         return [ self._awcc.GetSensorTemperature(sensorId) for sensorId in self._sensorIds ]
@@ -48,7 +86,7 @@ class AWCCThermal:
 
 
     def getFanRelatedTemp(self, fanIdx: int) -> Optional[int]:
-        if fanIdx >= len(self._fanIdsAndRelatedSensorsIds):
+        if fanIdx >= len(self._fanIdsAndRelatedSensorsIds) or not self._fanIdsAndRelatedSensorsIds[fanIdx][1]:
             return None
         return self._awcc.GetSensorTemperature(self._fanIdsAndRelatedSensorsIds[fanIdx][1][0])
 
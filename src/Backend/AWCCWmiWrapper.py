@@ -1,6 +1,7 @@
 from enum import Enum
-from typing import Optional, Tuple, Union
-from wmi import _wmi_object # type: ignore
+from typing import TYPE_CHECKING, Optional, Tuple
+if TYPE_CHECKING:
+    from wmi import _wmi_object # type: ignore
 
 class AWCCWmiWrapper:
     SENSOR_ID_FIRST = 0x01
@@ -13,10 +14,10 @@ class AWCCWmiWrapper:
         Balanced = 0x97
         G_Mode = 0xAB
 
-    _balancedModePatch = None # type: Optional[Union[False, int]]
+    _balancedModePatch = None # type: bool | int | None
     _USTT_Balanced = 0xA0
 
-    def __init__(self, awcc: _wmi_object) -> None:
+    def __init__(self, awcc: "_wmi_object") -> None:
         self._awcc = awcc
 
     def GetSensorTemperature(self, sensorId: int) -> Optional[int]:
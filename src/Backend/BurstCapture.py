@@ -0,0 +1,128 @@
+import os, json, time, struct, socket
+from collections import deque
+from typing import Any, Optional, Sequence
+from Backend.TelemetryRecorder import VERSION, FLAG_FAILSAFE_TRIPPED
+
+# Burst capture file (*.tccb): one fail-safe event. Same layout as a telemetry file (see TelemetryRecorder),
+# with its own magic, so TelemetryAnalysis.loadFile() reads it too. The header additionally has:
+#   "trigger": { "ts": float, "reason": str }   - the trigger that started the capture
+#   "events": [[ts, "trigger", reason] | [ts, "mode", mode] | [ts, "fan", fanIdx, speed], ...]
+#             - triggers, mode switches and fan speed writes during the capture, in time order
+#   "preTriggerSec", "postTriggerSec"
+
+MAGIC = b'TCCB'
+FILE_EXT = '.tccb'
+
+class BurstCapture:
+    # Oscilloscope-style capture around fail-safe events. The samples and events of the last `preTriggerSec` are
+    # kept in a ring buffer. trigger() freezes it, and everything is captured until `postTriggerSec` after the
+    # last trigger or hold() (but no longer than `maxCaptureSec` in total); then the capture is written to a file.
+    # Sampling faster while isCapturing() is up to the caller.
+
+    def __init__(self, directory: str, modes: Sequence[str], preTriggerSec: float = 30, postTriggerSec: float = 30, maxCaptureSec: float = 300) -> None:
+        self._dir = directory
+        self._modes = list(modes)
+        self.preTriggerSec = preTriggerSec
+        self.postTriggerSec = postTriggerSec
+        self.maxCaptureSec = maxCaptureSec
+        self._header: Optional[dict[str, Any]] = None
+        self._struct: Optional[struct.Struct] = None
+        self._samples: deque = deque()  # (ts, mode index, flags, temps, rpms)
+        self._events: deque = deque()   # (ts, kind, *args)
+        self._trigger: Optional[dict[str, Any]] = None
+        self._endTs: Optional[float] = None
+        os.makedirs(directory, exist_ok=True)
+
+    def setTopology(self, fans: Sequence[dict[str, Any]]) -> None:
+        # fans: same as TelemetryRecorder.setTopology(). Samples of the old topology are dropped (or saved, if captured)
+        header = {
+            'version': VERSION,
+            'host': socket.gethostname(),
+            'modes': self._modes,
+            'fans': [ dict(f) for f in fans ],
+            'sensorCount': sum(len(f['sensorIds']) for f in fans),
+        }
+        if header == self._header:
+            return
+        if self.isCapturing():
+            self._save()
+        self._samples.clear()
+        self._header = header
+        self._struct = struct.Struct(f"<dBB{header['sensorCount']}h{len(fans)}h")
+
+    def isCapturing(self) -> bool:
+        return self._endTs is not None
+
+    def trigger(self, ts: float, reason: str) -> bool:
+        # Returns True if a new capture has started (a trigger during a capture extends it)
+        self._events.append((ts, 'trigger', reason))
+        if self._endTs is not None:
+            self.hold(ts)
+            return False
+        self._trigger = { 'ts': ts, 'reason': reason }
+        self._endTs = min(ts + self.postTriggerSec, ts + self.maxCaptureSec)
+        return True
+
+    def hold(self, ts: float) -> None:
+        # Keeps the capture in progress (if any) going until `postTriggerSec` after `ts`
+        if self._endTs is not None:
+            self._endTs = min(max(self._endTs, ts + self.postTriggerSec), self._trigger['ts'] + self.maxCaptureSec)
+
+    def noteEvent(self, ts: float, kind: str, *args: Any) -> None:
+        self._events.append((ts, kind, *args))
+
+    def add(self, ts: float, mode: str, failsafeTripped: bool, temps: Sequence[Optional[int]], rpms: Sequence[Optional[int]]) -> Optional[str]:
+        # Called on every sample. Returns the file path when a capture has just been saved
+        if self._struct is None:
+            return None
+        self._samples.append((ts, self._modes.index(mode), FLAG_FAILSAFE_TRIPPED if failsafeTripped else 0, tuple(temps), tuple(rpms)))
+        if self._endTs is None:
+            startTs = ts - self.preTriggerSec
+            while self._samples[0][0] < startTs:
+                self._samples.popleft()
+            while self._events and self._events[0][0] < startTs:
+                self._events.popleft()
+            return None
+        if ts >= self._endTs:
+            return self._save()
+        return None
+
+    def close(self) -> Optional[str]:
+        # Saves the capture in progress, if any
+        return self._save() if self.isCapturing() else None
+
+    def _save(self) -> Optional[str]:
+        trigger = self._trigger
+        startTs = trigger['ts'] - self.preTriggerSec
+        clamp = lambda v: -1 if v is None else max(-1, min(v, 0x7FFF))
+        records = b''.join(
+            self._struct.pack(ts, mode, flags, *map(clamp, temps), *map(clamp, rpms))
+            for ts, mode, flags, temps, rpms in self._samples if ts >= startTs
+        )
+        header = dict(
+            self._header,
+            trigger= trigger,
+            events= [ list(e) for e in sorted(self._events, key= lambda e: e[0]) if e[0] >= startTs ],
+            preTriggerSec= self.preTriggerSec,
+            postTriggerSec= self.postTriggerSec,
+        )
+        self._trigger = None    # The samples stay in the ring buffer, as the pre-trigger part of the next capture
+        self._endTs = None
+
+        base = os.path.join(self._dir, f"burst-{time.strftime('%Y%m%d-%H%M%S', time.localtime(trigger['ts']))}")
+        suffix = 0
+        try:
+            while True:
+                path = base + (f'-{suffix}' if suffix else '') + FILE_EXT
+                try:
+                    f = open(path, 'xb')
+                    break
+                except FileExistsError:
+                    suffix += 1
+            with f:
+                headerBytes = json.dumps(header).encode('utf-8')
+                f.write(MAGIC + struct.pack('<I', len(headerBytes)) + headerBytes + records)
+        except OSError as ex:
+            print(f'Burst capture write failed: {ex}')
+            return None
+        return path
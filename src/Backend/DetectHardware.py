@@ -1,11 +1,11 @@
 from typing import Optional
-from wmi import WMI # type: ignore
 
 class DetectHardware:
     CPUFanIdx = 0
     GPUFanIdx = 1
 
     def __init__(self) -> None:
+        from wmi import WMI # type: ignore
         self._wmi = WMI()
 
     def getHardwareName(self, fanIdx: int) -> Optional[str]:
@@ -0,0 +1,68 @@
+from typing import Literal, Optional, Sequence
+from Backend.StreamStats import WindowSlope
+
+class FailsafeTrigger:
+    # Decides when the fail-safe trips and when it may be reset (switching the modes is up to the caller).
+    #   Reactive:   a temperature has been at/above its threshold (or unreadable) for longer than `triggerDelaySec`.
+    #   Predictive: (optional) the least-squares trend of a temperature reaches its threshold within `horizonSec`,
+    #               i.e. G-mode is switched on early enough for the fans to spin up before the threshold is hit.
+    # Reset: no temperature has been high (or predicted to get high) for `resetAfterSec`.
+    # `imminent` (updated on every sample, regardless of `predictive`): a temperature is high, or is rising within
+    # `armMarginC` of its threshold - a trip may follow soon.
+
+    def __init__(self, triggerDelaySec: float, resetAfterSec: float, horizonSec: float, armMarginC: float = 5, minRiseRate: float = 0.25, minSamples: int = 4) -> None:
+        self.triggerDelaySec = triggerDelaySec
+        self.resetAfterSec = resetAfterSec
+        self.horizonSec = horizonSec
+        self.armMarginC = armMarginC            # Only trends this close to the threshold are extrapolated: a linear fit
+                                                # of a warm-up from idle overshoots where the temperature would settle
+        self.minRiseRate = minRiseRate          # °C/s, flatter trends never trip (noise near the threshold)
+        self.minSamples = minSamples
+        self.predictive = False
+        self.imminent = False
+        self.lastHighTs = 0.0                   # Last time a temp was (or was predicted to get) high, 0 - never
+        self._highStartTs: Optional[float] = None   # Time when the temp first registered to be high (without going lower than the threshold)
+
+    def reset(self) -> None:
+        self.lastHighTs = 0.0
+        self.imminent = False
+        self._highStartTs = None
+
+    def update(
+        self,
+        now: float,
+        temps: Sequence[Optional[int]],
+        thresholds: Sequence[int],
+        trends: Sequence[Optional[WindowSlope]] = ()
+    ) -> Optional[Literal['reactive', 'predictive']]:
+        # Called on every sample. Returns the reason if the fail-safe should trip now
+        tempIsHigh = any((temp is None) or (temp >= threshold) for temp, threshold in zip(temps, thresholds))
+        predictedHigh = self.predictive and any(self._predictsHigh(trend, threshold) for trend, threshold in zip(trends, thresholds))
+        self.imminent = tempIsHigh or predictedHigh or any(
+            temp is not None and temp >= threshold - self.armMarginC and self._isRising(trend)
+            for temp, threshold, trend in zip(temps, thresholds, trends)
+        )
+
+        if tempIsHigh or predictedHigh:
+            self.lastHighTs = now
+        self._highStartTs = (self._highStartTs or now) if tempIsHigh else None
+
+        if tempIsHigh and now - self._highStartTs > self.triggerDelaySec:
+            return 'reactive'
+        if predictedHigh:
+            return 'predictive'
+        return None
+
+    def canReset(self, now: float) -> bool:
+        return now - self.lastHighTs > self.resetAfterSec
+
+    def _isRising(self, trend: Optional[WindowSlope]) -> bool:
+        if trend is None or trend.count() < self.minSamples:
+            return False
+        slope = trend.slope()
+        return slope is not None and slope >= self.minRiseRate
+
+    def _predictsHigh(self, trend: Optional[WindowSlope], threshold: int) -> bool:
+        if not self._isRising(trend) or trend.project(0) < threshold - self.armMarginC:
+            return False
+        return trend.project(self.horizonSec) >= threshold
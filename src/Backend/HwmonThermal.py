@@ -0,0 +1,239 @@
+import os, re
+from typing import Optional, Tuple
+from Backend.ThermalBackend import ThermalBackend, ThermalSnapshot
+
+class NoHwmonDevice(Exception):
+    def __init__(self, root: str) -> None:
+        super().__init__(f"No supported fan hwmon device found in {root}")
+
+class HwmonThermal(ThermalBackend):
+    # Linux: fans and temperatures of the Dell/Alienware hwmon devices (/sys/class/hwmon/hwmonN),
+    # thermal mode via the ACPI platform profile (/sys/firmware/acpi/platform_profile).
+    #   fanN_input  - RPM                       tempN_input - millidegrees Celsius
+    #   fanN_label  - "CPU Fan", "Video Fan"... tempN_label - "CPU", "GPU"...
+    #   fanN_boost (alienware-wmi) or pwmN (dell-smm) - 0..255, used for the Custom mode speed. fanN_boost is added
+    #   on top of the firmware's fan curve, like the AWCC speed. pwmN is not: it is an absolute duty, honoured in
+    #   manual control only (pwmN_enable = 1), which turns the firmware's curve off. So on pwmN the app's speed
+    #   means something else: 0 keeps the fan under automatic control (2), anything above sets a fixed duty of
+    #   at least PWM_MANUAL_MIN, so the fan never stops while the firmware is not watching the temperature.
+    #   Automatic control is also restored when leaving the Custom mode and on close()
+    # Without a platform profile (or without the profile a mode maps to, e.g. dell-smm only) the mode is not
+    # switched in the firmware: Balanced and G-mode only put the fans back under automatic control.
+    # The attribute files are opened once and re-read with pread() (sysfs regenerates the value
+    # on every read at offset 0), so a snapshot costs one syscall per attribute and no path lookups.
+    # Sensor ids are the hwmon temp indexes (N of tempN_input).
+
+    SUPPORTED_DEVICES = ('alienware_wmi', 'dell_smm', 'dell_ddv')
+    PROFILES = { # Mode name -> platform profile choices, in order of preference
+        'Balanced': ('balanced',),
+        'G_Mode': ('performance', 'balanced-performance'),
+        'Custom': ('custom', 'balanced'),
+    }
+    FAN_SPEED_MAX = 255
+    SPEED_PERCENT_MAX = 120 # Full range of the app's speed (AWCC additional speed, percent)
+    PWM_MANUAL_MIN = 128    # Lowest manual pwmN duty (dell-smm fans: 0 off, 128 low, 255 high)
+    PWM_ENABLE_MANUAL = '1'
+    PWM_ENABLE_AUTO = '2'
+    READ_SIZE = 32
+
+    def __init__(self, sysfsRoot: str = '/sys') -> None:
+        hwmonRoot = os.path.join(sysfsRoot, 'class', 'hwmon')
+        self._dir = self._findDevice(hwmonRoot)
+        if self._dir is None:
+            raise NoHwmonDevice(hwmonRoot)
+        self._profilePath = os.path.join(sysfsRoot, 'firmware', 'acpi', 'platform_profile')
+        self._profileChoices = self._readText(self._profilePath + '_choices', '').split()
+
+        fanIdxs = self._attrIndexes('fan', 'input')
+        tempIdxs = self._attrIndexes('temp', 'input')
+        tempKinds = { idx: self._kind(self._readText(self._attr('temp', idx, 'label'), '')) for idx in tempIdxs }
+        fans = []
+        for idx in fanIdxs:
+            kind = self._kind(self._readText(self._attr('fan', idx, 'label'), ''))
+            if kind is not None:
+                sensors = tuple(t for t in tempIdxs if tempKinds[t] == kind)
+            else: # Unlabeled fan: assume fanN is cooled by tempN
+                sensors = (idx,) if idx in tempKinds else ()
+            fans.append((kind, idx, sensors))
+        # CPU fan first, GPU fan second (see CPUFanIdx, GPUFanIdx), then the rest in hwmon order
+        fans.sort(key= lambda f: (0 if f[0] == 'cpu' else 1 if f[0] == 'gpu' else 2, f[1]))
+        self._fanIdsAndRelatedSensorsIds = [ (idx, sensors) for _, idx, sensors in fans ]
+        self._fanIds = [ idx for idx, _ in self._fanIdsAndRelatedSensorsIds ]
+        self._sensorIds = [ id for _, ids in self._fanIdsAndRelatedSensorsIds for id in ids ]
+        self._uniqueSensorIds = list(dict.fromkeys(self._sensorIds))
+
+        self._manualFanIds: set[int] = set() # pwmN_enable switched to manual by us
+        # Keep the attribute files open for the lifetime of the backend
+        self._tempFds = { id: self._open(self._attr('temp', id, 'input')) for id in self._uniqueSensorIds }
+        self._fanFds = { id: self._open(self._attr('fan', id, 'input')) for id in self._fanIds }
+        self._speedPaths = { id: self._speedAttr(id) for id in self._fanIds }
+        self._enablePaths = { id: self._enableAttr(path) for id, path in self._speedPaths.items() }
+
+    def close(self) -> None:
+        self._restoreAutomatic(list(self._manualFanIds))
+        for fd in list(self._tempFds.values()) + list(self._fanFds.values()):
+            if fd is not None:
+                os.close(fd)
+        self._tempFds.clear()
+        self._fanFds.clear()
+
+    def __del__(self) -> None:
+        if hasattr(self, '_tempFds'):
+            self.close()
+
+    # Topology
+
+    def getFanCount(self) -> int:
+        return len(self._fanIds)
+
+    def getFanRelatedSensorIds(self, fanIdx: int) -> Tuple[int, ...]:
+        if fanIdx >= len(self._fanIdsAndRelatedSensorsIds):
+            return ()
+        return self._fanIdsAndRelatedSensorsIds[fanIdx][1]
+
+    # Reads
+
+    def readSnapshot(self) -> ThermalSnapshot:
+        # Every sensor (once, even if shared between fans) and every fan in one pass
+        temps = { id: self._readTemp(fd) for id, fd in self._tempFds.items() }
+        return ThermalSnapshot(
+            tuple(tuple(temps[id] for id in ids) for _, ids in self._fanIdsAndRelatedSensorsIds),
+            tuple(self._readInt(self._fanFds[id]) for id in self._fanIds)
+        )
+
+    def getAllTemp(self) -> list[Optional[int]]:
+        return [ self._readTemp(self._tempFds[id]) for id in self._sensorIds ]
+
+    def getAllFanRPM(self) -> list[Optional[int]]:
+        return [ self._readInt(self._fanFds[id]) for id in self._fanIds ]
+
+    def getFanRelatedTemp(self, fanIdx: int) -> Optional[int]:
+        ids = self.getFanRelatedSensorIds(fanIdx)
+        return self._readTemp(self._tempFds[ids[0]]) if ids else None
+
+    def getFanRPM(self, fanIdx: int) -> Optional[int]:
+        if fanIdx >= len(self._fanIds):
+            return None
+        return self._readInt(self._fanFds[self._fanIds[fanIdx]])
+
+    # Control
+
+    def setFanSpeed(self, fanIdx: int, speed: int) -> bool:
+        if fanIdx >= len(self._fanIds):
+            return False
+        fanId = self._fanIds[fanIdx]
+        path = self._speedPaths[fanId]
+        if path is None:
+            return False
+        value = min(self.FAN_SPEED_MAX, max(0, speed * self.FAN_SPEED_MAX // self.SPEED_PERCENT_MAX))
+        enable = self._enablePaths[fanId]
+        if enable is not None:
+            if value == 0: # Keep the firmware's curve
+                return self._restoreAutomatic([ fanId ])
+            value = max(value, self.PWM_MANUAL_MIN)
+            if fanId not in self._manualFanIds:
+                if not self._write(enable, self.PWM_ENABLE_MANUAL):
+                    return False
+                self._manualFanIds.add(fanId)
+        return self._write(path, str(value))
+
+    def setMode(self, mode: ThermalBackend.Mode) -> bool:
+        if mode != self.Mode.Custom:
+            self._restoreAutomatic(list(self._manualFanIds))
+        for profile in self.PROFILES[mode.name]:
+            if profile in self._profileChoices:
+                return self._write(self._profilePath, profile)
+        return True # No profile to switch to: the fans are under automatic control (Custom: set by setFanSpeed())
+
+    def _restoreAutomatic(self, fanIds: list[int]) -> bool:
+        res = True
+        for fanId in fanIds:
+            if fanId not in self._manualFanIds:
+                continue
+            if self._write(self._enablePaths[fanId], self.PWM_ENABLE_AUTO):
+                self._manualFanIds.discard(fanId)
+            else:
+                res = False
+        return res
+
+    # sysfs helpers
+
+    def _findDevice(self, hwmonRoot: str) -> Optional[str]:
+        try:
+            entries = sorted(os.listdir(hwmonRoot))
+        except OSError:
+            return None
+        found = {}
+        for entry in entries:
+            path = os.path.join(hwmonRoot, entry)
+            name = self._readText(os.path.join(path, 'name'), '')
+            if name in self.SUPPORTED_DEVICES and name not in found and any(re.fullmatch(r'fan\d+_input', a) for a in os.listdir(path)):
+                found[name] = path
+        return next((found[name] for name in self.SUPPORTED_DEVICES if name in found), None)
+
+    def _attr(self, kind: str, idx: int, attr: str) -> str:
+        return os.path.join(self._dir, f'{kind}{idx}_{attr}')
+
+    def _attrIndexes(self, kind: str, attr: str) -> list[int]:
+        pattern = re.compile(rf'{kind}(\d+)_{attr}')
+        return sorted(int(m.group(1)) for m in map(pattern.fullmatch, os.listdir(self._dir)) if m)
+
+    def _speedAttr(self, fanId: int) -> Optional[str]:
+        for path in (self._attr('fan', fanId, 'boost'), os.path.join(self._dir, f'pwm{fanId}')):
+            if os.path.exists(path):
+                return path
+        return None
+
+    @staticmethod
+    def _enableAttr(speedPath: Optional[str]) -> Optional[str]:
+        # pwmN_enable of a pwmN speed attribute (fanN_boost has none)
+        if speedPath is None or not re.fullmatch(r'pwm\d+', os.path.basename(speedPath)):
+            return None
+        path = speedPath + '_enable'
+        return path if os.path.exists(path) else None
+
+    @staticmethod
+    def _kind(label: str) -> Optional[str]:
+        label = label.lower()
+        if 'cpu' in label or 'processor' in label: return 'cpu'
+        if 'gpu' in label or 'video' in label: return 'gpu'
+        return None
+
+    @staticmethod
+    def _open(path: str) -> Optional[int]:
+        try:
+            return os.open(path, os.O_RDONLY)
+        except OSError:
+            return None
+
+    @classmethod
+    def _readInt(cls, fd: Optional[int]) -> Optional[int]:
+        if fd is None:
+            return None
+        try:
+            return int(os.pread(fd, cls.READ_SIZE, 0))
+        except (OSError, ValueError):
+            return None
+
+    @classmethod
+    def _readTemp(cls, fd: Optional[int]) -> Optional[int]:
+        milli = cls._readInt(fd)
+        return (milli + 500) // 1000 if milli is not None else None
+
+    @staticmethod
+    def _readText(path: str, default: str) -> str:
+        try:
+            with open(path) as f:
+                return f.read().strip()
+        except OSError:
+            return default
+
+    @staticmethod
+    def _write(path: str, value: str) -> bool:
+        try:
+            with open(path, 'w') as f:
+                f.write(value)
+            return True
+        except OSError as ex:
+            print(f'Failed to write {path}: {ex}')
+            return False
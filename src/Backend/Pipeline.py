@@ -0,0 +1,168 @@
+import time, threading
+from collections import deque
+from typing import Any, Callable, Optional
+from Backend.SelfProfiler import SelfProfiler
+
+# Stages of the acquisition loop connected by bounded queues:
+#   - immediate stages run as soon as an item arrives, in the producer's call (control path),
+#   - deferred stages are scheduled once through `defer` (e.g. a single-shot timer) and drain their queue
+#     when the event loop gets to them. A deferred stage with `maxDuty` is scheduled no more often than it
+#     keeps its share of the wall time under that fraction, so when it gets slow the producer keeps its pace
+#     (and a latest-wins queue drops the items in between) instead of every tick waiting for it.
+# Queues are either latest-wins (a slow consumer drops stale items: rendering) or guaranteed (no item is
+# dropped: when the queue is full the producer runs the consumer first, i.e. backpressure).
+# The producer may run on another thread than the event loop behind `defer` (the app's control thread feeds
+# the GUI thread, see TCC_GUI): `defer` must then be callable from the producer's thread, a stage's queue is
+# guarded by its own lock (held only to put or take an item, never while an item is processed), and its runs
+# are serialized, so backpressure on the producer's thread and the scheduled run never overlap. A run only
+# drains the items queued when it starts: items the producer keeps pushing meanwhile are left to the next run
+# (scheduled when this one ends, a single pending run at a time) so the event loop is never monopolized.
+
+class StageQueue:
+    def __init__(self, capacity: int, latestWins: bool) -> None:
+        self.capacity = max(1, capacity)
+        self.latestWins = latestWins
+        self._items: deque = deque(maxlen=self.capacity if latestWins else None)
+        self.maxDepth = 0
+        self.dropped = 0    # Latest-wins: items replaced before they were consumed
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def put(self, item: Any) -> bool:
+        # False if a guaranteed queue is full
+        items = self._items
+        if len(items) >= self.capacity:
+            if not self.latestWins:
+                return False
+            self.dropped += 1
+        items.append(item)
+        if len(items) > self.maxDepth:
+            self.maxDepth = len(items)
+        return True
+
+    def take(self) -> Any:
+        return self._items.popleft()
+
+class PipelineStage:
+    # `fn(item)` processes one item; whatever it returns (if not None) is passed on to the connected stages
+    def __init__(self, pipeline: "Pipeline", name: str, fn: Callable[[Any], Any], queue: StageQueue, deferred: bool, maxDuty: Optional[float]) -> None:
+        self.name = name
+        self.queue = queue
+        self.deferred = deferred
+        self.maxDuty = maxDuty
+        self._pipeline = pipeline
+        self._fn = fn
+        self._outputs: list["PipelineStage"] = []
+        self._queueLock = threading.Lock()
+        self._runLock = threading.Lock()
+        self._scheduled = False     # A single pending run at a time
+        self._lastRunEnd = 0.0
+        self._lastRunTime = 0.0
+        self.runs = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.backpressure = 0   # Times the producer had to run this stage because its queue was full
+
+    def connect(self, *stages: "PipelineStage") -> "PipelineStage":
+        self._outputs.extend(stages)
+        return self
+
+    def push(self, item: Any) -> None:
+        while True:
+            with self._queueLock:
+                if self.queue.put(item):
+                    schedule = self.deferred and not self._scheduled and not self._pipeline.closed
+                    if schedule:
+                        self._scheduled = True
+                    break
+            self.backpressure += 1
+            self.run()
+        if not self.deferred:
+            self.run()
+        elif schedule:
+            self._schedule()
+
+    def _schedule(self) -> None:
+        # Every deferred run wakes the event loop up
+        if self._pipeline.profiler is not None:
+            self._pipeline.profiler.wakeup()
+        delaySec = 0.0
+        if self.maxDuty:
+            delaySec = self._lastRunEnd + self._lastRunTime * (1 / self.maxDuty - 1) - time.perf_counter()
+        self._pipeline.defer(self._runScheduled, max(0, int(delaySec * 1000)))
+
+    def _runScheduled(self) -> None:
+        if not self._pipeline.closed:
+            self.run()
+        # Items pushed during the run are left to the next one
+        with self._queueLock:
+            self._scheduled = len(self.queue) > 0 and not self._pipeline.closed
+            schedule = self._scheduled
+        if schedule:
+            self._schedule()
+
+    def _take(self) -> tuple[bool, Any]:
+        with self._queueLock:
+            if not len(self.queue):
+                return False, None
+            return True, self.queue.take()
+
+    def run(self) -> None:
+        profiler = self._pipeline.profiler
+        with self._runLock:
+            start = time.perf_counter()
+            with self._queueLock:
+                count = len(self.queue)
+            for _ in range(count):
+                ok, item = self._take()
+                if not ok:
+                    break
+                t0 = time.perf_counter()
+                out = self._fn(item)
+                dt = time.perf_counter() - t0
+                self.runs += 1
+                self.total += dt
+                if dt > self.max: self.max = dt
+                if profiler is not None:
+                    profiler.addStageTime(self.name, dt)
+                if out is not None:
+                    for stage in self._outputs:
+                        stage.push(out)
+            self._lastRunEnd = time.perf_counter()
+            self._lastRunTime = self._lastRunEnd - start
+
+class Pipeline:
+    def __init__(self, defer: Callable[[Callable[[], None], int], None], profiler: Optional[SelfProfiler] = None) -> None:
+        # defer(fn, delayMs) - call fn() from the event loop after delayMs (callable from the producer's thread)
+        self.defer = defer
+        self.profiler = profiler
+        self.closed = False
+        self.stages: list[PipelineStage] = []
+
+    def stage(self, name: str, fn: Callable[[Any], Any], capacity: int = 1, latestWins: bool = False, deferred: bool = False, maxDuty: Optional[float] = None) -> PipelineStage:
+        stage = PipelineStage(self, name, fn, StageQueue(capacity, latestWins), deferred, maxDuty)
+        self.stages.append(stage)
+        return stage
+
+    def flush(self) -> None:
+        # Drain every queue now (in stage order), e.g. before shutdown so guaranteed items are not lost
+        for stage in self.stages:
+            stage.run()
+
+    def close(self) -> None:
+        self.flush()
+        self.closed = True
+
+    def summary(self) -> str:
+        ms = lambda v: f'{v * 1000:.2f}'
+        lines = ["Pipeline:"]
+        for st in self.stages:
+            q = st.queue
+            line = f"  {st.name}: avg {ms(st.total / st.runs) if st.runs else '-'} ms    max {ms(st.max)} ms    (x{st.runs})    queue {len(q)}/{q.capacity} (max {q.maxDepth})"
+            if q.latestWins:
+                line += f"    dropped {q.dropped}"
+            elif st.backpressure:
+                line += f"    backpressure {st.backpressure}"
+            lines.append(line)
+        return '\n'.join(lines)
@@ -0,0 +1,85 @@
+import os, sys
+from enum import Enum
+from typing import Optional
+
+class PowerSource(Enum):
+    AC = 'AC'
+    Battery = 'Battery'
+    Unknown = 'Unknown'
+
+class PowerSourceProvider:
+    # Interface. Called once per tick, implementations must be cheap
+    def getPowerSource(self) -> PowerSource:
+        raise NotImplementedError()
+
+class StaticPowerSourceProvider(PowerSourceProvider):
+    # Mock / manual override
+    def __init__(self, source: PowerSource = PowerSource.AC) -> None:
+        self.source = source
+
+    def getPowerSource(self) -> PowerSource:
+        return self.source
+
+class WindowsPowerSourceProvider(PowerSourceProvider):
+    # GetSystemPowerStatus(), ACLineStatus: 0 - offline, 1 - online, 255 - unknown
+    def __init__(self) -> None:
+        import ctypes
+        from ctypes import wintypes
+        class SYSTEM_POWER_STATUS(ctypes.Structure):
+            _fields_ = [
+                ('ACLineStatus', wintypes.BYTE),
+                ('BatteryFlag', wintypes.BYTE),
+                ('BatteryLifePercent', wintypes.BYTE),
+                ('SystemStatusFlag', wintypes.BYTE),
+                ('BatteryLifeTime', wintypes.DWORD),
+                ('BatteryFullLifeTime', wintypes.DWORD),
+            ]
+        self._status = SYSTEM_POWER_STATUS()
+        self._statusRef = ctypes.byref(self._status)
+        self._getSystemPowerStatus = ctypes.windll.kernel32.GetSystemPowerStatus
+
+    def getPowerSource(self) -> PowerSource:
+        if not self._getSystemPowerStatus(self._statusRef):
+            return PowerSource.Unknown
+        line = self._status.ACLineStatus & 0xFF
+        return PowerSource.AC if line == 1 else PowerSource.Battery if line == 0 else PowerSource.Unknown
+
+class SysfsPowerSourceProvider(PowerSourceProvider):
+    # Linux: /sys/class/power_supply/<name>/online of the "Mains" supplies
+    def __init__(self, root: str = '/sys/class/power_supply') -> None:
+        self._onlineFiles: list[str] = []
+        try:
+            names = sorted(os.listdir(root))
+        except OSError:
+            return
+        for name in names:
+            # An unreadable entry (no 'type', permissions) is skipped, the others are still discovered
+            try:
+                with open(os.path.join(root, name, 'type')) as f:
+                    if f.read().strip() == 'Mains':
+                        self._onlineFiles.append(os.path.join(root, name, 'online'))
+            except OSError:
+                continue
+
+    def getPowerSource(self) -> PowerSource:
+        if not self._onlineFiles:
+            return PowerSource.Unknown
+        for path in self._onlineFiles:
+            try:
+                with open(path) as f:
+                    if f.read().strip() == '1':
+                        return PowerSource.AC
+            except OSError:
+                return PowerSource.Unknown
+        return PowerSource.Battery
+
+def makePowerSourceProvider() -> Optional[PowerSourceProvider]:
+    # Best available provider for this OS, None if there is none
+    try:
+        if sys.platform == 'win32':
+            return WindowsPowerSourceProvider()
+        if sys.platform.startswith('linux'):
+            return SysfsPowerSourceProvider()
+    except Exception as ex:
+        print(f'Power source provider is not available: {ex}')
+    return None
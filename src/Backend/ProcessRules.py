@@ -0,0 +1,58 @@
+import json, time
+from typing import Callable, Mapping, NamedTuple, Optional, Sequence
+from Backend.ProcessScanner import normalizeExeName
+
+class ProcessRule(NamedTuple):
+    exe: str                    # Normalized executable name (see normalizeExeName)
+    mode: str                   # ThermalMode value: "Balanced", "G_Mode" or "Custom"
+    fanSpeeds: dict[str, int]   # Unit name (lower case, e.g. "cpu", "gpu", "fan 3") -> fan speed, for the Custom mode
+
+def loadProcessRules(path: str, modes: Sequence[str]) -> list[ProcessRule]:
+    # JSON list, the first rule with a running executable wins:
+    #   [ { "exe": "game.exe", "mode": "G_Mode" },
+    #     { "exe": "blender", "mode": "Custom", "fanSpeeds": { "CPU": 80, "GPU": 60 } } ]
+    with open(path, encoding='utf-8') as f:
+        items = json.load(f)
+    if not isinstance(items, list):
+        raise ValueError(f'{path}: expected a list of rules')
+    rules = []
+    for item in items:
+        if not isinstance(item, dict):
+            raise ValueError(f'{path}: rule {item}: expected an object')
+        if item.get('mode') not in modes:
+            raise ValueError(f"{path}: rule {item}: mode must be one of {', '.join(modes)}")
+        if not item.get('exe'):
+            raise ValueError(f'{path}: rule {item}: "exe" is missing')
+        try:
+            speeds = { str(name).lower(): int(speed) for name, speed in (item.get('fanSpeeds') or {}).items() }
+        except (AttributeError, TypeError, ValueError):
+            raise ValueError(f'{path}: rule {item}: "fanSpeeds" must map unit names to numbers')
+        rules.append(ProcessRule(normalizeExeName(item['exe']), item['mode'], speeds))
+    return rules
+
+class ProcessRuleMatcher:
+    # Picks the rule to apply from the running executables. A new pick takes effect only after it has been
+    # the same for `debounceSec` (launchers, short-lived helpers and restarts do not flip the mode back and forth)
+
+    def __init__(self, rules: Sequence[ProcessRule], debounceSec: float, clock: Callable[[], float] = time.monotonic) -> None:
+        self.rules = list(rules)
+        self.debounceSec = debounceSec
+        self._clock = clock
+        self.active: Optional[ProcessRule] = None       # The applied rule, None - no rule (manual control)
+        self._candidate: Optional[ProcessRule] = None
+        self._candidateSinceTs = 0.0
+
+    def match(self, running: Mapping[str, int]) -> Optional[ProcessRule]:
+        return next((rule for rule in self.rules if rule.exe in running), None)
+
+    def update(self, running: Mapping[str, int]) -> bool:
+        # Returns True if `active` has changed
+        now = self._clock()
+        candidate = self.match(running)
+        if candidate != self._candidate:
+            self._candidate = candidate
+            self._candidateSinceTs = now
+        if candidate != self.active and now - self._candidateSinceTs >= self.debounceSec:
+            self.active = candidate
+            return True
+        return False
@@ -0,0 +1,200 @@
+import os, sys
+from collections import Counter
+from typing import Any, Iterable, Optional
+
+def normalizeExeName(name: str) -> str:
+    # "C:\\Games\\Game.EXE" -> "game", "/usr/bin/blender" -> "blender"
+    name = name.replace('\\', '/').rsplit('/', 1)[-1].lower()
+    return name[:-4] if name.endswith('.exe') else name
+
+class ProcessProvider:
+    # Interface. `listProcesses()` is called on every scan and must be cheap,
+    # `exeName()` is only called once per new process
+    def listProcesses(self) -> Iterable[tuple[int, int]]:
+        # -> (pid, start key): the start key tells a reused pid apart from the process that had it before
+        raise NotImplementedError()
+
+    def exeName(self, pid: int) -> Optional[str]:
+        raise NotImplementedError()
+
+    def close(self) -> None:
+        # Releases what the provider keeps between scans
+        pass
+
+class ProcfsProcessProvider(ProcessProvider):
+    # Linux: /proc/<pid>/cmdline (argv[0]), /proc/<pid>/comm for kernel threads and such.
+    # The start key is the inode number of /proc/<pid>: every new process gets a new inode, and the
+    # number comes with the directory listing (no stat). `root` can point to a fake tree
+    def __init__(self, root: str = '/proc') -> None:
+        self._root = root
+
+    def listProcesses(self) -> Iterable[tuple[int, int]]:
+        with os.scandir(self._root) as entries:
+            return [ (int(entry.name), entry.inode()) for entry in entries if entry.name.isdigit() ]
+
+    def exeName(self, pid: int) -> Optional[str]:
+        base = os.path.join(self._root, str(pid))
+        try:
+            with open(os.path.join(base, 'cmdline'), 'rb') as f:
+                argv0 = f.read(4096).split(b'\0', 1)[0]
+            if argv0:
+                return argv0.decode('utf-8', 'replace')
+            with open(os.path.join(base, 'comm'), 'rb') as f:
+                return f.read().strip().decode('utf-8', 'replace') or None
+        except OSError: # Exited meanwhile or no access
+            return None
+
+class WindowsProcessProvider(ProcessProvider):
+    # EnumProcesses() on every scan; the start key is the creation time (GetProcessTimes()) - Windows reuses pids
+    # quickly. A new pid is opened once and the handle is kept while the process runs: Windows does not reuse the
+    # pid of a process a handle is open to, so known pids cost no per-process calls. Exits are found by waiting
+    # (without blocking) on the kept handles, MAXIMUM_WAIT_OBJECTS per call. An exited process stays enumerated
+    # while another program has a handle to it: such a pid is reopened on the next scans, and is a new process
+    # only if its creation time differs. Pids that cannot be opened are retried on every scan (few when running
+    # elevated), their start key is 0. QueryFullProcessImageNameW() for new processes only, on the kept handle.
+    # `kernel32`/`psapi` can be replaced (e.g. by a fake that counts the calls)
+    PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+    SYNCHRONIZE = 0x00100000
+    MAXIMUM_WAIT_OBJECTS = 64
+    IDLE_PID = 0
+
+    def __init__(self, kernel32: Optional[Any] = None, psapi: Optional[Any] = None) -> None:
+        import ctypes
+        from ctypes import wintypes
+        self._ctypes = ctypes
+        self._psapi = psapi if psapi is not None else ctypes.WinDLL('psapi')
+        if kernel32 is None:
+            kernel32 = ctypes.WinDLL('kernel32')
+            kernel32.OpenProcess.restype = wintypes.HANDLE
+            kernel32.WaitForMultipleObjects.restype = wintypes.DWORD
+        self._kernel32 = kernel32
+        self._DWORD = wintypes.DWORD
+        self._HANDLE = wintypes.HANDLE
+        self._pids = (wintypes.DWORD * 4096)()
+        self._needed = wintypes.DWORD()
+        self._nameBuf = ctypes.create_unicode_buffer(1024)
+        self._nameLen = wintypes.DWORD()
+        self._times = [ ctypes.c_ulonglong() for _ in range(4) ] # Creation, exit, kernel, user (FILETIME)
+        self._open: dict[int, tuple[int, int]] = {} # pid -> (handle, creation time) of the running processes
+        self._exited: dict[int, int] = {}           # pid -> creation time of the exited processes still enumerated
+
+    def listProcesses(self) -> Iterable[tuple[int, int]]:
+        ctypes = self._ctypes
+        while True:
+            size = ctypes.sizeof(self._pids)
+            if not self._psapi.EnumProcesses(self._pids, size, ctypes.byref(self._needed)):
+                return []
+            if self._needed.value < size:
+                break
+            self._pids = (self._DWORD * (len(self._pids) * 2))() # Buffer was too small
+        pids = self._pids[:self._needed.value // ctypes.sizeof(self._DWORD)]
+        enumerated = set(pids)
+        for pid in [ pid for pid in self._open if pid not in enumerated ]:
+            self._closeProcess(pid)
+        justExited = self._findExited()
+        self._exited = { pid: ts for pid, ts in self._exited.items() if pid in enumerated }
+        self._exited.update(justExited)
+        res = []
+        for pid in pids:
+            entry = self._open.get(pid)
+            if entry is None and pid != self.IDLE_PID:
+                if pid in justExited:
+                    continue
+                entry = self._openProcess(pid)
+                if entry is not None and self._exited.get(pid) == entry[1]: # Still the exited one
+                    self._closeProcess(pid)
+                    continue
+                self._exited.pop(pid, None)
+            res.append((pid, entry[1] if entry is not None else 0))
+        return res
+
+    def _openProcess(self, pid: int) -> Optional[tuple[int, int]]:
+        kernel32 = self._kernel32
+        handle = kernel32.OpenProcess(self.PROCESS_QUERY_LIMITED_INFORMATION | self.SYNCHRONIZE, False, pid)
+        if not handle:
+            return None
+        byref = self._ctypes.byref
+        if not kernel32.GetProcessTimes(handle, *(byref(t) for t in self._times)):
+            kernel32.CloseHandle(handle)
+            return None
+        entry = self._open[pid] = (handle, self._times[0].value)
+        return entry
+
+    def _closeProcess(self, pid: int) -> None:
+        handle, _ = self._open.pop(pid)
+        self._kernel32.CloseHandle(handle)
+
+    def _findExited(self) -> dict[int, int]:
+        # pid -> creation time of the kept processes that have exited (their handles are closed)
+        exited = {}
+        pids = list(self._open)
+        for i in range(0, len(pids), self.MAXIMUM_WAIT_OBJECTS):
+            chunk = pids[i:i + self.MAXIMUM_WAIT_OBJECTS]
+            while chunk:
+                handles = (self._HANDLE * len(chunk))(*(self._open[pid][0] for pid in chunk))
+                idx = self._kernel32.WaitForMultipleObjects(len(chunk), handles, False, 0)
+                if not 0 <= idx < len(chunk): # WAIT_TIMEOUT: none (more) has exited, or WAIT_FAILED
+                    break
+                pid = chunk.pop(idx)
+                exited[pid] = self._open[pid][1]
+                self._closeProcess(pid)
+        return exited
+
+    def exeName(self, pid: int) -> Optional[str]:
+        entry = self._open.get(pid)
+        if entry is None:
+            return None
+        self._nameLen.value = len(self._nameBuf)
+        if not self._kernel32.QueryFullProcessImageNameW(entry[0], 0, self._nameBuf, self._ctypes.byref(self._nameLen)):
+            return None
+        return self._nameBuf.value
+
+    def close(self) -> None:
+        for pid in list(self._open):
+            self._closeProcess(pid)
+
+def makeProcessProvider() -> Optional[ProcessProvider]:
+    # Best available provider for this OS, None if there is none
+    try:
+        if sys.platform == 'win32':
+            return WindowsProcessProvider()
+        if os.path.isdir('/proc'):
+            return ProcfsProcessProvider()
+    except Exception as ex:
+        print(f'Process provider is not available: {ex}')
+    return None
+
+class ProcessScanner:
+    # Incremental: every scan diffs the current (pid, start key) list against the previous one,
+    # only new processes are looked up (by name), exited ones are dropped. A reused pid is a new process.
+    # `running` - normalized executable name -> number of running processes with that name
+
+    def __init__(self, provider: ProcessProvider) -> None:
+        self._provider = provider
+        self._known: dict[tuple[int, int], Optional[str]] = {}
+        self.running: Counter[str] = Counter()
+        self.lookups = 0    # exeName() calls so far
+
+    def scan(self) -> tuple[list[str], list[str]]:
+        # -> (names of the started processes, names of the exited processes)
+        processes = set(self._provider.listProcesses())
+        known = self._known
+        started, exited = [], []
+        for key in known.keys() - processes:
+            name = known.pop(key)
+            if name is not None:
+                exited.append(name)
+                self.running[name] -= 1
+                if self.running[name] <= 0:
+                    del self.running[name]
+        for key in processes - known.keys():
+            self.lookups += 1
+            exe = self._provider.exeName(key[0])
+            name = known[key] = normalizeExeName(exe) if exe else None
+            if name is not None:
+                started.append(name)
+                self.running[name] += 1
+        return started, exited
+
+    def close(self) -> None:
+        self._provider.close()
@@ -0,0 +1,153 @@
+import os, sys, time, threading
+from typing import Optional, Tuple
+
+class _StageStats:
+    __slots__ = ('count', 'total', 'max')
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+    def add(self, dt: float) -> None:
+        self.count += 1
+        self.total += dt
+        if dt > self.max: self.max = dt
+
+class SelfProfiler:
+    # Overhead of the app itself: CPU time per tick (of the ticking thread, other threads do not count), total
+    # process CPU time, timer wake-ups, RSS, (optionally) Python heap via tracemalloc, and wall time per stage of a tick.
+    # Usage per tick:
+    #   p.beginTick(); ...; p.mark('read'); ...; p.mark('render'); p.endTick()
+    # Each mark records the time elapsed since the previous mark (or since beginTick).
+    # Ticks run on one thread, lap() and addStageTime() may also be called from another one.
+    # Stages that run outside of the tick time their parts with lap():
+    #   t = time.perf_counter(); ...; t = p.lap('gauges', t); ...; t = p.lap('tray icon', t)
+
+    def __init__(self) -> None:
+        self._startWall = time.monotonic()
+        self._startCpu = time.process_time()
+        self._stages: dict[str, _StageStats] = {}
+        self._tick = _StageStats()
+        self._tickCpu = _StageStats()
+        self._tickStart = 0.0
+        self._tickStartCpu = 0.0
+        self._lastMark = 0.0
+        self._wakeups = 0
+        self._wakeupsLock = threading.Lock() # Counted on the GUI thread and on the control thread
+        self._startRss = self.rssBytes()
+        self._heapPrevSnapshot = None
+
+    # Ticks and stages
+
+    def beginTick(self) -> None:
+        self._tickStartCpu = time.thread_time()
+        self._tickStart = self._lastMark = time.perf_counter()
+
+    def mark(self, stage: str) -> None:
+        now = time.perf_counter()
+        self.addStageTime(stage, now - self._lastMark)
+        self._lastMark = now
+
+    def addStageTime(self, stage: str, dt: float) -> None:
+        # For stages timed elsewhere (e.g. pipeline stages that run outside of the tick)
+        st = self._stages.get(stage)
+        if st is None:
+            st = self._stages[stage] = _StageStats()
+        st.add(dt)
+
+    def lap(self, stage: str, since: float) -> float:
+        # Records the time since `since` (time.perf_counter() or the previous lap), returns the current time
+        now = time.perf_counter()
+        self.addStageTime(stage, now - since)
+        return now
+
+    def endTick(self) -> None:
+        self._tick.add(time.perf_counter() - self._tickStart)
+        self._tickCpu.add(time.thread_time() - self._tickStartCpu)
+
+    def wakeup(self) -> None:
+        with self._wakeupsLock:
+            self._wakeups += 1
+
+    # Memory
+
+    @staticmethod
+    def rssBytes() -> Optional[int]:
+        try:
+            if sys.platform == 'win32':
+                import ctypes
+                from ctypes import wintypes
+                class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+                    _fields_ = [
+                        ('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD),
+                        ('PeakWorkingSetSize', ctypes.c_size_t), ('WorkingSetSize', ctypes.c_size_t),
+                        ('QuotaPeakPagedPoolUsage', ctypes.c_size_t), ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                        ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t), ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                        ('PagefileUsage', ctypes.c_size_t), ('PeakPagefileUsage', ctypes.c_size_t),
+                    ]
+                counters = PROCESS_MEMORY_COUNTERS()
+                counters.cb = ctypes.sizeof(counters)
+                if ctypes.windll.psapi.GetProcessMemoryInfo(ctypes.windll.kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb):
+                    return counters.WorkingSetSize
+                return None
+            with open('/proc/self/statm') as f:
+                return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+        except Exception:
+            return None
+
+    @staticmethod
+    def startHeapTracing() -> None:
+        import tracemalloc
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def heapReport(self, top: int = 5) -> Optional[str]:
+        # Python heap usage and top allocation growth since the previous call. None if tracing is off
+        import tracemalloc
+        if not tracemalloc.is_tracing():
+            return None
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        ))
+        lines = [f"Heap: {current / 1024:.0f} KiB (peak {peak / 1024:.0f} KiB)"]
+        if self._heapPrevSnapshot is not None:
+            for stat in snapshot.compare_to(self._heapPrevSnapshot, 'lineno')[:top]:
+                lines.append(f"  {stat.size_diff / 1024:+.1f} KiB  {stat.traceback[0].filename}:{stat.traceback[0].lineno}")
+        self._heapPrevSnapshot = snapshot
+        return '\n'.join(lines)
+
+    # Report
+
+    def stageTimes(self) -> dict[str, Tuple[int, float, float]]:
+        # name -> (count, avg sec, max sec); the whole tick is reported as 'tick'
+        res = { name: (st.count, st.total / st.count, st.max) for name, st in list(self._stages.items()) if st.count }
+        if self._tick.count:
+            res['tick'] = (self._tick.count, self._tick.total / self._tick.count, self._tick.max)
+        return res
+
+    def uptimeSec(self) -> float:
+        return time.monotonic() - self._startWall
+
+    def wakeupsPerMin(self) -> float:
+        return self._wakeups / max(self.uptimeSec(), 1e-3) * 60
+
+    def cpuLoad(self) -> Tuple[float, float]:
+        # (total process CPU seconds, average CPU load in %)
+        cpu = time.process_time() - self._startCpu
+        return cpu, cpu / max(self.uptimeSec(), 1e-3) * 100
+
+    def summary(self) -> str:
+        ms = lambda v: f'{v * 1000:.2f}'
+        cpu, load = self.cpuLoad()
+        rss, startRss = self.rssBytes(), self._startRss
+        lines = [
+            f"Uptime: {self.uptimeSec():.0f} s    CPU: {cpu:.2f} s ({load:.2f}%)",
+            f"Timer wake-ups: {self.wakeupsPerMin():.1f}/min",
+            f"RSS: {'-' if rss is None else f'{rss / 2**20:.1f} MiB'}" + (f" ({(rss - startRss) / 2**20:+.1f} MiB since start)" if rss is not None and startRss is not None else ''),
+        ]
+        if self._tick.count:
+            lines.append(f"Tick: {self._tick.count}    avg {ms(self._tick.total / self._tick.count)} ms    max {ms(self._tick.max)} ms    CPU avg {ms(self._tickCpu.total / self._tickCpu.count)} ms")
+        for name, st in list(self._stages.items()):
+            lines.append(f"  {name}: avg {ms(st.total / st.count)} ms    max {ms(st.max)} ms    (x{st.count})")
+        return '\n'.join(lines)
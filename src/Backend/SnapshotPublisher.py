@@ -0,0 +1,192 @@
+import os, json, time, struct
+from multiprocessing import shared_memory
+from typing import Any, NamedTuple, Optional, Sequence
+from Backend.ThermalBackend import ThermalSnapshot
+
+# Shared memory segment with the latest polled snapshot, for high-rate external readers (overlays, benchmarks).
+# Layout (little-endian, fixed for the lifetime of the publisher):
+#   0  magic  b'TCCS'            8  header length (uint32)     16 sequence (uint64, native, 8-aligned)
+#   4  version (uint16)          12 payload offset (uint32)    24 header (UTF-8 JSON: modes, fans, sensorCount, pid)
+#   payload (8-aligned): ts (float64, unix time) | mode (uint8, index in header "modes") | flags (uint8) |
+#                        temps (int16 x sensorCount, fans' related sensors in fan order) | rpms (int32 x fan count)
+# Missing values are -1.
+# Sequence lock: the writer makes the sequence odd, writes the payload, makes it even again. Readers read the
+# payload in place and retry if the sequence was odd or has changed meanwhile, so they never block the writer.
+# This relies on stores becoming visible in program order (x86/x64).
+# "pid" is the publishing process: a segment left behind by a crashed instance (POSIX only, Windows frees the
+# segment with its last handle) is replaced, a segment of a running instance is not.
+
+MAGIC = b'TCCS'
+VERSION = 1
+DEFAULT_NAME = 'tcc-g15-snapshot'
+FLAG_FAILSAFE_TRIPPED = 0x01
+_PREFIX = struct.Struct('<4sHxxII')
+_SEQ_OFFSET = 16
+_HEADER_OFFSET = 24
+
+def _payloadStruct(header: dict[str, Any]) -> struct.Struct:
+    return struct.Struct(f"<dBB{header['sensorCount']}h{len(header['fans'])}i")
+
+def _isProcessAlive(pid: int) -> bool:
+    if os.name != 'posix':
+        return True # Not reached: on Windows an existing segment always has a live owner
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass # Exists, owned by another user
+    return True
+
+class SegmentInUse(Exception):
+    def __init__(self, name: str, owner: Optional[int]) -> None:
+        super().__init__(f'Shared memory "{name}" is in use by ' + (f'a running instance (pid {owner})' if owner else 'another application'))
+
+class SnapshotPublisher:
+    # Writer side, owned by the acquisition loop. `publish()` is a few memory stores, no syscalls
+
+    def __init__(self, modes: Sequence[str], fans: Sequence[dict[str, Any]], name: str = DEFAULT_NAME) -> None:
+        # fans: [{ "name": str, "sensorIds": [int] }], one per fan in fanIdx order
+        self._modes = list(modes)
+        self.header = {
+            'version': VERSION,
+            'modes': self._modes,
+            'fans': [ { 'name': f['name'], 'sensorIds': list(f['sensorIds']) } for f in fans ],
+            'sensorCount': sum(len(f['sensorIds']) for f in fans),
+            'pid': os.getpid(),
+        }
+        headerBytes = json.dumps(self.header).encode('utf-8')
+        self._payload = _payloadStruct(self.header)
+        self._payloadOffset = (_HEADER_OFFSET + len(headerBytes) + 7) // 8 * 8
+        size = self._payloadOffset + self._payload.size
+        try:
+            self._shm = shared_memory.SharedMemory(name, create=True, size=size)
+        except FileExistsError:
+            self._unlinkStale(name)
+            self._shm = shared_memory.SharedMemory(name, create=True, size=size)
+        self.name = self._shm.name
+        self.seq = 0
+        buf = self._shm.buf
+        self._seqView = buf[_SEQ_OFFSET:_SEQ_OFFSET + 8].cast('Q')
+        self._seqView[0] = 1 # Not valid until the first publish
+        _PREFIX.pack_into(buf, 0, MAGIC, VERSION, len(headerBytes), self._payloadOffset)
+        buf[_HEADER_OFFSET:_HEADER_OFFSET + len(headerBytes)] = headerBytes
+
+    def publish(self, ts: float, mode: str, failsafeTripped: bool, temps: Sequence[Optional[int]], rpms: Sequence[Optional[int]]) -> None:
+        seq = self.seq
+        self._seqView[0] = seq + 1
+        self._payload.pack_into(
+            self._shm.buf, self._payloadOffset,
+            ts,
+            self._modes.index(mode),
+            FLAG_FAILSAFE_TRIPPED if failsafeTripped else 0,
+            *(-1 if v is None else max(-1, min(v, 0x7FFF)) for v in temps),
+            *(-1 if v is None else v for v in rpms)
+        )
+        self._seqView[0] = seq + 2
+        self.seq = seq + 2
+
+    def publishSnapshot(self, ts: float, mode: str, failsafeTripped: bool, snapshot: ThermalSnapshot) -> None:
+        self.publish(ts, mode, failsafeTripped, [ t for temps in snapshot.temps for t in temps ], snapshot.rpms)
+
+    def close(self) -> None:
+        if self._seqView is None:
+            return
+        self._seqView.release()
+        self._seqView = None
+        self._shm.close()
+        try:
+            self._shm.unlink()
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def _unlinkStale(name: str) -> None:
+        # Removes the segment if it was left behind by a crashed instance, raises SegmentInUse otherwise
+        existing = shared_memory.SharedMemory(name)
+        try:
+            owner = None
+            magic, version, headerLen, _ = _PREFIX.unpack_from(existing.buf, 0)
+            if magic == MAGIC:
+                try:
+                    owner = json.loads(bytes(existing.buf[_HEADER_OFFSET:_HEADER_OFFSET + headerLen]).decode('utf-8')).get('pid')
+                except ValueError:
+                    pass
+            if not isinstance(owner, int) or _isProcessAlive(owner):
+                raise SegmentInUse(name, owner)
+        finally:
+            existing.close()
+        existing.unlink()
+
+class PublishedSnapshot(NamedTuple):
+    seq: int
+    ts: float
+    mode: str
+    failsafeTripped: bool
+    snapshot: ThermalSnapshot
+
+class SnapshotReader:
+    # Reader side, for other processes: attaches to the segment (FileNotFoundError if the app does not publish),
+    # reads the payload in place. `readRaw()` is the fast path, `read()` unpacks into a `PublishedSnapshot`
+
+    MAX_RETRIES = 1000
+    SPIN_RETRIES = 50   # Then yield the CPU between retries, the writer may have been preempted mid-write
+
+    def __init__(self, name: str = DEFAULT_NAME) -> None:
+        self._shm = shared_memory.SharedMemory(name)
+        if os.name == 'posix': # The reader does not own the segment: keep the resource tracker from unlinking it on exit
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(self._shm._name, 'shared_memory') # type: ignore
+        buf = self._shm.buf
+        magic, version, headerLen, self._payloadOffset = _PREFIX.unpack_from(buf, 0)
+        if magic != MAGIC or version != VERSION:
+            self._shm.close()
+            raise ValueError(f'{name}: not a TCC snapshot segment (or an unsupported version)')
+        self.header: dict[str, Any] = json.loads(bytes(buf[_HEADER_OFFSET:_HEADER_OFFSET + headerLen]).decode('utf-8'))
+        self._payload = _payloadStruct(self.header)
+        self._seqView = buf[_SEQ_OFFSET:_SEQ_OFFSET + 8].cast('Q')
+        self._fanSensorCounts = [ len(f['sensorIds']) for f in self.header['fans'] ]
+        self.retries = 0    # Reads repeated because they overlapped a write
+        self.staleReads = 0 # Reads that returned the last consistent snapshot, see readRaw()
+        self._last: Optional[tuple] = None
+
+    def readRaw(self) -> Optional[tuple]:
+        # -> (seq, ts, mode index, flags, *temps, *rpms)
+        # Without a consistent read within MAX_RETRIES (the writer is busy non-stop or died mid-write) the last
+        # consistent snapshot is returned again (same seq). None only if nothing has been read yet
+        seqView, unpack, buf, offset = self._seqView, self._payload.unpack_from, self._shm.buf, self._payloadOffset
+        for attempt in range(self.MAX_RETRIES):
+            seq = seqView[0]
+            if seq & 1 == 0:
+                values = unpack(buf, offset)
+                if seqView[0] == seq:
+                    self._last = (seq,) + values
+                    return self._last
+            self.retries += 1
+            if attempt >= self.SPIN_RETRIES:
+                time.sleep(0)
+        self.staleReads += 1
+        return self._last
+
+    def read(self) -> Optional[PublishedSnapshot]:
+        raw = self.readRaw()
+        if raw is None:
+            return None
+        seq, ts, mode, flags = raw[:4]
+        values = raw[4:]
+        sensorCount = self.header['sensorCount']
+        temps, rpms, pos = [], values[sensorCount:], 0
+        for count in self._fanSensorCounts:
+            temps.append(tuple(None if t < 0 else t for t in values[pos:pos + count]))
+            pos += count
+        return PublishedSnapshot(
+            seq, ts, self.header['modes'][mode], bool(flags & FLAG_FAILSAFE_TRIPPED),
+            ThermalSnapshot(tuple(temps), tuple(None if r < 0 else r for r in rpms))
+        )
+
+    def close(self) -> None:
+        if self._seqView is None:
+            return
+        self._seqView.release()
+        self._seqView = None
+        self._shm.close()
@@ -0,0 +1,185 @@
+import time
+from collections import deque
+from typing import Deque, Optional, Sequence, Tuple
+
+class WindowStats:
+    # Sliding time window over a single signal.
+    # Every sample is pushed and popped exactly once, so the update cost is amortized O(1):
+    #   mean      - running sum
+    #   min / max - monotonic deques (front is always the current extreme)
+    #   percentile - fixed-bin histogram (approximate, resolution = binWidth)
+    #   rate      - (newest - oldest) / (dt) over the window
+
+    def __init__(self, windowSec: float, histRange: Tuple[int, int], binWidth: int = 1) -> None:
+        self.windowSec = windowSec
+        self._samples: Deque[Tuple[float, int]] = deque()
+        self._minQ: Deque[Tuple[float, int]] = deque()
+        self._maxQ: Deque[Tuple[float, int]] = deque()
+        self._sum = 0
+        self._histLo = histRange[0]
+        self._binWidth = max(1, binWidth)
+        self._hist = [0] * ((histRange[1] - histRange[0]) // self._binWidth + 1)
+
+    def add(self, ts: float, value: int) -> None:
+        self._samples.append((ts, value))
+        self._sum += value
+        self._hist[self._bin(value)] += 1
+        while self._minQ and self._minQ[-1][1] >= value: self._minQ.pop()
+        self._minQ.append((ts, value))
+        while self._maxQ and self._maxQ[-1][1] <= value: self._maxQ.pop()
+        self._maxQ.append((ts, value))
+        self._evict(ts)
+
+    def _evict(self, now: float) -> None:
+        start = now - self.windowSec
+        while self._samples and self._samples[0][0] <= start:
+            ts, value = self._samples.popleft()
+            self._sum -= value
+            self._hist[self._bin(value)] -= 1
+            if self._minQ[0][0] <= ts: self._minQ.popleft()
+            if self._maxQ[0][0] <= ts: self._maxQ.popleft()
+
+    def _bin(self, value: int) -> int:
+        idx = (value - self._histLo) // self._binWidth
+        if idx < 0: return 0
+        if idx >= len(self._hist): return len(self._hist) - 1
+        return idx
+
+    def count(self) -> int:
+        return len(self._samples)
+
+    def mean(self) -> Optional[float]:
+        return self._sum / len(self._samples) if self._samples else None
+
+    def min(self) -> Optional[int]:
+        return self._minQ[0][1] if self._minQ else None
+
+    def max(self) -> Optional[int]:
+        return self._maxQ[0][1] if self._maxQ else None
+
+    def rate(self) -> Optional[float]:
+        # Units per second between the oldest and the newest sample in the window
+        if len(self._samples) < 2: return None
+        (t0, v0), (t1, v1) = self._samples[0], self._samples[-1]
+        return (v1 - v0) / (t1 - t0) if t1 > t0 else None
+
+    def percentile(self, p: float) -> Optional[int]:
+        # Approximate: returns the upper edge of the histogram bin that holds the p-th percentile
+        n = len(self._samples)
+        if n == 0: return None
+        rank = max(1, int(p / 100 * n + 0.5))
+        acc = 0
+        for idx, c in enumerate(self._hist):
+            acc += c
+            if acc >= rank:
+                return min(self._histLo + (idx + 1) * self._binWidth - 1, self._maxQ[0][1])
+        return self._maxQ[0][1]
+
+class WindowSlope:
+    # Least-squares line fit over a sliding time window, amortized O(1) per sample:
+    # running sums of t, v, t*v and t*t. Time is taken relative to a base that is moved forward
+    # (and the sums recomputed) once in a while, so the sums stay small and float errors do not accumulate.
+
+    REBASE_AFTER_SEC = 3600
+
+    def __init__(self, windowSec: float) -> None:
+        self.windowSec = windowSec
+        self._samples: Deque[Tuple[float, int]] = deque()
+        self._base: Optional[float] = None
+        self._st = self._sv = self._stv = self._stt = 0.0
+
+    def add(self, ts: float, value: int) -> None:
+        if self._base is None or ts - self._base > self.REBASE_AFTER_SEC:
+            self._rebase(ts)
+        self._samples.append((ts, value))
+        self._accumulate(ts, value, 1)
+        start = ts - self.windowSec
+        while self._samples[0][0] <= start:
+            self._accumulate(*self._samples.popleft(), -1)
+
+    def _accumulate(self, ts: float, value: int, sign: int) -> None:
+        t = ts - self._base
+        self._st += sign * t
+        self._sv += sign * value
+        self._stv += sign * t * value
+        self._stt += sign * t * t
+
+    def _rebase(self, ts: float) -> None:
+        self._base = ts
+        self._st = self._sv = self._stv = self._stt = 0.0
+        for sample in self._samples:
+            self._accumulate(*sample, 1)
+
+    def count(self) -> int:
+        return len(self._samples)
+
+    def slope(self) -> Optional[float]:
+        # Units per second
+        n = len(self._samples)
+        if n < 2: return None
+        d = n * self._stt - self._st * self._st
+        return (n * self._stv - self._st * self._sv) / d if d > 1e-9 else None
+
+    def project(self, aheadSec: float) -> Optional[float]:
+        # Value of the fitted line `aheadSec` after the newest sample
+        slope = self.slope()
+        if slope is None: return None
+        n = len(self._samples)
+        t = self._samples[-1][0] - self._base + aheadSec
+        return (self._sv - slope * self._st) / n + slope * t
+
+class StreamStats:
+    # Incremental statistics for one sensor or fan: EMA, instantaneous rate of change,
+    # a set of sliding windows (e.g. last minute, last 5 minutes) and, optionally, a short-term trend line
+
+    def __init__(self, windowsSec: Sequence[float], histRange: Tuple[int, int], binWidth: int = 1, emaAlpha: float = 0.2, trendWindowSec: Optional[float] = None) -> None:
+        self.windows = tuple(WindowStats(w, histRange, binWidth) for w in windowsSec)
+        self.trend = WindowSlope(trendWindowSec) if trendWindowSec else None
+        self._emaAlpha = emaAlpha
+        self._ema: Optional[float] = None
+        self._rate: Optional[float] = None
+        self._last: Optional[Tuple[float, int]] = None
+
+    def add(self, value: Optional[int], ts: Optional[float] = None) -> None:
+        if value is None: return
+        if ts is None: ts = time.monotonic()
+        self._ema = value if self._ema is None else self._ema + self._emaAlpha * (value - self._ema)
+        if self._last is not None and ts > self._last[0]:
+            self._rate = (value - self._last[1]) / (ts - self._last[0])
+        self._last = (ts, value)
+        for w in self.windows:
+            w.add(ts, value)
+        if self.trend is not None:
+            self.trend.add(ts, value)
+
+    def last(self) -> Optional[int]:
+        return self._last[1] if self._last else None
+
+    def ema(self) -> Optional[float]:
+        return self._ema
+
+    def rate(self) -> Optional[float]:
+        return self._rate
+
+    def window(self, windowSec: float) -> Optional[WindowStats]:
+        for w in self.windows:
+            if w.windowSec == windowSec: return w
+        return None
+
+    def peak(self, windowSec: Optional[float] = None) -> Optional[int]:
+        w = self.window(windowSec) if windowSec is not None else (self.windows[-1] if self.windows else None)
+        return w.max() if w else None
+
+    def summary(self, units: str, p: float = 95) -> str:
+        # Multi-line human readable summary, one line per window
+        def fmt(v: Optional[float]) -> str:
+            return '-' if v is None else f'{v:.0f}'
+        lines = [f"EMA: {fmt(self._ema)}{units}    Rate: {'-' if self._rate is None else f'{self._rate:+.1f}'}{units}/s"]
+        for w in self.windows:
+            lines.append(
+                f"{_windowName(w.windowSec)}:    min {fmt(w.min())}    avg {fmt(w.mean())}    max {fmt(w.max())}    p{p:.0f} {fmt(w.percentile(p))}{units}"
+            )
+        return '\n'.join(lines)
+
+def _windowName(windowSec: float) -> str:
+    return f'{windowSec / 60:.0f} min' if windowSec >= 60 and windowSec % 60 == 0 else f'{windowSec:.0f} s'
@@ -0,0 +1,205 @@
+import os, json, struct
+from typing import Any, Iterable, Optional
+import numpy as np
+from Backend.TelemetryRecorder import MAGIC, FILE_EXT, FLAG_FAILSAFE_TRIPPED
+from Backend.BurstCapture import MAGIC as BURST_MAGIC, FILE_EXT as BURST_FILE_EXT
+
+# Offline analysis of the telemetry written by `TelemetryRecorder`.
+# Everything is computed on whole arrays: no Python-level loops over samples.
+
+def recordDtype(header: dict[str, Any]) -> np.dtype:
+    fields: list = [('ts', '<f8'), ('mode', 'u1'), ('flags', 'u1')]
+    if header['sensorCount'] > 0:
+        fields.append(('temps', '<i2', (header['sensorCount'],)))
+    fields.append(('rpms', '<i2', (len(header['fans']),)))
+    return np.dtype(fields)
+
+def loadFile(path: str, magic: bytes = MAGIC) -> tuple[dict[str, Any], np.ndarray]:
+    # Telemetry file, or a burst capture file with magic=BURST_MAGIC
+    with open(path, 'rb') as f:
+        if f.read(4) != magic:
+            raise ValueError(f'{path}: not a {"telemetry" if magic == MAGIC else "burst capture"} file')
+        (headerLen,) = struct.unpack('<I', f.read(4))
+        header = json.loads(f.read(headerLen).decode('utf-8'))
+    offset = 8 + headerLen
+    dtype = recordDtype(header)
+    count = (os.path.getsize(path) - offset) // dtype.itemsize # Ignore a partially written last record
+    return header, np.fromfile(path, dtype=dtype, count=count, offset=offset)
+
+def findFiles(paths: Iterable[str], ext: str = FILE_EXT) -> list[str]:
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                files.extend(os.path.join(root, n) for n in names if n.endswith(ext))
+        else:
+            files.append(path)
+    return sorted(files)
+
+def _groupKey(header: dict[str, Any]) -> str:
+    # Recordings of the same laptop with the same topology (thresholds may differ between files)
+    return json.dumps([header['host'], header['modes'], [(f['name'], f['sensorIds']) for f in header['fans']]])
+
+def loadRecordings(paths: Iterable[str]) -> list[tuple[dict[str, Any], np.ndarray, np.ndarray]]:
+    # -> [(header, records sorted by time, fail-safe thresholds per record and fan)]
+    groups: dict[str, list[tuple[dict[str, Any], np.ndarray]]] = {}
+    for path in findFiles(paths):
+        if path.endswith(BURST_FILE_EXT):
+            continue
+        header, rec = loadFile(path)
+        if len(rec):
+            groups.setdefault(_groupKey(header), []).append((header, rec))
+    res = []
+    for parts in groups.values():
+        # Files follow each other in time: no copy for a single file, no sort unless files overlap
+        parts.sort(key=lambda p: p[1]['ts'][0])
+        rec = parts[0][1] if len(parts) == 1 else np.concatenate([ r for _, r in parts ])
+        limits = [ np.array([ f['failsafeTemp'] for f in h['fans'] ], dtype=np.int16) for h, _ in parts ]
+        if all(np.array_equal(l, limits[0]) for l in limits):
+            thresholds = np.broadcast_to(limits[0], (len(rec), len(limits[0])))
+        else:
+            thresholds = np.concatenate([ np.broadcast_to(l, (len(r), len(l))) for l, (_, r) in zip(limits, parts) ])
+        ts = rec['ts']
+        if not np.all(ts[1:] >= ts[:-1]):
+            order = np.argsort(ts, kind='stable')
+            rec, thresholds = rec[order], thresholds[order]
+        res.append((parts[0][0], rec, thresholds))
+    return res
+
+def analyze(
+    header: dict[str, Any],
+    rec: np.ndarray,
+    thresholds: Optional[np.ndarray] = None,
+    maxGapSec: float = 10,
+    rpmMax: int = 5500,
+    tempBinC: int = 5,
+    dutyBins: int = 10
+) -> dict[str, Any]:
+    fans = header['fans']
+    modes = header['modes']
+    n = len(rec)
+    if thresholds is None:
+        thresholds = np.broadcast_to(np.array([ f['failsafeTemp'] for f in fans ], dtype=np.int16), (n, len(fans)))
+
+    # Each sample stands for the time until the next one; gaps (app not running) are not counted
+    ts = rec['ts']
+    dt = np.diff(ts, append=ts[-1] if n else 0)
+    dt[(dt < 0) | (dt > maxGapSec)] = 0
+    duration = float(dt.sum())
+
+    mode = rec['mode'].astype(np.intp)
+    modeTime = np.bincount(mode, weights=dt, minlength=len(modes))
+
+    tripped = (rec['flags'] & FLAG_FAILSAFE_TRIPPED) != 0
+    trips = int(np.count_nonzero(tripped[1:] & ~tripped[:-1]) + (1 if n and tripped[0] else 0))
+
+    # Primary (first) sensor of every fan, same as the fail-safe uses
+    firstSensor = np.cumsum([0] + [ len(f['sensorIds']) for f in fans ])[:-1]
+    temps = rec['temps'][:, firstSensor] if header['sensorCount'] > 0 else np.full((n, len(fans)), -1, np.int16)
+    rpms = rec['rpms']
+
+    fanReports = []
+    for fanIdx, fan in enumerate(fans):
+        t = temps[:, fanIdx]
+        r = rpms[:, fanIdx]
+        validT = t >= 0
+        validR = r >= 0
+        hasSensor = len(fan['sensorIds']) > 0
+
+        above = validT & (t >= thresholds[:, fanIdx])
+        timeAbove = float(dt[above].sum())
+
+        # RPM vs temperature: mean RPM per temperature bin
+        both = validT & validR
+        tBin = t[both].astype(np.intp) // tempBinC
+        counts = np.bincount(tBin, minlength=1)
+        rpmSum = np.bincount(tBin, weights=r[both], minlength=1)
+        nz = np.nonzero(counts)[0]
+        curve = [
+            { 'tempFrom': int(b * tempBinC), 'tempTo': int((b + 1) * tempBinC), 'meanRPM': round(float(s), 1), 'samples': int(c) }
+            for b, s, c in zip(nz, rpmSum[nz] / counts[nz], counts[nz])
+        ]
+
+        # Duty cycle (RPM relative to `rpmMax`) distribution per mode, as a fraction of the time spent in the mode
+        dBin = np.minimum((np.clip(r[validR].astype(np.intp), 0, rpmMax) * dutyBins) // rpmMax, dutyBins - 1)
+        dist = np.bincount(mode[validR] * dutyBins + dBin, weights=dt[validR], minlength=len(modes) * dutyBins).reshape(len(modes), dutyBins)
+        dist = dist / np.maximum(dist.sum(axis=1, keepdims=True), 1e-12)
+
+        fanReports.append({
+            'name': fan['name'],
+            'failsafeTemp': int(thresholds[-1, fanIdx]) if n else fan['failsafeTemp'],
+            'tempMax': int(t[validT].max()) if hasSensor and validT.any() else None,
+            'tempMean': round(float(np.average(t[validT], weights=dt[validT])), 2) if hasSensor and dt[validT].sum() > 0 else None,
+            'timeAboveFailsafeSec': round(timeAbove, 1),
+            'timeAboveFailsafeFraction': round(timeAbove / duration, 6) if duration > 0 else 0.0,
+            'readFailures': int(np.count_nonzero(~validT)) if hasSensor else 0,
+            'rpmVsTemp': curve,
+            'dutyCycleByMode': {
+                modes[m]: [ round(float(v), 4) for v in dist[m] ] for m in range(len(modes)) if modeTime[m] > 0
+            },
+        })
+
+    return {
+        'host': header['host'],
+        'from': float(ts[0]) if n else None,
+        'to': float(ts[-1]) if n else None,
+        'samples': n,
+        'durationSec': round(duration, 1),
+        'timeInModeSec': { modes[m]: round(float(modeTime[m]), 1) for m in range(len(modes)) },
+        'failsafeTrips': trips,
+        'failsafeTripsPerDay': round(trips / (duration / 86400), 3) if duration > 0 else 0.0,
+        'dutyCycleBins': [ round(i / dutyBins, 3) for i in range(dutyBins + 1) ],
+        'fans': fanReports,
+    }
+
+def loadBursts(paths: Iterable[str]) -> list[tuple[str, dict[str, Any], np.ndarray]]:
+    # Burst captures (see BurstCapture) among the paths -> [(path, header, records)]
+    res = []
+    for path in findFiles(paths, BURST_FILE_EXT):
+        if path.endswith(BURST_FILE_EXT):
+            header, rec = loadFile(path, BURST_MAGIC)
+            res.append((path, header, rec))
+    return res
+
+def summarizeBurst(header: dict[str, Any], rec: np.ndarray) -> dict[str, Any]:
+    # Times are relative to the trigger that started the capture
+    fans = header['fans']
+    trigger = header['trigger']
+    t0 = trigger['ts']
+    ts = rec['ts'] - t0
+    rel = lambda t: round(float(t) - t0, 3)
+    before = np.diff(ts[ts < 0])
+    after = np.diff(ts[ts >= 0])
+    events = header['events']
+    trip = next((e for e in events if e[1] == 'trigger' and e[2].startswith('trip')), None)
+    firstSensor = np.cumsum([0] + [ len(f['sensorIds']) for f in fans ])[:-1]
+    temps = rec['temps'][:, firstSensor] if header['sensorCount'] > 0 else np.full((len(rec), len(fans)), -1, np.int16)
+    atTrigger = int(np.searchsorted(ts, 0))
+    fanReports = []
+    for fanIdx, fan in enumerate(fans):
+        t = temps[:, fanIdx]
+        r = rec['rpms'][:, fanIdx]
+        fanReports.append({
+            'name': fan['name'],
+            'failsafeTemp': fan['failsafeTemp'],
+            'tempAtTrigger': int(t[atTrigger]) if atTrigger < len(rec) and t[atTrigger] >= 0 else None,
+            'tempMax': int(t.max()) if (t >= 0).any() else None,
+            'tempMaxAt': round(float(ts[int(np.argmax(t))]), 3) if (t >= 0).any() else None,
+            'rpmMax': int(r.max()) if (r >= 0).any() else None,
+        })
+    return {
+        'host': header['host'],
+        'trigger': trigger,
+        'tripAt': rel(trip[0]) if trip is not None else None,
+        'from': round(float(ts[0]), 3) if len(rec) else None,
+        'to': round(float(ts[-1]), 3) if len(rec) else None,
+        'samples': len(rec),
+        'sampleIntervalSec': {
+            'preTrigger': round(float(np.median(before)), 3) if len(before) else None,
+            'postTrigger': round(float(np.median(after)), 3) if len(after) else None,
+        },
+        'modeTransitions': [ [ rel(e[0]), e[2] ] for e in events if e[1] == 'mode' ],
+        'fanWrites': [ [ rel(e[0]), *e[2:] ] for e in events if e[1] == 'fan' ],
+        'triggers': [ [ rel(e[0]), e[2] ] for e in events if e[1] == 'trigger' ],
+        'fans': fanReports,
+    }
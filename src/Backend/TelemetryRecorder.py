@@ -0,0 +1,98 @@
+import os, json, time, struct, socket
+from typing import Any, BinaryIO, Optional, Sequence
+
+# Telemetry file (*.tcct) layout:
+#   MAGIC (4 bytes) | header length (uint32 LE) | header (UTF-8 JSON) | records...
+# Every record has the same size, so the records can be loaded as one NumPy structured array:
+#   ts (float64, unix time) | mode (uint8, index in header "modes") | flags (uint8) |
+#   temps (int16 x header "sensorCount") | rpms (int16 x fan count)
+# Missing values (failed reads) are stored as -1.
+
+MAGIC = b'TCCT'
+VERSION = 1
+FILE_EXT = '.tcct'
+FLAG_FAILSAFE_TRIPPED = 0x01
+
+class TelemetryRecorder:
+    # Appends one record per sample. Records are buffered and written every `flushEvery` samples,
+    # a new file is started every day (and whenever the topology or the thresholds change).
+
+    def __init__(self, directory: str, modes: Sequence[str], flushEvery: int = 60) -> None:
+        self._dir = directory
+        self._modes = list(modes)
+        self._flushEvery = flushEvery
+        self._buf = bytearray()
+        self._pending = 0
+        self._file: Optional[BinaryIO] = None
+        self._fileDay: Optional[str] = None
+        self._header: Optional[dict[str, Any]] = None
+        self._struct: Optional[struct.Struct] = None
+        os.makedirs(directory, exist_ok=True)
+
+    def setTopology(self, fans: Sequence[dict[str, Any]]) -> None:
+        # fans: [{ "name": str, "sensorIds": [int], "failsafeTemp": int }], one per fan in fanIdx order
+        header = {
+            'version': VERSION,
+            'host': socket.gethostname(),
+            'modes': self._modes,
+            'fans': [ dict(f) for f in fans ],
+            'sensorCount': sum(len(f['sensorIds']) for f in fans),
+        }
+        if header == self._header:
+            return
+        self.flush()
+        self._header = header
+        self._struct = struct.Struct(f"<dBB{header['sensorCount']}h{len(fans)}h")
+        self._closeFile()
+
+    def record(self, ts: float, mode: str, failsafeTripped: bool, temps: Sequence[Optional[int]], rpms: Sequence[Optional[int]]) -> None:
+        if self._struct is None:
+            return
+        self._buf += self._struct.pack(
+            ts,
+            self._modes.index(mode),
+            FLAG_FAILSAFE_TRIPPED if failsafeTripped else 0,
+            *(-1 if v is None else max(-1, min(v, 0x7FFF)) for v in temps),
+            *(-1 if v is None else max(-1, min(v, 0x7FFF)) for v in rpms)
+        )
+        self._pending += 1
+        if self._pending >= self._flushEvery:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._buf:
+            return
+        try:
+            self._openFile()
+            self._file.write(self._buf)
+            self._file.flush()
+        except OSError as ex:
+            print(f'Telemetry write failed: {ex}')
+        self._buf.clear()
+        self._pending = 0
+
+    def close(self) -> None:
+        self.flush()
+        self._closeFile()
+
+    def _openFile(self) -> None:
+        day = time.strftime('%Y%m%d')
+        if self._file is not None and day == self._fileDay:
+            return
+        self._closeFile()
+        self._fileDay = day
+        base = os.path.join(self._dir, f"telemetry-{day}-{time.strftime('%H%M%S')}")
+        suffix = 0
+        while self._file is None:
+            try: # Every file has exactly one header: never append to an existing one
+                self._file = open(base + (f'-{suffix}' if suffix else '') + FILE_EXT, 'xb')
+            except FileExistsError:
+                suffix += 1
+        header = json.dumps(self._header).encode('utf-8')
+        self._file.write(MAGIC + struct.pack('<I', len(header)) + header)
+
+    def _closeFile(self) -> None:
+        if self._file is not None:
+            self._file.close()
+        self._file = None
+        self._fileDay = None
@@ -0,0 +1,50 @@
+from typing import NamedTuple, Optional, Tuple
+from Backend.AWCCWmiWrapper import AWCCWmiWrapper
+
+class ThermalSnapshot(NamedTuple):
+    # One batched read of all fans and their related sensors
+    temps: Tuple[Tuple[Optional[int], ...], ...]    # [fanIdx][relatedSensorIdx]
+    rpms: Tuple[Optional[int], ...]                 # [fanIdx]
+
+    def fanTemp(self, fanIdx: int) -> Optional[int]:
+        # Temperature of the primary (first) sensor related to the fan
+        return self.temps[fanIdx][0] if fanIdx < len(self.temps) and self.temps[fanIdx] else None
+
+class ThermalBackend:
+    # Interface of a thermal backend: fans with their related temperature sensors (topology),
+    # batched temperature/RPM reads, per-fan speed and the thermal mode.
+    # Fans are addressed by index (0 - CPU, 1 - GPU, then the rest), sensors by backend-specific ids.
+    Mode = AWCCWmiWrapper.ThermalMode
+    CPUFanIdx = 0
+    GPUFanIdx = 1
+
+    def getFanCount(self) -> int:
+        raise NotImplementedError()
+
+    def getFanRelatedSensorIds(self, fanIdx: int) -> Tuple[int, ...]:
+        raise NotImplementedError()
+
+    def readSnapshot(self) -> ThermalSnapshot:
+        raise NotImplementedError()
+
+    def getFanRelatedTemp(self, fanIdx: int) -> Optional[int]:
+        raise NotImplementedError()
+
+    def getFanRPM(self, fanIdx: int) -> Optional[int]:
+        raise NotImplementedError()
+
+    def getAllTemp(self) -> list[Optional[int]]:
+        raise NotImplementedError()
+
+    def getAllFanRPM(self) -> list[Optional[int]]:
+        raise NotImplementedError()
+
+    def setFanSpeed(self, fanIdx: int, speed: int) -> bool:
+        # `speed` - additional speed in percent, applied in Custom mode
+        raise NotImplementedError()
+
+    def setAllFanSpeed(self, speed: int) -> bool:
+        return all([ self.setFanSpeed(idx, speed) for idx in range(self.getFanCount()) ])
+
+    def setMode(self, mode: AWCCWmiWrapper.ThermalMode) -> bool:
+        raise NotImplementedError()
@@ -0,0 +1,254 @@
+import math
+from typing import Any, Mapping, NamedTuple, Optional, Sequence
+import numpy as np
+from Backend.TelemetryAnalysis import loadRecordings
+
+# Thermal model identification from recorded telemetry (see TelemetryRecorder, TelemetryAnalysis).
+# Every sensor is fitted to the first-order model the emulator implements:
+#   C * dT/dt = P(t) - (G0 + G1 * rpm / 1000) * (T - T_ambient)
+# Divided by C it is linear in the unknowns (b = G0/C, c = G1/C, d = c * T_ambient, q = P/C + b * T_ambient):
+#   dT/dt = q - b * T - c * krpm * T + d * krpm
+# dT/dt is taken over `strideSec` intervals in integral form (temperature change vs. the interval means of the
+# regressors), which tolerates the 1°C quantization of the recorded temperatures.
+# The heat input P follows the workload and is unknown, so the equation is differenced between adjacent
+# intervals: q cancels out everywhere except where the workload changed, and those few differences are
+# outliers for a robust (Tukey bisquare, iteratively reweighted) least-squares fit with 3 unknowns per sensor.
+# All of it is whole-array operations over the samples.
+# The heat capacity C itself is not identifiable from temperatures alone, the rates are all that is needed
+# to predict the steady state: T = T_ambient + (P/C) / (b + c * krpm)
+
+class SensorModel(NamedTuple):
+    fanIdx: int
+    sensorId: int
+    ambient: float          # T_ambient, °C
+    idleRate: float         # b = G0/C, 1/s
+    rpmRate: float          # c = G1/C, 1/s per 1000 RPM
+    heatRates: np.ndarray   # P/C per window, K/s (the workload history as seen by this sensor)
+    residualStd: float      # Of dT/dt, K/s
+    samples: int
+
+    def timeConstant(self, rpm: float) -> float:
+        return 1 / (self.idleRate + self.rpmRate * rpm / 1000)
+
+    def steadyTemp(self, heatRate: float, rpm: float) -> float:
+        return self.ambient + heatRate / (self.idleRate + self.rpmRate * rpm / 1000)
+
+    def requiredRPM(self, heatRate: float, targetTemp: float) -> float:
+        # Lowest RPM that keeps the steady temperature at or below the target, inf if there is none
+        if targetTemp <= self.ambient:
+            return math.inf
+        rpm = (heatRate / (targetTemp - self.ambient) - self.idleRate) / self.rpmRate * 1000 if self.rpmRate > 0 else math.inf
+        return max(0.0, rpm)
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            'fanIdx': self.fanIdx,
+            'sensorId': self.sensorId,
+            'ambient': round(self.ambient, 2),
+            'idleRate': round(self.idleRate, 6),
+            'rpmRatePerKRPM': round(self.rpmRate, 6),
+            'timeConstantSec': { 'idle': round(self.timeConstant(0), 1), '5000rpm': round(self.timeConstant(5000), 1) },
+            'heatRateP50': round(float(np.percentile(self.heatRates, 50)), 4) if len(self.heatRates) else None,
+            'heatRateMax': round(float(self.heatRates.max()), 4) if len(self.heatRates) else None,
+            'residualStd': round(self.residualStd, 4),
+            'samples': self.samples,
+        }
+
+def _segmentIds(ts: np.ndarray, valid: np.ndarray, maxGapSec: float) -> np.ndarray:
+    # Consecutive segment number per sample; a gap or a change in validity starts a new segment
+    dt = np.diff(ts, prepend=ts[0])
+    brk = (dt > maxGapSec) | (dt < 0)
+    brk |= np.diff(valid.astype(np.int8), prepend=0) != 0
+    return np.cumsum(brk)
+
+def fitSensorModels(
+    header: dict[str, Any],
+    rec: np.ndarray,
+    strideSec: float = 20,
+    windowSec: float = 60,
+    maxGapSec: float = 10,
+) -> list[Optional[SensorModel]]:
+    # One model per fan-related sensor (in the header order), None where there is not enough data.
+    # `windowSec` - resolution of the heat rate (workload) history
+    ts = rec['ts']
+    models: list[Optional[SensorModel]] = []
+    col = 0
+    for fanIdx, fan in enumerate(header['fans']):
+        rpm = rec['rpms'][:, fanIdx].astype(np.float64)
+        for sensorId in fan['sensorIds']:
+            temp = rec['temps'][:, col].astype(np.float64)
+            col += 1
+            valid = (temp >= 0) & (rpm >= 0)
+            models.append(_fitSensor(fanIdx, sensorId, ts, temp, rpm / 1000, valid, strideSec, windowSec, maxGapSec))
+    return models
+
+def _fitSensor(
+    fanIdx: int, sensorId: int, ts: np.ndarray, T: np.ndarray, krpm: np.ndarray, valid: np.ndarray,
+    strideSec: float, windowSec: float, maxGapSec: float,
+    iterations: int = 20, tuning: float = 3.5, quantumC: float = 1.0
+) -> Optional[SensorModel]:
+    if len(ts) < 2:
+        return None
+    seg = _segmentIds(ts, valid, maxGapSec)
+    period = float(np.median(np.diff(ts)))
+    s = max(1, int(round(strideSec / max(period, 1e-3))))
+
+    # Intervals [i, i + s] within one valid segment
+    i0 = np.arange(max(0, len(ts) - s))
+    i0 = i0[(seg[i0] == seg[i0 + s]) & valid[i0]]
+    i1 = i0 + s
+    # Pairs of adjacent intervals
+    a = np.searchsorted(i0, i1)
+    pair = a < len(i0)
+    pair[pair] &= i0[a[pair]] == i1[pair]
+    first, second = np.nonzero(pair)[0], a[pair]
+    if len(first) < 100:
+        return None
+
+    # Interval means of the regressors from trapezoid cumulative integrals
+    dt = np.diff(ts)
+    def integral(f: np.ndarray) -> np.ndarray:
+        return np.concatenate(([0.0], np.cumsum(0.5 * (f[1:] + f[:-1]) * dt)))
+    span = ts[i1] - ts[i0]
+    cT, cRT, cR = integral(T), integral(krpm * T), integral(krpm)
+    y = (T[i1] - T[i0]) / span
+    X = np.stack([ -(cT[i1] - cT[i0]), -(cRT[i1] - cRT[i0]), cR[i1] - cR[i0] ], axis=1) / span[:, None]
+    yd = y[second] - y[first]
+    Xd = X[second] - X[first]
+
+    # Iteratively reweighted least squares: Huber weights first (the plain fit is pulled off by the workload
+    # changes), then bisquare, which rejects them completely. The residual scale does not go below one
+    # temperature quantum per interval: on a steady temperature most differences are exactly 0
+    floor = 0.5 * quantumC / (s * period)
+    w = np.ones(len(yd))
+    theta = np.zeros(3)
+    for it in range(iterations):
+        sw = np.sqrt(w)
+        theta, *_ = np.linalg.lstsq(Xd * sw[:, None], yd * sw, rcond=None)
+        r = yd - Xd @ theta
+        scale = max(1.4826 * float(np.median(np.abs(r))), floor)
+        if it < iterations // 4:
+            u = np.abs(r) / (1.345 * scale)
+            w = 1 / np.maximum(u, 1)
+        else:
+            u = r / (tuning * scale)
+            w = np.where(np.abs(u) < 1, (1 - u * u) ** 2, 0.0)
+    b, c, d = (float(v) for v in theta)
+    if not (b > 0 and c > 0):
+        return None # Not identifiable from this data (e.g. the fans never changed speed)
+    ambient = d / c
+
+    # Heat input (P/C) history: interval estimates averaged per window
+    q = y - X @ theta
+    win = seg[i0] * (1 << 32) + np.floor((ts[i0] - ts[0]) / windowSec).astype(np.int64)
+    _, win = np.unique(win, return_inverse=True)
+    heatRates = np.bincount(win, weights=q) / np.bincount(win) - b * ambient
+    inliers = w > 0
+    resid = r[inliers]
+    return SensorModel(fanIdx, sensorId, ambient, b, c, heatRates, float(resid.std()) if len(resid) else 0.0, int(inliers.sum()))
+
+def balancedCurve(header: dict[str, Any], rec: np.ndarray, fanIdx: int, sensorCol: int, binC: int = 1, settleSec: float = 30) -> tuple[np.ndarray, np.ndarray]:
+    # Automatic (Balanced mode) fan curve: (temperatures, median RPM), made non-decreasing from below.
+    # In the Custom mode the fan speed is added on top of it by the firmware.
+    # Samples right after a mode switch are skipped: the fans are still spinning up or down
+    balanced = header['modes'].index('Balanced') if 'Balanced' in header['modes'] else -1
+    mode = rec['mode']
+    ts = rec['ts']
+    switched = np.flatnonzero(np.diff(mode, prepend=mode[:1]) != 0)
+    lastSwitch = np.zeros(len(rec), dtype=np.intp)
+    lastSwitch[switched] = switched
+    lastSwitch = np.maximum.accumulate(lastSwitch)
+    t = rec['temps'][:, sensorCol]
+    r = rec['rpms'][:, fanIdx]
+    sel = (mode == balanced) & (t >= 0) & (r >= 0) & (ts - ts[lastSwitch] >= settleSec)
+    if not sel.any():
+        return np.array([ 0.0 ]), np.array([ 0.0 ])
+    # Median per temperature bin: sort by (bin, rpm), take the middle of every bin
+    tBin = t[sel].astype(np.intp) // binC
+    rSel = r[sel]
+    order = np.lexsort((rSel, tBin))
+    bins, start, counts = np.unique(tBin[order], return_index=True, return_counts=True)
+    median = rSel[order][start + counts // 2].astype(np.float64)
+    # Lower envelope: an occasional high bin does not lift the whole curve above it
+    return (bins * binC).astype(np.float64), np.minimum.accumulate(median[::-1])[::-1]
+
+def suggestFanSpeeds(
+    header: dict[str, Any],
+    rec: np.ndarray,
+    models: list[Optional[SensorModel]],
+    targets: Mapping[str, float],
+    loadQuantile: float = 0.99,
+    speedMax: int = 120,
+) -> list[dict[str, Any]]:
+    # Lowest Custom mode fan speed (0..speedMax, percent of the max RPM on top of the automatic curve) per fan
+    # that keeps the steady temperature of every related sensor at or below the fan's target under the
+    # `loadQuantile` heaviest workload seen in the data.
+    # targets: fan name (case insensitive) -> °C; fans without a target are skipped
+    targetsByName = { name.lower(): temp for name, temp in targets.items() }
+    gMode = header['modes'].index('G_Mode') if 'G_Mode' in header['modes'] else -1
+    res = []
+    col = 0
+    for fanIdx, fan in enumerate(header['fans']):
+        cols = list(range(col, col + len(fan['sensorIds'])))
+        col += len(cols)
+        target = targetsByName.get(fan['name'].lower())
+        fanModels = [ models[c] for c in cols if models[c] is not None ]
+        if target is None or not fanModels:
+            continue
+        # Full speed as seen in G-mode (fans at max)
+        rpms = rec['rpms'][:, fanIdx]
+        full = rpms[(rec['mode'] == gMode) & (rpms >= 0)]
+        if not len(full):
+            full = rpms[rpms >= 0]
+        rpmMax = float(np.percentile(full, 99.9)) if len(full) else 0.0
+        if rpmMax <= 0:
+            continue
+
+        speed, worst = 0, None
+        reachable = True
+        for c in cols:
+            model = models[c]
+            if model is None:
+                continue
+            heat = float(np.quantile(model.heatRates, loadQuantile))
+            need = model.requiredRPM(heat, target)
+            temps, curve = balancedCurve(header, rec, fanIdx, c)
+            auto = float(np.interp(target, temps, curve))
+            if need > rpmMax:
+                reachable = False
+                s = speedMax
+            else:
+                s = min(speedMax, max(0, math.ceil((need - auto) / rpmMax * 100)))
+            if s >= speed:
+                speed = s
+                worst = { 'sensorId': model.sensorId, 'heatRate': round(heat, 4), 'requiredRPM': round(need, 0) if math.isfinite(need) else None, 'autoRPM': round(auto, 0) }
+        res.append({
+            'fanIdx': fanIdx,
+            'name': fan['name'],
+            'target': target,
+            'speed': speed,
+            'reachable': reachable,
+            'rpmMax': round(rpmMax, 0),
+            'limitingSensor': worst,
+        })
+    return res
+
+def tuneFromRecordings(paths: Sequence[str], fanNames: Sequence[str], targets: Mapping[str, float], host: Optional[str] = None, **kwargs) -> dict[str, Any]:
+    # Fit + suggest on the largest recording of this laptop (same fans; same host if given).
+    # -> { "models": [summary or None per sensor], "suggestions": [...], "samples": int }. ValueError if there is no data
+    names = [ name.lower() for name in fanNames ]
+    candidates = [
+        (header, rec) for header, rec, _ in loadRecordings(paths)
+        if [ f['name'].lower() for f in header['fans'] ] == names and (host is None or header['host'] == host)
+    ]
+    if not candidates:
+        raise ValueError('No recorded telemetry for this laptop')
+    header, rec = max(candidates, key= lambda c: len(c[1]))
+    models = fitSensorModels(header, rec)
+    if not any(models):
+        raise ValueError(f'Not enough telemetry to fit the thermal model ({len(rec)} samples)')
+    return {
+        'samples': len(rec),
+        'models': [ m.summary() if m is not None else None for m in models ],
+        'suggestions': suggestFanSpeeds(header, rec, models, targets, **kwargs),
+    }
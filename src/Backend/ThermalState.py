@@ -0,0 +1,60 @@
+import os, sys, struct
+from typing import NamedTuple, Optional, Tuple
+from Backend.ThermalBackend import ThermalBackend
+
+# Last thermal state (mode and fan speeds) saved by the app, applied at the next start before Qt and the GUI
+# are loaded (see tcc-g15.py) - nothing here may import Qt. File layout (a few dozen bytes):
+#   MAGIC (4 bytes) | version (uint8) | mode name length (uint8) | mode name (ASCII) | fan count (uint8) | fan speeds (uint8 x fan count)
+
+MAGIC = b'TCCL'
+VERSION = 1
+
+class ThermalState(NamedTuple):
+    mode: str                       # ThermalBackend.Mode name
+    fanSpeeds: Tuple[int, ...]      # [fanIdx], Custom mode speed
+
+def defaultThermalStatePath() -> str:
+    if sys.platform == 'win32':
+        base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+    else:
+        base = os.environ.get('XDG_STATE_HOME') or os.path.join(os.path.expanduser('~'), '.local', 'state')
+    return os.path.join(base, 'tcc-g15', 'last-state.bin')
+
+def loadThermalState(path: str) -> Optional[ThermalState]:
+    # None if there is no (valid) saved state
+    try:
+        with open(path, 'rb') as f:
+            data = f.read(512)
+    except OSError:
+        return None
+    try:
+        magic, version, modeLen = struct.unpack_from('<4sBB', data)
+        if magic != MAGIC or version != VERSION:
+            return None
+        mode = data[6:6 + modeLen].decode('ascii')
+        (fanCount,) = struct.unpack_from('<B', data, 6 + modeLen)
+        speeds = struct.unpack_from(f'<{fanCount}B', data, 7 + modeLen)
+    except (struct.error, UnicodeDecodeError):
+        return None
+    return ThermalState(mode, tuple(speeds))
+
+def saveThermalState(path: str, state: ThermalState) -> None:
+    mode = state.mode.encode('ascii')
+    data = (struct.pack('<4sBB', MAGIC, VERSION, len(mode)) + mode +
+        struct.pack(f'<B{len(state.fanSpeeds)}B', len(state.fanSpeeds), *(max(0, min(s, 0xFF)) for s in state.fanSpeeds)))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path) # Never leave a partially written state
+
+def applyThermalState(backend: ThermalBackend, state: ThermalState) -> bool:
+    # Sets the mode, then (Custom mode only) the fan speeds: one write per value, nothing is re-applied.
+    # False if the state does not fit the backend or a write failed
+    if state.mode not in backend.Mode.__members__ or len(state.fanSpeeds) != backend.getFanCount():
+        return False
+    if not backend.setMode(backend.Mode[state.mode]):
+        return False
+    if state.mode == backend.Mode.Custom.name:
+        return all([ backend.setFanSpeed(idx, speed) for idx, speed in enumerate(state.fanSpeeds) ])
+    return True
@@ -1,15 +1,27 @@
-import sys, os, time, datetime
+import sys, os, time, datetime, threading, traceback
+from collections import deque
 from enum import Enum
-from typing import Callable, Literal, Optional, Tuple, List
+from typing import Callable, Literal, NamedTuple, Optional, Sequence, Tuple, List
 from PySide6 import QtCore, QtGui, QtWidgets
-from windows_toasts import WindowsToaster, Toast, ToastDuration, ToastDisplayImage
+from Backend.ThermalBackend import ThermalBackend, ThermalSnapshot
 from Backend.AWCCThermal import AWCCThermal, NoAWCCWMIClass, CannotInstAWCCWMI
+from Backend.HwmonThermal import HwmonThermal, NoHwmonDevice
 from GUI.QRadioButtonSet import QRadioButtonSet
 from GUI.AppColors import Colors
 from GUI.ThermalUnitWidget import ThermalUnitWidget
 from GUI.QGaugeTrayIcon import QGaugeTrayIcon
-from GUI import HotKey
-from Backend.DetectHardware import DetectHardware
+from GUI.Notifications import Notification, NotificationDispatcher, NotificationSink, makeNotificationSink
+from Backend.StreamStats import StreamStats
+from Backend.FailsafeTrigger import FailsafeTrigger
+from Backend.PowerSource import PowerSource, PowerSourceProvider, makePowerSourceProvider
+from Backend.SelfProfiler import SelfProfiler
+from Backend.Pipeline import Pipeline
+from Backend.TelemetryRecorder import TelemetryRecorder
+from Backend.BurstCapture import BurstCapture
+from Backend.ThermalState import ThermalState, defaultThermalStatePath, saveThermalState
+from Backend.SnapshotPublisher import SnapshotPublisher
+from Backend.ProcessScanner import ProcessProvider, ProcessScanner, makeProcessProvider
+from Backend.ProcessRules import ProcessRule, ProcessRuleMatcher, loadProcessRules
 
 GUI_ICON = 'icons/gaugeIcon.png'
 
@@ -63,15 +75,112 @@ def confirm(title: str, message: str, options: Optional[Tuple[str, str]] = None,
 
 
 class QPeriodic:
-    def __init__(self, parent: QtCore.QObject, periodMs: int, callback: Callable) -> None:
+    def __init__(self, parent: QtCore.QObject, periodMs: int, callback: Callable, profiler: Optional[SelfProfiler] = None) -> None:
         self._tmr = QtCore.QTimer(parent)
         self._tmr.setInterval(periodMs)
         self._tmr.setSingleShot(False)
+        if profiler is not None:
+            self._tmr.timeout.connect(profiler.wakeup)
         self._tmr.timeout.connect(callback)
     def start(self):
         self._tmr.start()
     def stop(self):
         self._tmr.stop()
+    def setPeriod(self, periodMs: int):
+        self._tmr.setInterval(periodMs) # Restarts the timer if it is running
+    def getPeriod(self) -> int:
+        return self._tmr.interval()
+
+class PeriodicThread:
+    # Same as QPeriodic, but `callback` runs on its own thread (with `lock` held), so a busy GUI thread cannot delay it.
+    # While the thread is being stopped it does not wait for the lock anymore, so stop() may be called with the lock held
+    LOCK_POLL_SEC = 0.05
+
+    def __init__(self, name: str, periodMs: int, callback: Callable, lock: threading.RLock, profiler: Optional[SelfProfiler] = None) -> None:
+        self._name = name
+        self._periodMs = periodMs
+        self._callback = callback
+        self._lock = lock
+        self._profiler = profiler
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stopping = False
+        self._wake.clear()
+        self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+        self._thread.start()
+    def stop(self):
+        thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._stopping = True
+        self._wake.set()
+        thread.join()
+    def setPeriod(self, periodMs: int):
+        if periodMs != self._periodMs:
+            self._periodMs = periodMs
+            self._wake.set() # Restarts the period, as QPeriodic does
+    def getPeriod(self) -> int:
+        return self._periodMs
+    def tick(self):
+        # Runs the callback now, on the calling thread (e.g. ticks driven by a benchmark while the thread is stopped)
+        with self._lock:
+            self._runCallback()
+    def _runCallback(self):
+        if self._profiler is not None:
+            self._profiler.wakeup()
+        try:
+            self._callback()
+        except Exception:
+            traceback.print_exc()
+    def _run(self):
+        deadline = time.monotonic() + self._periodMs / 1000
+        while True:
+            woken = self._wake.wait(max(0.0, deadline - time.monotonic()))
+            if self._stopping:
+                return
+            now = time.monotonic()
+            if woken:
+                self._wake.clear()
+                deadline = now + self._periodMs / 1000
+                continue
+            # Fixed rate; a late tick is not caught up with a burst of ticks
+            deadline += self._periodMs / 1000
+            if deadline < now:
+                deadline = now + self._periodMs / 1000
+            while not self._lock.acquire(timeout=self.LOCK_POLL_SEC):
+                if self._stopping:
+                    return
+            try:
+                self._runCallback()
+            finally:
+                self._lock.release()
+
+class QBackgroundTask(QtCore.QObject):
+    # Runs `task()` once on a worker thread, then `onDone(result, error)` on the GUI thread
+    finished = QtCore.Signal(object, object)
+    def __init__(self, parent: QtCore.QObject, task: Callable, onDone: Callable[[object, Optional[Exception]], None]) -> None:
+        super().__init__()
+        self._task = task
+        self._t = QtCore.QThread(parent)
+        self.moveToThread(self._t)
+        self.finished.connect(self._t.quit, QtCore.Qt.DirectConnection) # Lets wait() work without the event loop
+        self.finished.connect(onDone)
+        self._t.started.connect(self._run)
+    def start(self):
+        self._t.start()
+    def isRunning(self) -> bool:
+        return self._t.isRunning()
+    def wait(self):
+        self._t.wait()
+    def _run(self):
+        try:
+            self.finished.emit(self._task(), None)
+        except Exception as ex:
+            self.finished.emit(None, ex)
 
 class ThermalMode(Enum):
     Balanced = 'Balanced'
@@ -80,25 +189,103 @@ class ThermalMode(Enum):
     
 class SettingsKey(Enum):
     Mode = "app/mode"
-    CPUFanSpeed = "app/fan/cpu/speed"
-    CPUThresholdTemp = "app/fan/cpu/threshold_temp"
-    GPUFanSpeed = "app/fan/gpu/speed"
-    GPUThresholdTemp = "app/fan/gpu/threshold_temp"
     FailSafeIsOnFlag = "app/failsafe_is_on_flag"
+    PredictiveFailSafeFlag = "app/predictive_failsafe_flag"
     MinimizeOnCloseFlag = "app/minimize_on_close_flag"
 
+def fanSettingsKey(fanIdx: int, key: Literal['speed', 'threshold_temp']) -> str:
+    # "app/fan/cpu/speed", "app/fan/gpu/threshold_temp", "app/fan/2/speed", ...
+    name = 'cpu' if fanIdx == ThermalBackend.CPUFanIdx else 'gpu' if fanIdx == ThermalBackend.GPUFanIdx else str(fanIdx)
+    return f"app/fan/{name}/{key}"
+
+class ThermalUnitProfile(NamedTuple):
+    name: str
+    tempMinMax: Tuple[int, int]
+    tempColorLimits: Tuple[int, int]    # Green to Yellow and Yellow to Red thresholds
+    failsafeTemp: int                   # Default fail-safe threshold
+    failsafeTempRange: range            # Selectable fail-safe thresholds
+
+class AcquiredSample(NamedTuple):
+    ts: float                           # Unix time
+    monotonic: float
+    snapshot: ThermalSnapshot
+    temps: List[Optional[int]]          # Primary sensor per fan
+    mode: str = ''                      # Set by the evaluate stage: mode and fail-safe state after evaluating this sample...
+    failsafeTripped: bool = False
+    peaks: Tuple[Optional[int], ...] = ()   # ...[fanIdx] primary sensor peak over the longest statistics window...
+    statsToolTips: Optional[Tuple[Tuple[str, str], ...]] = None # ...[fanIdx] (temp, RPM) statistics, when they are shown
+
+class PowerBudget(NamedTuple):
+    sampleIntervalMs: int               # Sensor polling (capped by TCC_GUI.FAILSAFE_MAX_CHECK_PERIOD_MS)
+    uiRefreshIntervalMs: int            # Gauges, tooltips, tray icon
+    historyIntervalMs: int              # History graph resolution
+
 def errorExit(message: str, message2: Optional[str] = None) -> None:
     if not QtWidgets.QApplication.instance():
          QtWidgets.QApplication([])
     alert("Oh-oh", message, QtWidgets.QMessageBox.Icon.Critical, message2 = message2)
     sys.exit(1)
 
-class TCC_GUI(QtWidgets.QWidget):
+
+APP_STYLESHEET = f"""
+    QGauge {{
+        border: 1px solid gray;
+        border-radius: 3px;
+        background-color: {Colors.GREY.value};
+    }}
+    QGauge::chunk {{
+        background-color: {Colors.BLUE.value};
+    }}
+    * {{
+        color: {Colors.WHITE.value};
+        background-color: {Colors.DARK_GREY.value};
+    }}
+    QToolTip {{
+        background-color: black;
+        color: {Colors.WHITE.value};
+        border: 1px solid {Colors.DARK_GREY.value};
+        border-radius: 3;
+    }}
+    QComboBox {{
+        border: 1px solid gray;
+        border-radius: 3px;
+        padding: 1px 0.6em 1px 3px;
+    }}
+    QComboBox::disabled {{
+        color: {Colors.GREY.value};
+    }}
+"""
+
+class TCC_GUI(QtCore.QObject):
+    # Tray-resident part of the app: tray icon and menu, control loop, fail-safe, settings and all the state.
+    # The main window (`MainWindow`) is built on demand and destroyed when closed to tray.
+    # The control loop runs on its own thread; the state it shares with the GUI thread is guarded by `_controlLock`.
     TEMP_UPD_PERIOD_MS = 1000
+    FAILSAFE_MAX_CHECK_PERIOD_MS = 2000 # Fail-safe is evaluated at least this often, regardless of the power budget
+    TIMER_SLACK_MS = 50                 # Tolerance for timer jitter when comparing intervals
+    PROFILE_LOG_PERIOD_MS = 60000
+    PROCESS_SCAN_PERIOD_MS = 3000       # Process rules: running executables are checked this often...
+    PROCESS_RULE_DEBOUNCE_SEC = 6       # ...and a different rule is applied once it has been the match for this long
+    RENDER_MAX_DUTY = 0.25              # Rendering is skipped (latest sample wins) rather than taking more than this share of the time
+    RECORD_QUEUE_LEN = 16               # Samples waiting for the GUI thread to record them before the control thread records them itself
+    TUNE_TARGET_MARGIN_C = 10           # Fan speed tuning keeps the temperatures this far below the fail-safe thresholds
+    BURST_SAMPLE_PERIOD_MS = 100        # Burst capture: sampling period while capturing around a fail-safe event...
+    BURST_PRE_TRIGGER_SEC = 30          # ...samples kept from before the trigger...
+    BURST_POST_TRIGGER_SEC = 30         # ...captured after the (last) trigger, by default...
+    BURST_MAX_SEC = 300                 # ...and at most this long in total
+    POWER_BUDGETS = {
+        PowerSource.AC: PowerBudget(TEMP_UPD_PERIOD_MS, 1000, 1000),
+        PowerSource.Battery: PowerBudget(2000, 4000, 4000),
+    }
     FAILSAFE_CPU_TEMP = 95
     FAILSAFE_GPU_TEMP = 85
+    FAILSAFE_OTHER_TEMP = 95
     FAILSAFE_TRIGGER_DELAY_SEC = 8
     FAILSAFE_RESET_AFTER_TEMP_IS_OK_FOR_SEC = 60
+    FAILSAFE_PREDICT_WINDOW_SEC = 10    # Predictive fail-safe: temperature trend is fitted over this window...
+    FAILSAFE_PREDICT_HORIZON_SEC = 10   # ...and extrapolated this far ahead (about the time G-mode needs to spin the fans up)
+    STATS_WINDOWS_SEC = (60, 300)   # Sliding windows for the per-sensor statistics (the last one is used as "peak" in the tray tooltip)
+    HISTORY_LEN = 600               # History graph samples kept while the main window does not exist
     APP_NAME = "Thermal Control Center for Dell G15"
     APP_VERSION = "1.6.5"
     APP_DESCRIPTION = "This app is an open-source replacement for Alienware Control Center "
@@ -107,10 +294,10 @@ class TCC_GUI(QtWidgets.QWidget):
     # Green to Yellow and Yellow to Red thresholds
     GPU_COLOR_LIMITS = (72, 85)
     CPU_COLOR_LIMITS = (85, 95)
+    FAN_RPM_MIN_MAX = (0, 5500)
+    FAN_SPEED_SLIDER_MAX_AND_TICK = (120, 20)
 
     # private
-    _failsafeTempIsHighTs = 0                           # Last time when the temp was registered to be high
-    _failsafeTempIsHighStartTs: Optional[int] = None    # Time when the temp first registered to be high (without going lower than the threshold)
     _failsafeTrippedPrevModeStr: Optional[str] = None   # Mode (Custom, Balanced) before fail-safe tripped, as a string
     _failsafeOn = True
     _prevSavedSettingsValues: list = []
@@ -118,40 +305,121 @@ class TCC_GUI(QtWidgets.QWidget):
     _gModeKeySignal = QtCore.Signal()
     _gModeKeyPrevModeStr: Optional[str] = None
 
-    _toaster = WindowsToaster(APP_NAME)
+    # Control thread -> GUI thread (direct calls when emitted on the GUI thread)
+    _modeChanged = QtCore.Signal()
+    _fatalError = QtCore.Signal(str, str)
+    _deferRequested = QtCore.Signal(object, int)
 
-    _modeSwitch: QRadioButtonSet
+    _mode: str
+    _window: Optional["MainWindow"]
 
-    def __init__(self, awcc: AWCCThermal):
+    @classmethod
+    def unitProfile(cls, fanIdx: int) -> ThermalUnitProfile:
+        if fanIdx == ThermalBackend.GPUFanIdx:
+            return ThermalUnitProfile('GPU', (0, 95), cls.GPU_COLOR_LIMITS, cls.FAILSAFE_GPU_TEMP, range(50, 91))
+        if fanIdx == ThermalBackend.CPUFanIdx:
+            return ThermalUnitProfile('CPU', (0, 110), cls.CPU_COLOR_LIMITS, cls.FAILSAFE_CPU_TEMP, range(50, 101))
+        return ThermalUnitProfile(f'Fan {fanIdx + 1}', (0, 110), cls.CPU_COLOR_LIMITS, cls.FAILSAFE_OTHER_TEMP, range(50, 101))
+
+    def __init__(self, awcc: ThermalBackend, powerSource: Optional[PowerSourceProvider] = None, profileLogPath: Optional[str] = None, notificationSink: Optional[NotificationSink] = None, recordDir: Optional[str] = None, publishName: Optional[str] = None, processRules: Optional[Sequence[ProcessRule]] = None, processProvider: Optional[ProcessProvider] = None, burstCaptureDir: Optional[str] = None, burstPostTriggerSec: Optional[float] = None, statePath: Optional[str] = None, restoredState: Optional[ThermalState] = None):
         super().__init__()
         self._awcc = awcc
+        self._notifier = NotificationDispatcher(notificationSink or makeNotificationSink(self.APP_NAME, resourcePath(GUI_ICON)))
+        self._window = None
+        self._controlLock = threading.RLock()
+        self.profiler = SelfProfiler()
+        self._powerSource = powerSource if powerSource is not None else makePowerSourceProvider()
+        self._powerBudget = self.POWER_BUDGETS[PowerSource.AC]
+        self._lastRenderTs = 0.0
+        self._lastRenderedMode: Optional[str] = None
+        self._lastHistoryTs = 0.0
+        self._lastStatsTs = 0.0
+        self._statsShown = False            # Main window is visible: evaluate takes its statistics snapshot
+        self._windowStale = False           # Rendering skipped the minimized/hidden main window, repaint it when restored
+        self._lastSnapshot: Optional[ThermalSnapshot] = None
+
+        # Thermal units (fan + related sensors) as discovered by the backend. Lists below are indexed by fanIdx
+        fanCount = self._awcc.getFanCount()
+        self._profiles = [ self.unitProfile(idx) for idx in range(fanCount) ]
+        # Display order: GPU, CPU, then the rest
+        self._unitOrder = sorted(range(fanCount), key= lambda idx: (0 if idx == ThermalBackend.GPUFanIdx else 1 if idx == ThermalBackend.CPUFanIdx else 2, idx))
+        self._failsafeTemps = [ p.failsafeTemp for p in self._profiles ]
+        # Fans with no related sensors cannot trip the fail-safe
+        self._failsafeFanIdxs = [ idx for idx in range(fanCount) if self._awcc.getFanRelatedSensorIds(idx) ]
+        self._failsafeTrigger = FailsafeTrigger(self.FAILSAFE_TRIGGER_DELAY_SEC, self.FAILSAFE_RESET_AFTER_TEMP_IS_OK_FOR_SEC, self.FAILSAFE_PREDICT_HORIZON_SEC)
+        self._fanSpeeds = [ self.FAN_SPEED_SLIDER_MAX_AND_TICK[0] // 2 ] * fanCount
+        self._unitTitles = [ p.name for p in self._profiles ]
+        self._history = [ deque(maxlen= self.HISTORY_LEN) for _ in range(fanCount) ] # [fanIdx] -> (temp, rpm)
+
+        # Telemetry recording (for the offline analysis, see tcc-analyze.py)
+        self._recordDir = recordDir
+        self._recorder = TelemetryRecorder(recordDir, [ m.value for m in ThermalMode ]) if recordDir else None
+        self._tuneTask: Optional[QBackgroundTask] = None
+        if self._recorder is not None:
+            print(f'Recording telemetry to {recordDir}')
+
+        # Burst capture: when a fail-safe trip is imminent or happens, sample fast for a while and save the event
+        # along with the samples from before it (see BurstCapture)
+        self._burstCapture = BurstCapture(
+            burstCaptureDir, [ m.value for m in ThermalMode ],
+            self.BURST_PRE_TRIGGER_SEC, burstPostTriggerSec or self.BURST_POST_TRIGGER_SEC, self.BURST_MAX_SEC
+        ) if burstCaptureDir else None
+        self._burstImminent = False
+        if self._burstCapture is not None:
+            print(f'Burst capture to {burstCaptureDir}')
+
+        # Every snapshot is published to shared memory for external readers (overlays etc., see SnapshotReader)
+        self._publisher: Optional[SnapshotPublisher] = None
+        if publishName:
+            try:
+                self._publisher = SnapshotPublisher(
+                    [ m.value for m in ThermalMode ],
+                    [ { 'name': p.name, 'sensorIds': self._awcc.getFanRelatedSensorIds(idx) } for idx, p in enumerate(self._profiles) ],
+                    publishName
+                )
+                print(f'Publishing snapshots to shared memory "{self._publisher.name}"')
+            except Exception as ex:
+                print(f'Snapshot publishing is not available: {ex}')
+
+        # Per-process thermal profiles: the first rule whose executable is running sets the mode (and fan speeds).
+        # State before the first rule kicked in is restored when no rule matches anymore, unless the user
+        # has changed the mode or fan speeds meanwhile
+        self._processScanner: Optional[ProcessScanner] = None
+        self._processRuleMatcher: Optional[ProcessRuleMatcher] = None
+        self._processRulePrevState: Optional[Tuple[str, List[int]]] = None # (mode, fan speeds)
+        self._processRuleAppliedState: Optional[Tuple[str, List[int]]] = None # As left by the last rule
+        if processRules:
+            provider = processProvider if processProvider is not None else makeProcessProvider()
+            if provider is not None:
+                self._processScanner = ProcessScanner(provider)
+                self._processRuleMatcher = ProcessRuleMatcher(processRules, self.PROCESS_RULE_DEBOUNCE_SEC)
+                print(f'Process rules: {len(processRules)}')
+
+        # Incremental statistics, updated in O(1) per sample: [fanIdx][relatedSensorIdx] and [fanIdx]
+        self._tempStats = [
+            [ StreamStats(self.STATS_WINDOWS_SEC, (0, 127), trendWindowSec= self.FAILSAFE_PREDICT_WINDOW_SEC) for _ in self._awcc.getFanRelatedSensorIds(idx) ]
+            for idx in range(fanCount)
+        ]
+        self._rpmStats = [ StreamStats(self.STATS_WINDOWS_SEC, (0, 8000), binWidth= 100) for _ in range(fanCount) ]
 
         self.settings = QtCore.QSettings(self.APP_URL, "AWCC")
         print(f'Settings location: {self.settings.fileName()}')
 
-        # Set main window props
-        self.setFixedSize(600, 0)
-        self.setWindowFlags(QtCore.Qt.Window | QtCore.Qt.WindowMinimizeButtonHint | QtCore.Qt.WindowCloseButtonHint)
-        self.setWindowIcon(QtGui.QIcon(resourcePath(GUI_ICON)))
-        self.mouseReleaseEvent = lambda evt: (
-            evt.button() == QtCore.Qt.RightButton and
-            alert("About", f"{self.APP_NAME} v{self.APP_VERSION}", message2 = f"{self.APP_DESCRIPTION}\n{self.APP_URL}")
-        )
-
         # Set up tray icon
-        self.trayIcon = QGaugeTrayIcon((self.GPU_COLOR_LIMITS, self.CPU_COLOR_LIMITS))
+        self.trayIcon = QGaugeTrayIcon([ self._profiles[idx].tempColorLimits for idx in self._unitOrder ])
         menu = QtWidgets.QMenu()
+        self._trayMenu = menu
         # Mode switch
         menu.addSection("Mode")
         self._trayMenuModeSwitch = {} # Dict[ThermalMode, QtWidgets.QAction]
         for m in ThermalMode:
             modeAction = menu.addAction("-")
-            modeAction.triggered.connect(lambda _, m_value=m.value: self._modeSwitch.setChecked(m_value))
+            modeAction.triggered.connect(lambda _, m_value=m.value: self.setMode(m_value))
             self._trayMenuModeSwitch[m.value] = modeAction
         # Settings
         menu.addSection("Settings")
         showAction = menu.addAction("Show")
-        showAction.triggered.connect(self.showNormal)
+        showAction.triggered.connect(self.showWindow)
         addToAutorunAction = menu.addAction("Enable autorun")
         def autorunTaskRun(action: Literal['add', 'remove']) -> None:
             err = autorunTask(action)
@@ -159,13 +427,17 @@ class TCC_GUI(QtWidgets.QWidget):
                 alert("Error", f"Failed to {action} autorun task. Error={err}", QtWidgets.QMessageBox.Icon.Critical)
             else:
                 alert("Success", f"Autorun on system startup {'Enabled' if action == 'add' else 'Disabled'}")
-            # When in minimized state, a wired bug causes the app to close if we won't touch some of the `self.show*()` methods
-            if self.isMinimized():
-                self.showMinimized()
-                self.hide()
         addToAutorunAction.triggered.connect(lambda: autorunTaskRun('add'))
         removeFromAutorunAction = menu.addAction("Disable autorun")
         removeFromAutorunAction.triggered.connect(lambda: autorunTaskRun('remove'))
+        self._trayMenuPredictiveFailsafe = menu.addAction("Predictive fail-safe")
+        self._trayMenuPredictiveFailsafe.setCheckable(True)
+        self._trayMenuPredictiveFailsafe.setToolTip("Switch to G-mode as soon as the temperature trend is about to reach the fail-safe threshold")
+        self._trayMenuPredictiveFailsafe.toggled.connect(self.setPredictiveFailsafe)
+        if self._recorder is not None:
+            tuneAction = menu.addAction("Tune fan speeds...")
+            tuneAction.setToolTip("Fit the thermal model to the recorded telemetry and suggest the lowest Custom fan speeds")
+            tuneAction.triggered.connect(self.tuneFanSpeeds)
         restoreAction = menu.addAction("Restore Default")
         restoreAction.triggered.connect(self.clearAppSettings)
         exitAction = menu.addAction("Exit")
@@ -178,19 +450,9 @@ class TCC_GUI(QtWidgets.QWidget):
 
         def onTrayIconActivated(trigger):
             if trigger == QtWidgets.QSystemTrayIcon.ActivationReason.DoubleClick:
-                self.showNormal()
-                self.activateWindow()
+                self.showWindow()
         self.connect(tray, QtCore.SIGNAL("activated(QSystemTrayIcon::ActivationReason)"), onTrayIconActivated)
 
-        # Set up GUI
-        self.setObjectName('QMainWindow')
-        self.setWindowTitle(self.APP_NAME)
-
-        self._thermalGPU = ThermalUnitWidget(self, tempMinMax= (0, 95), tempColorLimits= self.GPU_COLOR_LIMITS, fanMinMax= (0, 5500), sliderMaxAndTick= (120, 20))
-        self._thermalGPU.setTitle('GPU')
-        self._thermalCPU = ThermalUnitWidget(self, tempMinMax= (0, 110), tempColorLimits= self.CPU_COLOR_LIMITS, fanMinMax= (0, 5500), sliderMaxAndTick= (120, 20))
-        self._thermalCPU.setTitle('CPU')
-
         # Detecting GPU/CPU model is a slow operation, run asynchronously
         class DetectCpuGpuModelsWorker(QtCore.QObject):
             finished = QtCore.Signal(str, str)
@@ -198,195 +460,414 @@ class TCC_GUI(QtWidgets.QWidget):
                 super().__init__()
                 self._t = QtCore.QThread(parent)
                 self.moveToThread(self._t)
-                self.finished.connect(self._t.quit)
+                self.finished.connect(self._t.quit, QtCore.Qt.DirectConnection) # Lets wait() work without the event loop
                 self.finished.connect(on_result)
                 self._t.started.connect(self._task)
                 self._t.start()
             def _task(self):
                 print("DetectCpuGpuModelsWorker: started")
-                d = DetectHardware()
-                gpuModel = d.getHardwareName(d.GPUFanIdx)
-                cpuModel = d.getHardwareName(d.CPUFanIdx)
+                gpuModel = cpuModel = None
+                try:
+                    from Backend.DetectHardware import DetectHardware
+                    d = DetectHardware()
+                    gpuModel = d.getHardwareName(d.GPUFanIdx)
+                    cpuModel = d.getHardwareName(d.CPUFanIdx)
+                except Exception as ex:
+                    print(f"DetectCpuGpuModelsWorker: {ex}")
                 print(f"DetectCpuGpuModelsWorker: finished: {gpuModel}, {cpuModel}")
                 self.finished.emit(gpuModel, cpuModel)
             def start(self):
                 self._t.start()
-        detect = DetectCpuGpuModelsWorker(self, self.updateGaugeTitles)
-        detect.start()
-
-        lTherm = QtWidgets.QHBoxLayout()
-        lTherm.addWidget(self._thermalGPU)
-        lTherm.addWidget(self._thermalCPU)
-
-        self._modeSwitch = QRadioButtonSet(None, None, list(map(lambda m: (m.name.replace('_', ' '), m.value), ThermalMode)))
-
-        # Fail-safe indicator
-        failsafeIndicator = QtWidgets.QLabel()
-        def updFailsafeIndicator() -> None:
-            color = Colors.GREEN.value if self._failsafeOn else Colors.DARK_GREY.value
-            msg = "Normal"
-            if self._failsafeTempIsHighTs > 0: # Fail-safe have tripped at some point in the past
-                color = Colors.YELLOW.value
-                timeStr = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self._failsafeTempIsHighTs))
-                msg = f"Last high temp at {timeStr}"
-                if self._failsafeTrippedPrevModeStr is not None: # Fail-safe is in tripped state now
-                    color = Colors.RED.value
-
-            failsafeIndicator.setStyleSheet(f"QLabel {{ min-height: 14px; min-width: 14px; max-height: 14px; max-width: 14px; border: 1px solid {Colors.GREY.value}; border-radius: 7px; background: {color}; }}")
-            failsafeIndicator.setToolTip(msg)
-        updFailsafeIndicator()
-
-        # Fail-safe temp limits
-        self._limitTempGPU = QtWidgets.QComboBox()
-        self._limitTempGPU.addItems(list(map(lambda v: str(v), range(50, 91))))
-        self._limitTempGPU.setToolTip("Threshold GPU temp")
-        self._limitTempCPU = QtWidgets.QComboBox()
-        self._limitTempCPU.addItems(list(map(lambda v: str(v), range(50, 101))))
-        self._limitTempCPU.setToolTip("Threshold CPU temp")
-        def onLimitGPUChange():
-            val = self._limitTempGPU.currentText()
-            if val.isdigit(): self.FAILSAFE_GPU_TEMP = int(val)
-        self._limitTempGPU.currentIndexChanged.connect(onLimitGPUChange)
-        def onLimitCPUChange():
-            val = self._limitTempCPU.currentText()
-            if val.isdigit(): self.FAILSAFE_CPU_TEMP = int(val)
-        self._limitTempCPU.currentIndexChanged.connect(onLimitCPUChange)
-
-        # Fail-safe checkbox
-        self._failsafeCB = QtWidgets.QCheckBox("Fail-safe")
-        self._failsafeCB.setToolTip(f"Switch to G-mode (fans on max) when GPU temp reaches {self.FAILSAFE_GPU_TEMP}°C or CPU reaches {self.FAILSAFE_CPU_TEMP}°C")
-        def onFailsafeCB():
-            self._failsafeOn = self._failsafeCB.isChecked()
-            self._failsafeTempIsHighTs = 0
-            self._failsafeTrippedPrevModeStr = None
-            self._failsafeTempIsHighStartTs = None
-            updFailsafeIndicator()
-        self._failsafeCB.toggled.connect(onFailsafeCB)
-        self._failsafeCB.setChecked(self._failsafeOn)
-
-        failsafeBox = QtWidgets.QHBoxLayout()
-        failsafeBox.addWidget(self._failsafeCB)
-        failsafeBox.addWidget(self._limitTempGPU)
-        failsafeBox.addWidget(self._limitTempCPU)
-        failsafeBox.addWidget(failsafeIndicator)
+            def wait(self):
+                self._t.wait()
+        self._detect = DetectCpuGpuModelsWorker(self, self.updateGaugeTitles)
+        self._detect.start()
 
-        modeBox = QtWidgets.QHBoxLayout()
-        modeBox.addWidget(self._modeSwitch, alignment= QtCore.Qt.AlignLeft)
-        modeBox.addWidget(QtWidgets.QWidget(), alignment= QtCore.Qt.AlignRight) # Insert dummy Widget in order to move the following 'failsafeBox' to the right side
-        modeBox.addLayout(failsafeBox)
-
-        mainLayout = QtWidgets.QVBoxLayout(self)
-        mainLayout.addLayout(lTherm)
-        mainLayout.addLayout(modeBox)
-        mainLayout.setAlignment(QtCore.Qt.AlignTop)
-        mainLayout.setContentsMargins(10, 0, 10, 0)
-
-        # Glue GUI to backend
+        # Glue to backend
         self.gModeHotKey = None
         self._updateGaugesTask = None
-
-        def setFanSpeed(fan: Literal['GPU', 'CPU'], speed: int) -> None:
-            res = self._awcc.setFanSpeed(self._awcc.GPUFanIdx if fan == 'GPU' else self._awcc.CPUFanIdx, speed)
-            print(f'Set {fan} fan speed to {speed}: ' + ('ok' if res else 'fail'))
-
-        def updateFanSpeed():
-            if self._modeSwitch.getChecked() != ThermalMode.Custom.value:
+        self._profileLogTask = None
+        self._processScanTask = None
+        self._pipeline = Pipeline(self._deferRequested.emit, self.profiler)
+        self._deferRequested.connect(self._defer)
+        self._modeChanged.connect(self._syncMode)
+        self._fatalError.connect(self._errorExit)
+
+        # Mode and fan speeds are saved to `statePath` for the fast restore at the next start (see tcc-g15.py).
+        # A state that has already been restored is adopted as is, otherwise the mode and fan speeds saved in the
+        # settings are applied, once (loading the settings below finds them already set)
+        self._statePath = statePath
+        if restoredState is not None and restoredState.mode in [ m.value for m in ThermalMode ] and len(restoredState.fanSpeeds) == fanCount:
+            self._mode = restoredState.mode
+            self._fanSpeeds = list(restoredState.fanSpeeds)
+            self._syncMode()
+        else:
+            self._mode, self._fanSpeeds = self._savedModeAndFanSpeeds()
+            self._applyMode(self._mode)
+        self._updateRecorderTopology()
+
+        def applyPowerBudget():
+            source = self._powerSource.getPowerSource() if self._powerSource else PowerSource.Unknown
+            budget = self.POWER_BUDGETS.get(source, self.POWER_BUDGETS[PowerSource.AC])
+            periodMs = min(budget.sampleIntervalMs, self.FAILSAFE_MAX_CHECK_PERIOD_MS)
+            if self._burstCapture is not None and self._burstCapture.isCapturing():
+                periodMs = min(periodMs, self.BURST_SAMPLE_PERIOD_MS)
+            if budget is self._powerBudget and self._updateGaugesTask.getPeriod() == periodMs:
                 return
-            setFanSpeed('GPU', self._thermalGPU.getSpeedSlider())
-            setFanSpeed('CPU', self._thermalCPU.getSpeedSlider())
-        self._thermalGPU.speedSliderChanged(updateFanSpeed)
-        self._thermalCPU.speedSliderChanged(updateFanSpeed)
-
-        def onModeChange(val: str):
-            self._thermalGPU.setSpeedDisabled(val != ThermalMode.Custom.value)
-            self._thermalCPU.setSpeedDisabled(val != ThermalMode.Custom.value)
-            res = self._awcc.setMode(self._awcc.Mode[val])
-            print(f'Set mode {val}: ' + ('ok' if res else 'fail'))
-            if not res:
-                self._errorExit(f"Failed to set mode {val}", "Program is terminated")
-            updateFanSpeed()
-            if val != ThermalMode.G_Mode.value:
-                self._failsafeTrippedPrevModeStr = None # In case the mode was switched manually
-            updFailsafeIndicator()
-            for m in ThermalMode:
-                self._trayMenuModeSwitch[m.value].setText(f"{'•' if m.value == val else ' '} {m.name.replace('_', ' ')}")
-
-        self._modeSwitch.setChecked(ThermalMode.Balanced.value)
-        onModeChange(ThermalMode.Balanced.value)
-        self._modeSwitch.setOnChange(onModeChange)
-
-        def updateAppState():
-            # Get temps and RPMs
-            gpuTemp = self._awcc.getFanRelatedTemp(self._awcc.GPUFanIdx)
-            gpuRPM = self._awcc.getFanRPM(self._awcc.GPUFanIdx)
-            cpuTemp = self._awcc.getFanRelatedTemp(self._awcc.CPUFanIdx)
-            cpuRPM = self._awcc.getFanRPM(self._awcc.CPUFanIdx)
-            # Update UI gauges
-            if gpuTemp is not None: self._thermalGPU.setTemp(gpuTemp)
-            if gpuRPM is not None: self._thermalGPU.setFanRPM(gpuRPM)
-            if cpuTemp is not None: self._thermalCPU.setTemp(cpuTemp)
-            if cpuRPM is not None: self._thermalCPU.setFanRPM(cpuRPM)
-            # print(gpuTemp, gpuRPM, cpuTemp, cpuRPM)
+            if budget is not self._powerBudget:
+                print(f'Power source {source.value}: sample every {periodMs} ms, refresh UI every {budget.uiRefreshIntervalMs} ms')
+            self._powerBudget = budget
+            self._updateGaugesTask.setPeriod(periodMs)
+
+        # Acquisition pipeline: read -> evaluate -> publish, capture, record, render, settings.
+        # The control path (read, evaluate: statistics, fail-safe and mode switching, publish, capture) runs on
+        # the control thread, so rendering cannot delay it however slow it gets. Recording, rendering and saving
+        # the settings are deferred to the GUI thread's event loop through bounded queues: evaluate and record get
+        # every sample, render and settings only the latest one (a slow UI drops frames). Evaluate snapshots what
+        # rendering needs from the statistics into the sample, so the GUI thread renders without `_controlLock`
+        def readStage():
+            prof = self.profiler
+            prof.beginTick()
+            applyPowerBudget()
+            prof.mark('power')
+            # Get temps and RPMs of all fans and their related sensors in one batch
+            snapshot = self._awcc.readSnapshot()
+            self._lastSnapshot = snapshot
+            sample = AcquiredSample(time.time(), time.monotonic(), snapshot, [ snapshot.fanTemp(idx) for idx in range(fanCount) ])
+            prof.mark('read')
+            evaluate.push(sample)
+            prof.endTick()
+
+        def evaluateStage(sample: AcquiredSample) -> AcquiredSample:
+            prof = self.profiler
+            start = time.perf_counter()
+            snapshot, temps, now = sample.snapshot, sample.temps, sample.monotonic
+            # Update statistics
+            for idx in range(fanCount):
+                for stats, temp in zip(self._tempStats[idx], snapshot.temps[idx]):
+                    stats.add(temp, now)
+                self._rpmStats[idx].add(snapshot.rpms[idx], now)
+            start = prof.lap('stats', start)
 
             # Handle fail-safe
-            tempIsHigh = (
-                (gpuTemp is None) or (gpuTemp >= self.FAILSAFE_GPU_TEMP) or
-                (cpuTemp is None) or (cpuTemp >= self.FAILSAFE_CPU_TEMP)
+            trigger = self._failsafeTrigger
+            tripReason = trigger.update(
+                sample.ts,
+                [ temps[idx] for idx in self._failsafeFanIdxs ],
+                [ self._failsafeTemps[idx] for idx in self._failsafeFanIdxs ],
+                [ self._tempStats[idx][0].trend for idx in self._failsafeFanIdxs ]
+            )
+
+            tripping = (self._failsafeOn and
+                self._mode != ThermalMode.G_Mode.value and
+                tripReason is not None
             )
-            
-            if tempIsHigh:
-                self._failsafeTempIsHighTs = time.time()
 
-            self._failsafeTempIsHighStartTs = (self._failsafeTempIsHighStartTs or time.time()) if tempIsHigh else None
+            # Start a burst capture when the trip becomes imminent or happens, keep it going while it stays imminent
+            burst = self._burstCapture
+            if burst is not None:
+                if tripping or (trigger.imminent and not self._burstImminent):
+                    if burst.trigger(sample.ts, f'trip-{tripReason}' if tripping else 'imminent'):
+                        applyPowerBudget()
+                elif trigger.imminent:
+                    burst.hold(sample.ts)
+                self._burstImminent = trigger.imminent
 
             # Trip fail-safe
-            if (self._failsafeOn and 
-                self._modeSwitch.getChecked() != ThermalMode.G_Mode.value and
-                tempIsHigh and
-                time.time() - self._failsafeTempIsHighStartTs > self.FAILSAFE_TRIGGER_DELAY_SEC
-            ):
-                self._failsafeTrippedPrevModeStr = self._modeSwitch.getChecked()
-                self._modeSwitch.setChecked(ThermalMode.G_Mode.value)
+            if tripping:
+                self._failsafeTrippedPrevModeStr = self._mode
+                self.setMode(ThermalMode.G_Mode.value)
                 self._toasterMessageCurrentMode(source='failsafe')
-                print(f'Fail-safe tripped at GPU={gpuTemp} CPU={cpuTemp}')
+                print(f'Fail-safe tripped ({tripReason}) at ' + ' '.join(f'{self._profiles[idx].name}={temps[idx]}' for idx in self._unitOrder))
 
             # Auto-reset failsafe
             if (self._failsafeTrippedPrevModeStr is not None and
-                time.time() - self._failsafeTempIsHighTs > self.FAILSAFE_RESET_AFTER_TEMP_IS_OK_FOR_SEC
+                trigger.canReset(sample.ts)
             ):
-                self._modeSwitch.setChecked(self._failsafeTrippedPrevModeStr)
+                self.setMode(self._failsafeTrippedPrevModeStr)
                 self._toasterMessageCurrentMode(source='failsafe')
                 self._failsafeTrippedPrevModeStr = None
                 print('Fail-safe reset')
-
-            # Update tray icon
-            self.trayIcon = self.trayIcon.resizeForScreen() or self.trayIcon
-            self.trayIcon.update((gpuTemp, cpuTemp), self._modeSwitch.getChecked() == ThermalMode.G_Mode.value)
-            tray.setIcon(self.trayIcon)
-            tray.setToolTip(f"GPU:    {gpuTemp} °C    {gpuRPM} RPM\nCPU:    {cpuTemp} °C    {cpuRPM} RPM\nMode:    {self._modeSwitch.getChecked().replace('_', ' ')}")
-            
+            start = prof.lap('failsafe', start)
+
+            # Statistics shown by the render stage, at the UI refresh rate
+            statsToolTips = None
+            if self._statsShown and (now - self._lastStatsTs) * 1000 >= self._powerBudget.uiRefreshIntervalMs - self.TIMER_SLACK_MS:
+                self._lastStatsTs = now
+                statsToolTips = tuple(self._statsToolTips(idx) for idx in range(fanCount))
+            peaks = tuple(stats[0].peak() if stats else None for stats in self._tempStats)
+            prof.lap('stats snapshot', start)
+            return sample._replace(mode= self._mode, failsafeTripped= self._failsafeTrippedPrevModeStr is not None, peaks= peaks, statsToolTips= statsToolTips)
+
+        def publishStage(sample: AcquiredSample) -> None:
+            self._publisher.publishSnapshot(sample.ts, sample.mode, sample.failsafeTripped, sample.snapshot)
+
+        def recordStage(sample: AcquiredSample) -> None:
+            self._recorder.record(sample.ts, sample.mode, sample.failsafeTripped, [ t for ts in sample.snapshot.temps for t in ts ], sample.snapshot.rpms)
+
+        def captureStage(sample: AcquiredSample) -> None:
+            path = self._burstCapture.add(sample.ts, sample.mode, sample.failsafeTripped, [ t for ts in sample.snapshot.temps for t in ts ], sample.snapshot.rpms)
+            if path is not None:
+                print(f'Burst capture saved to {path}')
+                applyPowerBudget()
+
+        def renderStage(sample: AcquiredSample) -> None:
+            prof = self.profiler
+            start = time.perf_counter()
+            snapshot, temps, now, mode = sample.snapshot, sample.temps, sample.monotonic, sample.mode
+            # Render at the UI refresh rate of the current power budget (or right away if the mode has changed)
+            if mode != self._lastRenderedMode or (now - self._lastRenderTs) * 1000 >= self._powerBudget.uiRefreshIntervalMs - self.TIMER_SLACK_MS:
+                self._lastRenderTs = now
+                self._lastRenderedMode = mode
+                # Update UI gauges (only if the main window exists and is on screen, it is repainted once restored)
+                window = self._window
+                shown = window is not None and window.isVisible() and not window.isMinimized()
+                self._statsShown = shown
+                self._windowStale = window is not None and not shown
+                if shown:
+                    window.setGauges(temps, snapshot.rpms)
+                    start = prof.lap('gauges', start)
+                    if sample.statsToolTips is not None:
+                        for unit, toolTips in zip(window.thermalUnits, sample.statsToolTips):
+                            unit.setStatsToolTips(*toolTips)
+                        start = prof.lap('gauge tooltips', start)
+
+                # Update tray icon
+                self.trayIcon = self.trayIcon.resizeForScreen() or self.trayIcon
+                self.trayIcon.update([ temps[idx] for idx in self._unitOrder ], mode == ThermalMode.G_Mode.value)
+                tray.setIcon(self.trayIcon)
+                start = prof.lap('tray icon', start)
+                tray.setToolTip(self._trayToolTip(snapshot, sample.peaks, mode))
+                start = prof.lap('tray tooltip', start)
+
+            # History graph resolution
+            if (now - self._lastHistoryTs) * 1000 >= self._powerBudget.historyIntervalMs - self.TIMER_SLACK_MS:
+                self._lastHistoryTs = now
+                window = self._window
+                shown = window is not None and window.isVisible() and not window.isMinimized()
+                for idx in range(fanCount):
+                    historySample = (temps[idx], snapshot.rpms[idx])
+                    self._history[idx].append(historySample)
+                    if shown:
+                        window.thermalUnits[idx].addHistorySample(*historySample)
+                prof.lap('history', start)
+
+        def settingsStage(_: AcquiredSample) -> None:
             # Periodically save app settings
             self._saveAppSettings()
 
+        pipe = self._pipeline
+        evaluate = pipe.stage('evaluate', evaluateStage, capacity= 4)
+        evaluate.connect(
+            *([ pipe.stage('publish', publishStage, latestWins= True) ] if self._publisher is not None else []),
+            *([ pipe.stage('capture', captureStage) ] if self._burstCapture is not None else []),
+            *([ pipe.stage('record', recordStage, capacity= self.RECORD_QUEUE_LEN, deferred= True) ] if self._recorder is not None else []),
+            pipe.stage('render', renderStage, latestWins= True, deferred= True, maxDuty= self.RENDER_MAX_DUTY),
+            pipe.stage('settings', settingsStage, latestWins= True, deferred= True),
+        )
+
         self._loadAppSettings()
 
-        self._updateGaugesTask = QPeriodic(self, self.TEMP_UPD_PERIOD_MS, updateAppState)
-        updateAppState()
+        self._updateGaugesTask = PeriodicThread('TCC control', self.TEMP_UPD_PERIOD_MS, readStage, self._controlLock, self.profiler)
+        self._updateGaugesTask.tick()
         self._updateGaugesTask.start()
 
-        self.gModeHotKey = HotKey.HotKey(HotKey.G_MODE_KEY, self._gModeKeySignal)
+        # Soak test: periodically dump the self-overhead report
+        if profileLogPath:
+            def writeProfileLog():
+                with open(profileLogPath, 'a') as f:
+                    f.write(f"[{datetime.datetime.now().isoformat(timespec='seconds')}]\n{self._profilerReport()}\n\n")
+            self._profileLogTask = QPeriodic(self, self.PROFILE_LOG_PERIOD_MS, writeProfileLog, self.profiler)
+            self._profileLogTask.start()
+            print(f'Writing profile log to {profileLogPath}')
+
+        if self._processScanner is not None:
+            self._processScanTask = QPeriodic(self, self.PROCESS_SCAN_PERIOD_MS, self._onProcessScan, self.profiler)
+            self._onProcessScan()
+            self._processScanTask.start()
+
         self._gModeKeySignal.connect(self._onGModeHotKeyPressed)
-        self.gModeHotKey.start()
+        if sys.platform == 'win32':
+            from GUI import HotKey
+            self.gModeHotKey = HotKey.HotKey(HotKey.G_MODE_KEY, self._gModeKeySignal)
+            self.gModeHotKey.start()
 
-    def updateGaugeTitles(self, gpuModel, cpuModel):
-        if gpuModel: self._thermalGPU.setTitle(gpuModel)
-        if cpuModel: self._thermalCPU.setTitle(cpuModel)
+    # State accessors, used by the main window, the tray menu and the control loop
 
-    def closeEvent(self, event):
+    def getMode(self) -> str:
+        return self._mode
+
+    def setMode(self, val: str) -> None:
+        with self._controlLock:
+            if val == self._mode:
+                return
+            self._mode = val
+            self._applyMode(val)
+
+    def _applyMode(self, val: str) -> None:
+        # Called on the GUI thread or (fail-safe) on the control thread
+        res = self._awcc.setMode(self._awcc.Mode[val])
+        print(f'Set mode {val}: ' + ('ok' if res else 'fail'))
+        if self._burstCapture is not None:
+            self._burstCapture.noteEvent(time.time(), 'mode', val)
+        if not res:
+            self._fatalError.emit(f"Failed to set mode {val}", "Program is terminated")
+        self._updateFanSpeed()
+        if val != ThermalMode.G_Mode.value:
+            self._failsafeTrippedPrevModeStr = None # In case the mode was switched manually
+        self._modeChanged.emit()
+
+    def _syncMode(self) -> None:
+        # Show the current mode in the tray menu and the main window
+        for m in ThermalMode:
+            self._trayMenuModeSwitch[m.value].setText(f"{'•' if m.value == self._mode else ' '} {m.name.replace('_', ' ')}")
+        if self._window is not None:
+            self._window.syncMode()
+            self._window.updFailsafeIndicator()
+
+    def getFanSpeed(self, fanIdx: int) -> int:
+        return self._fanSpeeds[fanIdx]
+
+    def setFanSpeed(self, fanIdx: int, speed: int) -> None:
+        with self._controlLock:
+            if speed == self._fanSpeeds[fanIdx]:
+                return
+            self._fanSpeeds[fanIdx] = speed
+            if self._mode == ThermalMode.Custom.value:
+                self._setFanSpeed(fanIdx, speed)
+
+    def _setFanSpeed(self, fanIdx: int, speed: int) -> None:
+        res = self._awcc.setFanSpeed(fanIdx, speed)
+        print(f'Set {self._profiles[fanIdx].name} fan speed to {speed}: ' + ('ok' if res else 'fail'))
+        if self._burstCapture is not None:
+            self._burstCapture.noteEvent(time.time(), 'fan', fanIdx, speed)
+
+    def _updateFanSpeed(self) -> None:
+        if self._mode != ThermalMode.Custom.value:
+            return
+        for idx in self._unitOrder:
+            self._setFanSpeed(idx, self._fanSpeeds[idx])
+
+    def getFailsafeTemp(self, fanIdx: int) -> int:
+        return self._failsafeTemps[fanIdx]
+
+    def setFailsafeTemp(self, fanIdx: int, temp: int) -> None:
+        with self._controlLock:
+            self._failsafeTemps[fanIdx] = temp
+            self._updateRecorderTopology()
+
+    def _updateRecorderTopology(self) -> None:
+        if self._recorder is None and self._burstCapture is None:
+            return
+        fans = [
+            { 'name': p.name, 'sensorIds': list(self._awcc.getFanRelatedSensorIds(idx)), 'failsafeTemp': self._failsafeTemps[idx] }
+            for idx, p in enumerate(self._profiles)
+        ]
+        for recorder in (self._recorder, self._burstCapture):
+            if recorder is not None:
+                recorder.setTopology(fans)
+
+    def tuneFanSpeeds(self) -> None:
+        # Lowest Custom mode fan speeds that keep the temperatures TUNE_TARGET_MARGIN_C below the fail-safe thresholds
+        # under the heaviest recorded workload. The fit runs in the background, the result is applied if confirmed
+        if self._recorder is None or (self._tuneTask is not None and self._tuneTask.isRunning()):
+            return
+        with self._controlLock: # The control thread records itself on backpressure
+            self._recorder.flush()
+        recordDir = self._recordDir
+        fanNames = [ p.name for p in self._profiles ]
+        targets = { p.name: self._failsafeTemps[idx] - self.TUNE_TARGET_MARGIN_C for idx, p in enumerate(self._profiles) }
+        def task():
+            from Backend.ThermalModelFit import tuneFromRecordings
+            return tuneFromRecordings([ recordDir ], fanNames, targets, speedMax= self.FAN_SPEED_SLIDER_MAX_AND_TICK[0])
+        self._tuneTask = QBackgroundTask(self, task, self._onFanSpeedsTuned)
+        self._tuneTask.start()
+
+    def _onFanSpeedsTuned(self, result: Optional[dict], error: Optional[Exception]) -> None:
+        if error is not None or not result or not result['suggestions']:
+            alert("Fan speed tuning", "Fan speeds could not be tuned.", QtWidgets.QMessageBox.Icon.Warning, message2= str(error or "No fitted thermal model"))
+            return
+        suggestions = result['suggestions']
+        lines = [
+            f"{s['name']}: {s['speed']} (keeps below {s['target']:g}°C)" if s['reachable'] else f"{s['name']}: {s['speed']} ({s['target']:g}°C is not reachable at the heaviest workload)"
+            for s in suggestions
+        ]
+        print(f"Fan speed tuning ({result['samples']} samples): " + ", ".join(lines))
+        apply, _ = confirm("Fan speed tuning", f"Suggested Custom mode fan speeds, from {result['samples']} recorded samples:\n\n" + "\n".join(lines) + "\n\nApply them and switch to the Custom mode?", ("Apply", "Cancel"))
+        if not apply:
+            return
+        for s in suggestions:
+            self.setFanSpeed(s['fanIdx'], s['speed'])
+        self.setMode(ThermalMode.Custom.value)
+        if self._window is not None:
+            self._window.syncSettings()
+
+    def isFailsafeOn(self) -> bool:
+        return self._failsafeOn
+
+    def setFailsafeOn(self, on: bool) -> None:
+        with self._controlLock:
+            self._failsafeOn = on
+            self._failsafeTrigger.reset()
+            self._failsafeTrippedPrevModeStr = None
+        if self._window is not None:
+            self._window.updFailsafeIndicator()
+
+    def isPredictiveFailsafe(self) -> bool:
+        return self._failsafeTrigger.predictive
+
+    def setPredictiveFailsafe(self, on: bool) -> None:
+        with self._controlLock:
+            self._failsafeTrigger.predictive = on
+        if self._trayMenuPredictiveFailsafe.isChecked() != on:
+            self._trayMenuPredictiveFailsafe.setChecked(on)
+
+    def failsafeStatus(self) -> Tuple[str, str]:
+        # (indicator color, message)
+        color = Colors.GREEN.value if self._failsafeOn else Colors.DARK_GREY.value
+        msg = "Normal"
+        lastHighTs = self._failsafeTrigger.lastHighTs
+        if lastHighTs > 0: # Fail-safe have tripped at some point in the past
+            color = Colors.YELLOW.value
+            timeStr = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(lastHighTs))
+            msg = f"Last high temp at {timeStr}"
+            if self._failsafeTrippedPrevModeStr is not None: # Fail-safe is in tripped state now
+                color = Colors.RED.value
+        return color, msg
+
+    # Main window lifecycle
+
+    def showWindow(self) -> None:
+        if self._window is None:
+            self._window = MainWindow(self)
+            self._window.setStyleSheet(APP_STYLESHEET)
+            self._refreshWindow()
+        self._window.showNormal()
+        self._window.activateWindow()
+
+    def onWindowShown(self) -> None:
+        # Main window shown or restored from minimized: repaint what rendering skipped meanwhile
+        if self._windowStale and self._window is not None:
+            self._refreshWindow()
+
+    def _refreshWindow(self) -> None:
+        # Brings the main window up to date: the current snapshot, the history graphs and the statistics
+        window = self._window
+        if self._lastSnapshot is not None:
+            window.setGauges([ self._lastSnapshot.fanTemp(idx) for idx in range(len(self._profiles)) ], self._lastSnapshot.rpms)
+        for idx, unit in enumerate(window.thermalUnits):
+            unit.setHistory(self._history[idx])
+            with self._controlLock:
+                toolTips = self._statsToolTips(idx)
+            unit.setStatsToolTips(*toolTips)
+        self._statsShown = True
+        self._windowStale = False
+
+    def onWindowClose(self, event: QtGui.QCloseEvent) -> None:
         minimizeOnClose = self.settings.value(SettingsKey.MinimizeOnCloseFlag.value)
         if minimizeOnClose is not None:
             minimizeOnClose = str(minimizeOnClose).lower() == 'true'
-        
+
         if minimizeOnClose is None:
             # minimizeOnClose is not set, prompt user
             (toExit, dontAskAgain) = confirm("Exit", "Do you want to exit or minimize to tray?", ("Exit", "Minimize"), True)
@@ -395,18 +876,52 @@ class TCC_GUI(QtWidgets.QWidget):
                 self.settings.setValue(SettingsKey.MinimizeOnCloseFlag.value, minimizeOnClose)
 
         if minimizeOnClose:
-            event.ignore()
-            self.hide()
+            # Tear the window down, only the tray icon and the control loop stay resident
+            event.accept()
+            window, self._window = self._window, None
+            if window is not None:
+                window.deleteLater()
         else:
             self.onExit()
-        return
+
+    def updateGaugeTitles(self, gpuModel, cpuModel):
+        if gpuModel and ThermalBackend.GPUFanIdx < len(self._unitTitles): self._unitTitles[ThermalBackend.GPUFanIdx] = gpuModel
+        if cpuModel and ThermalBackend.CPUFanIdx < len(self._unitTitles): self._unitTitles[ThermalBackend.CPUFanIdx] = cpuModel
+        if self._window is not None:
+            self._window.syncTitles()
+
+    def _profilerReport(self) -> str:
+        heap = self.profiler.heapReport()
+        return self.profiler.summary() + f"\n{self._pipeline.summary()}" + (f"\n{heap}" if heap else '')
+
+    def _tempStatsSummary(self, fanIdx: int) -> str:
+        stats = self._tempStats[fanIdx]
+        if len(stats) == 1:
+            return stats[0].summary(' °C')
+        sensorIds = self._awcc.getFanRelatedSensorIds(fanIdx)
+        return '\n'.join(f"Sensor #{sensorId}{' (shown)' if i == 0 else ''}\n{st.summary(' °C')}" for i, (sensorId, st) in enumerate(zip(sensorIds, stats)))
+
+    def _statsToolTips(self, fanIdx: int) -> Tuple[str, str]:
+        # Control thread (or under `_controlLock`): statistics tooltips of a thermal unit
+        return self._tempStatsSummary(fanIdx), self._rpmStats[fanIdx].summary(' RPM')
+
+    def _trayToolTip(self, snapshot: ThermalSnapshot, peaks: Sequence[Optional[int]], mode: str) -> str:
+        peakWindowMin = self.STATS_WINDOWS_SEC[-1] // 60
+        lines = []
+        for idx in self._unitOrder:
+            peak = peaks[idx] if idx < len(peaks) else None
+            lines.append(f"{self._profiles[idx].name}:    {snapshot.fanTemp(idx)} °C    {snapshot.rpms[idx]} RPM    (peak {peak} °C / {peakWindowMin} min)")
+        lines.append(f"Mode:    {mode.replace('_', ' ')}")
+        return '\n'.join(lines)
 
     # onExit() connected to systray_Exit
     def onExit(self):
         print("exit")
+        # Settings (and the saved thermal state) keep the mode the app was in, not the Balanced set for exit
+        self._stopControl()
         # Set mode to Balanced before exit
-        prevMode = self._modeSwitch.getChecked()
-        self._modeSwitch.setChecked(ThermalMode.Balanced.value)
+        prevMode = self._mode
+        self.setMode(ThermalMode.Balanced.value)
         if prevMode != ThermalMode.Balanced.value:
             self._toasterMessageCurrentMode()
         self._destroy()
@@ -420,126 +935,330 @@ class TCC_GUI(QtWidgets.QWidget):
         if self.gModeHotKey is not None:
             self.gModeHotKey.stop()
             self.gModeHotKey.wait()
-        if self.gModeHotKey is not None:
-            self._updateGaugesTask.stop()
+        self._stopControl()
+        if self._profileLogTask is not None:
+            self._profileLogTask.stop()
+        if self._processScanTask is not None:
+            self._processScanTask.stop()
+        if self._processScanner is not None:
+            self._processScanner.close()
+        if self._tuneTask is not None:
+            self._tuneTask.wait()
+        self._detect.wait()
+        self._notifier.stop()
+        if self._recorder is not None:
+            self._recorder.close()
+        if self._burstCapture is not None:
+            self._burstCapture.close()
+        if self._publisher is not None:
+            self._publisher.close()
         print('Cleanup: done')
 
+    def _stopControl(self) -> None:
+        # Stop the control thread and drain the pipeline (nothing is lost on exit)
+        if self._updateGaugesTask is not None:
+            self._updateGaugesTask.stop()
+        self._pipeline.close()
+
+    def _defer(self, fn: Callable[[], None], delayMs: int) -> None:
+        # GUI thread: runs a deferred pipeline stage from the event loop
+        QtCore.QTimer.singleShot(delayMs, self, fn)
+
     def _onGModeHotKeyPressed(self):
-        current = self._modeSwitch.getChecked()
-        if current == ThermalMode.G_Mode.value:
-            self._modeSwitch.setChecked(self._gModeKeyPrevModeStr or ThermalMode.Balanced.value)
-        else:
-            self._gModeKeyPrevModeStr = current
-            self._modeSwitch.setChecked(ThermalMode.G_Mode.value)
+        with self._controlLock:
+            current = self._mode
+            if current == ThermalMode.G_Mode.value:
+                self.setMode(self._gModeKeyPrevModeStr or ThermalMode.Balanced.value)
+            else:
+                self._gModeKeyPrevModeStr = current
+                self.setMode(ThermalMode.G_Mode.value)
         self._toasterMessageCurrentMode()
 
-    def _toasterMessageCurrentMode(self, source: Optional[Literal['failsafe']] = None) -> None:
-        sourceStr = f" [Fail-safe]" if source == 'failsafe' else ""
+    def _onProcessScan(self) -> None:
+        scanner, matcher = self._processScanner, self._processRuleMatcher
+        if scanner is None or matcher is None:
+            return
+        scanner.scan()
+        if matcher.update(scanner.running):
+            with self._controlLock:
+                self._applyProcessRule(matcher.active)
+
+    def _processRuleState(self) -> Tuple[str, List[int]]:
+        # Mode (the one a tripped fail-safe returns to) and fan speeds
+        mode = self._failsafeTrippedPrevModeStr if self._failsafeTrippedPrevModeStr is not None else self._mode
+        return (mode, list(self._fanSpeeds))
+
+    def _applyProcessRule(self, rule: Optional[ProcessRule]) -> None:
+        # Applied the same way as a mode switch from the main window or the tray menu
+        userChanged = self._processRuleAppliedState is not None and self._processRuleState() != self._processRuleAppliedState
+        if rule is not None:
+            if self._processRulePrevState is None or userChanged: # The user's choice is what to return to
+                self._processRulePrevState = self._processRuleState()
+            mode = rule.mode
+            speedMax = self.FAN_SPEED_SLIDER_MAX_AND_TICK[0]
+            for idx, profile in enumerate(self._profiles):
+                speed = rule.fanSpeeds.get(profile.name.lower())
+                if speed is not None:
+                    self.setFanSpeed(idx, max(0, min(speed, speedMax)))
+            print(f'Process rule: {rule.exe} -> {mode}')
+        elif self._processRulePrevState is not None:
+            mode, speeds = self._processRulePrevState
+            self._processRulePrevState = None
+            self._processRuleAppliedState = None
+            if userChanged:
+                print(f'Process rule: none, keeping {self._processRuleState()[0]} set by the user')
+                return
+            for idx, speed in enumerate(speeds):
+                self.setFanSpeed(idx, speed)
+            print(f'Process rule: none -> {mode}')
+        else:
+            return
+        if self._failsafeTrippedPrevModeStr is not None:
+            # Fail-safe keeps G-mode, the rule's mode is applied when it resets
+            self._failsafeTrippedPrevModeStr = mode
+        else:
+            self.setMode(mode)
+        if rule is not None:
+            self._processRuleAppliedState = self._processRuleState()
+        if self._window is not None:
+            self._window.syncSettings()
+        self._toasterMessageCurrentMode('process', rule.exe if rule is not None else None)
+
+    def _toasterMessageCurrentMode(self, source: Optional[Literal['failsafe', 'process']] = None, detail: Optional[str] = None) -> None:
+        sourceStr = " [Fail-safe]" if source == 'failsafe' else f" [Auto: {detail or 'off'}]" if source == 'process' else ""
         self.toasterMessage(
             [
-                self._modeSwitch.getChecked().replace('_', ' '),
-                f"GPU: {self._thermalGPU.getTemp()}°C, CPU: {self._thermalCPU.getTemp()}°C",
+                self._mode.replace('_', ' '),
+                ", ".join(f"{self._profiles[idx].name}: {self._lastSnapshot.fanTemp(idx) if self._lastSnapshot else None}°C" for idx in self._unitOrder),
                 "Thermal mode changed" + sourceStr
             ],
-            source != 'failsafe'
+            source != 'failsafe',
+            kind= 'mode'
         )
 
-    def toasterMessage(self, message: List[str | None], expire = True) -> None:
-        toast = Toast(duration=ToastDuration.Short, expiration_time= (datetime.datetime.now() + datetime.timedelta(seconds=5)) if expire else None)
-        toast.text_fields = message
-        toast.AddImage(ToastDisplayImage.fromPath(resourcePath(GUI_ICON)))
-        self._toaster.show_toast(toast)
+    def toasterMessage(self, message: List[str | None], expire = True, kind: Optional[str] = None) -> None:
+        # Non-blocking, delivered on the notification thread
+        self._notifier.post(Notification(message, expire, kind))
 
     def _saveAppSettings(self):
-        curValues = [
-            self._modeSwitch.getChecked(),
-            self._thermalCPU.getSpeedSlider(),
-            self._thermalGPU.getSpeedSlider(),
-            self.FAILSAFE_CPU_TEMP,
-            self.FAILSAFE_GPU_TEMP,
-            self._failsafeOn
-        ]
+        with self._controlLock:
+            curValues = [
+                self._mode,
+                list(self._fanSpeeds),
+                list(self._failsafeTemps),
+                self._failsafeOn,
+                self.isPredictiveFailsafe()
+            ]
         if curValues == self._prevSavedSettingsValues:
             return
         self._prevSavedSettingsValues = curValues
-
-        self.settings.setValue(SettingsKey.Mode.value, self._modeSwitch.getChecked())
-        self.settings.setValue(SettingsKey.CPUFanSpeed.value, self._thermalCPU.getSpeedSlider())
-        self.settings.setValue(SettingsKey.GPUFanSpeed.value, self._thermalGPU.getSpeedSlider())
-        self.settings.setValue(SettingsKey.CPUThresholdTemp.value, self.FAILSAFE_CPU_TEMP)
-        self.settings.setValue(SettingsKey.GPUThresholdTemp.value, self.FAILSAFE_GPU_TEMP)
-        self.settings.setValue(SettingsKey.FailSafeIsOnFlag.value, self._failsafeOn)
-
-    def _loadAppSettings(self):
+        mode, fanSpeeds, failsafeTemps, failsafeOn, predictive = curValues
+
+        self.settings.setValue(SettingsKey.Mode.value, mode)
+        for idx in range(len(self._profiles)):
+            self.settings.setValue(fanSettingsKey(idx, 'speed'), fanSpeeds[idx])
+            self.settings.setValue(fanSettingsKey(idx, 'threshold_temp'), failsafeTemps[idx])
+        self.settings.setValue(SettingsKey.FailSafeIsOnFlag.value, failsafeOn)
+        self.settings.setValue(SettingsKey.PredictiveFailSafeFlag.value, predictive)
+        if self._statePath:
+            try:
+                saveThermalState(self._statePath, ThermalState(mode, tuple(fanSpeeds)))
+            except OSError as ex:
+                print(f'Thermal state is not saved: {ex}')
+
+    def _savedModeAndFanSpeeds(self) -> Tuple[str, List[int]]:
+        sliderMax = self.FAN_SPEED_SLIDER_MAX_AND_TICK[0]
+        speeds = []
+        for idx in range(len(self._profiles)):
+            savedSpeed = self.settings.value(fanSettingsKey(idx, 'speed'))
+            speeds.append(min(int(savedSpeed), sliderMax) if str(savedSpeed).isdigit() else sliderMax // 2)
         savedMode = self.settings.value(SettingsKey.Mode.value)
         if savedMode not in [m.value for m in ThermalMode]:
             savedMode = ThermalMode.Balanced.value
-        self._modeSwitch.setChecked(savedMode)
-        savedSpeed = self.settings.value(SettingsKey.CPUFanSpeed.value)
-        self._thermalCPU.setSpeedSlider(savedSpeed)
-        savedSpeed = self.settings.value(SettingsKey.GPUFanSpeed.value)
-        self._thermalGPU.setSpeedSlider(savedSpeed)
-        savedTemp = self.settings.value(SettingsKey.CPUThresholdTemp.value) or 95
-        self._limitTempCPU.setCurrentText(str(savedTemp))
-        savedTemp = self.settings.value(SettingsKey.GPUThresholdTemp.value) or 85
-        self._limitTempGPU.setCurrentText(str(savedTemp))
+        return savedMode, speeds
+
+    def _loadAppSettings(self):
+        savedMode, savedSpeeds = self._savedModeAndFanSpeeds()
+        for idx, profile in enumerate(self._profiles):
+            self.setFanSpeed(idx, savedSpeeds[idx])
+            savedTemp = self.settings.value(fanSettingsKey(idx, 'threshold_temp'))
+            self._failsafeTemps[idx] = int(savedTemp) if str(savedTemp).isdigit() and int(savedTemp) in profile.failsafeTempRange else profile.failsafeTemp
+        self._updateRecorderTopology()
         savedFailsafe = self.settings.value(SettingsKey.FailSafeIsOnFlag.value) or 'true'
-        self._failsafeCB.setChecked(str(savedFailsafe).lower() == 'true')
+        self.setFailsafeOn(str(savedFailsafe).lower() == 'true')
+        savedPredictive = self.settings.value(SettingsKey.PredictiveFailSafeFlag.value) or 'false'
+        self.setPredictiveFailsafe(str(savedPredictive).lower() == 'true')
+        self.setMode(savedMode)
+        if self._window is not None:
+            self._window.syncSettings()
 
     def clearAppSettings(self):
         (isYes, _) = confirm("Reset to Default", "Do you want to reset all settings to default?", ("Reset", "Cancel"))
         if not isYes: return
         self.settings.clear()
-        self._loadAppSettings()
+        with self._controlLock:
+            self._loadAppSettings()
+            self._updateFanSpeed()
 
     def G_Mode_key_Pressed(self, val):
         print("G_Mode_key " + str(val))
 
-def runApp(startMinimized = False) -> int:
+class MainWindow(QtWidgets.QWidget):
+    # View of the `TCC_GUI` state. Holds no state of its own, safe to destroy at any time
+
+    _modeSwitch: QRadioButtonSet
+
+    def __init__(self, app: TCC_GUI):
+        super().__init__()
+        self._app = app
+
+        # Set main window props
+        self.setFixedSize(600, 0)
+        self.setWindowFlags(QtCore.Qt.Window | QtCore.Qt.WindowMinimizeButtonHint | QtCore.Qt.WindowCloseButtonHint)
+        self.setWindowIcon(QtGui.QIcon(resourcePath(GUI_ICON)))
+        self.mouseReleaseEvent = lambda evt: (
+            evt.button() == QtCore.Qt.RightButton and
+            alert("About", f"{app.APP_NAME} v{app.APP_VERSION}", message2 = f"{app.APP_DESCRIPTION}\n{app.APP_URL}\n\n{app._profilerReport()}")
+        )
+
+        # Set up GUI
+        self.setObjectName('QMainWindow')
+        self.setWindowTitle(app.APP_NAME)
+
+        profiles = app._profiles
+        self.thermalUnits: list[ThermalUnitWidget] = []
+        for idx, profile in enumerate(profiles):
+            unit = ThermalUnitWidget(self, tempMinMax= profile.tempMinMax, tempColorLimits= profile.tempColorLimits, fanMinMax= app.FAN_RPM_MIN_MAX, sliderMaxAndTick= app.FAN_SPEED_SLIDER_MAX_AND_TICK)
+            unit.speedSliderChanged(lambda idx= idx, unit= unit: app.setFanSpeed(idx, unit.getSpeedSlider()))
+            self.thermalUnits.append(unit)
+        self.syncTitles()
+
+        lTherm = QtWidgets.QGridLayout()
+        for pos, idx in enumerate(app._unitOrder):
+            lTherm.addWidget(self.thermalUnits[idx], pos // 2, pos % 2)
+
+        self._modeSwitch = QRadioButtonSet(None, None, list(map(lambda m: (m.name.replace('_', ' '), m.value), ThermalMode)))
+
+        # Fail-safe indicator
+        self._failsafeIndicator = QtWidgets.QLabel()
+
+        # Fail-safe temp limits
+        self._limitTemps: list[QtWidgets.QComboBox] = []
+        for idx, profile in enumerate(profiles):
+            limitTemp = QtWidgets.QComboBox()
+            limitTemp.addItems(list(map(lambda v: str(v), profile.failsafeTempRange)))
+            limitTemp.setToolTip(f"Threshold {profile.name} temp")
+            self._limitTemps.append(limitTemp)
+
+        # Fail-safe checkbox
+        self._failsafeCB = QtWidgets.QCheckBox("Fail-safe")
+        self._failsafeCB.setToolTip("Switch to G-mode (fans on max) when " + " or ".join(
+            f"{profiles[idx].name} temp reaches {app.getFailsafeTemp(idx)}°C" for idx in app._unitOrder
+        ))
+
+        failsafeBox = QtWidgets.QHBoxLayout()
+        failsafeBox.addWidget(self._failsafeCB)
+        for idx in app._unitOrder:
+            failsafeBox.addWidget(self._limitTemps[idx])
+        failsafeBox.addWidget(self._failsafeIndicator)
+
+        modeBox = QtWidgets.QHBoxLayout()
+        modeBox.addWidget(self._modeSwitch, alignment= QtCore.Qt.AlignLeft)
+        modeBox.addWidget(QtWidgets.QWidget(), alignment= QtCore.Qt.AlignRight) # Insert dummy Widget in order to move the following 'failsafeBox' to the right side
+
+        mainLayout = QtWidgets.QVBoxLayout(self)
+        mainLayout.addLayout(lTherm)
+        mainLayout.addLayout(modeBox)
+        if len(profiles) <= 2:
+            modeBox.addLayout(failsafeBox)
+        else: # Not enough room for all the thresholds next to the mode switch
+            failsafeBox.insertStretch(0)
+            mainLayout.addLayout(failsafeBox)
+        mainLayout.setAlignment(QtCore.Qt.AlignTop)
+        mainLayout.setContentsMargins(10, 0, 10, 0)
+
+        # Take the current state, then glue the controls to the app
+        self.syncSettings()
+        self.syncMode()
+        self.updFailsafeIndicator()
+        self._modeSwitch.setOnChange(app.setMode)
+        for idx, limitTemp in enumerate(self._limitTemps):
+            def onLimitChange(_, idx= idx, limitTemp= limitTemp):
+                val = limitTemp.currentText()
+                if val.isdigit(): app.setFailsafeTemp(idx, int(val))
+            limitTemp.currentIndexChanged.connect(onLimitChange)
+        self._failsafeCB.toggled.connect(lambda: app.setFailsafeOn(self._failsafeCB.isChecked()))
+
+    def syncTitles(self) -> None:
+        for unit, title in zip(self.thermalUnits, self._app._unitTitles):
+            unit.setTitle(title)
+
+    def syncMode(self) -> None:
+        mode = self._app.getMode()
+        if self._modeSwitch.getChecked() != mode:
+            self._modeSwitch.setChecked(mode)
+        for unit in self.thermalUnits:
+            unit.setSpeedDisabled(mode != ThermalMode.Custom.value)
+
+    def syncSettings(self) -> None:
+        app = self._app
+        for idx, unit in enumerate(self.thermalUnits):
+            unit.setSpeedSlider(app.getFanSpeed(idx))
+            self._limitTemps[idx].setCurrentText(str(app.getFailsafeTemp(idx)))
+        self._failsafeCB.setChecked(app.isFailsafeOn())
+
+    def updFailsafeIndicator(self) -> None:
+        color, msg = self._app.failsafeStatus()
+        self._failsafeIndicator.setStyleSheet(f"QLabel {{ min-height: 14px; min-width: 14px; max-height: 14px; max-width: 14px; border: 1px solid {Colors.GREY.value}; border-radius: 7px; background: {color}; }}")
+        self._failsafeIndicator.setToolTip(msg)
+
+    def setGauges(self, temps: List[Optional[int]], rpms: Tuple[Optional[int], ...]) -> None:
+        for unit, temp, rpm in zip(self.thermalUnits, temps, rpms):
+            if temp is not None: unit.setTemp(temp)
+            if rpm is not None: unit.setFanRPM(rpm)
+
+    def closeEvent(self, event):
+        self._app.onWindowClose(event)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self._app.onWindowShown()
+
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == QtCore.QEvent.WindowStateChange and not self.isMinimized():
+            self._app.onWindowShown()
+
+def runApp(startMinimized = False, profileLogPath: Optional[str] = None, profileHeap = False, recordDir: Optional[str] = None, publishName: Optional[str] = None, processRulesPath: Optional[str] = None, burstCaptureDir: Optional[str] = None, burstPostTriggerSec: Optional[float] = None, awcc: Optional[ThermalBackend] = None, restoredState: Optional[ThermalState] = None) -> int:
+    # `awcc`, `restoredState`: backend and thermal state already applied before the GUI was loaded (see tcc-g15.py)
+    if profileHeap:
+        SelfProfiler.startHeapTracing()
     app = QtWidgets.QApplication([])
+    # The main window is destroyed when closed to tray, the app lives in the tray icon
+    app.setQuitOnLastWindowClosed(False)
 
     # Setup backend
     try:
-        awcc = AWCCThermal()
+        awcc = awcc or (HwmonThermal() if sys.platform.startswith('linux') else AWCCThermal())
+    except NoHwmonDevice:
+        errorExit("No supported fan controller found in /sys/class/hwmon.", "The alienware-wmi or dell-smm-hwmon kernel driver is required.")
     except NoAWCCWMIClass:
         errorExit("AWCC WMI class not found in the system.", "You don't have some drivers installed or your system is not supported.")
     except CannotInstAWCCWMI:
         errorExit("Couldn't instantiate AWCC WMI class.", "Make sure you're running as Admin.")
 
-    mainWindow = TCC_GUI(awcc)
-    mainWindow.setStyleSheet(f"""
-        QGauge {{
-            border: 1px solid gray;
-            border-radius: 3px;
-            background-color: {Colors.GREY.value};
-        }}
-        QGauge::chunk {{
-            background-color: {Colors.BLUE.value};
-        }}
-        * {{
-            color: {Colors.WHITE.value};
-            background-color: {Colors.DARK_GREY.value};
-        }}
-        QToolTip {{
-            background-color: black; 
-            color: {Colors.WHITE.value};
-            border: 1px solid {Colors.DARK_GREY.value};
-            border-radius: 3;
-        }}
-        QComboBox {{
-            border: 1px solid gray;
-            border-radius: 3px;
-            padding: 1px 0.6em 1px 3px;
-        }}
-        QComboBox::disabled {{
-            color: {Colors.GREY.value};
-        }}
-    """)
-
-    if startMinimized:
-        mainWindow.showMinimized()
-        mainWindow.hide()
-    else:
-        mainWindow.show()
+    processRules = None
+    if processRulesPath:
+        try:
+            processRules = loadProcessRules(processRulesPath, [ m.value for m in ThermalMode ])
+        except (OSError, ValueError) as ex:
+            print(f'Process rules are not loaded: {ex}')
+            alert("Process rules", "Failed to load the process rules, automatic profiles are off.", QtWidgets.QMessageBox.Icon.Warning, message2= str(ex))
+
+    tcc = TCC_GUI(awcc, profileLogPath= profileLogPath, recordDir= recordDir, publishName= publishName, processRules= processRules, burstCaptureDir= burstCaptureDir, burstPostTriggerSec= burstPostTriggerSec, statePath= defaultThermalStatePath(), restoredState= restoredState)
+
+    # When started minimized, only the tray icon, its menu and the control loop are created
+    if not startMinimized:
+        tcc.showWindow()
 
-    return app.exec()
\ No newline at end of file
+    return app.exec()
@@ -0,0 +1,109 @@
+import sys, time, datetime, threading
+from collections import deque
+from typing import Deque, List, NamedTuple, Optional
+
+class Notification(NamedTuple):
+    lines: List[Optional[str]]
+    expire: bool = True
+    kind: Optional[str] = None      # Queued notifications of the same kind are superseded by the newest one
+
+class NotificationSink:
+    # Interface. `show()` is called on the dispatcher thread and may block
+    def show(self, notification: Notification) -> None:
+        raise NotImplementedError()
+
+class WindowsToastSink(NotificationSink):
+    def __init__(self, appName: str, iconPath: str) -> None:
+        from windows_toasts import WindowsToaster, Toast, ToastDuration, ToastDisplayImage
+        self._Toast = Toast
+        self._ToastDuration = ToastDuration
+        self._toaster = WindowsToaster(appName)
+        self._image = ToastDisplayImage.fromPath(iconPath) # Prepared once
+
+    def show(self, notification: Notification) -> None:
+        toast = self._Toast(
+            duration= self._ToastDuration.Short,
+            expiration_time= (datetime.datetime.now() + datetime.timedelta(seconds=5)) if notification.expire else None
+        )
+        toast.text_fields = notification.lines
+        toast.AddImage(self._image)
+        self._toaster.show_toast(toast)
+
+class PrintSink(NotificationSink):
+    # Fallback for systems without toast notifications
+    def show(self, notification: Notification) -> None:
+        print('Notification: ' + ' | '.join(line for line in notification.lines if line))
+
+class RecordingSink(NotificationSink):
+    # For tests and benchmarks: records (perf_counter timestamp, notification), optionally simulating a slow sink
+    def __init__(self, delaySec: float = 0.0) -> None:
+        self.delaySec = delaySec
+        self.shown: List[tuple[float, Notification]] = []
+
+    def show(self, notification: Notification) -> None:
+        if self.delaySec > 0:
+            time.sleep(self.delaySec)
+        self.shown.append((time.perf_counter(), notification))
+
+def makeNotificationSink(appName: str, iconPath: str) -> NotificationSink:
+    if sys.platform == 'win32':
+        try:
+            return WindowsToastSink(appName, iconPath)
+        except Exception as ex:
+            print(f'Toast notifications are not available: {ex}')
+    return PrintSink()
+
+class NotificationDispatcher:
+    # Delivers notifications on a background thread, so the caller (GUI thread) never blocks on the sink.
+    # The queue is bounded: the oldest notification is dropped on overflow, and a queued notification
+    # is replaced by a newer one of the same `kind` (e.g. a burst of mode changes results in one toast).
+
+    def __init__(self, sink: NotificationSink, maxQueue: int = 4) -> None:
+        self._sink = sink
+        self._queue: Deque[Notification] = deque()
+        self._maxQueue = maxQueue
+        self._cv = threading.Condition()
+        self._stopping = False
+        self.posted = 0
+        self.delivered = 0
+        self.dropped = 0
+        self._thread = threading.Thread(target=self._run, name='NotificationDispatcher', daemon=True)
+        self._thread.start()
+
+    def post(self, notification: Notification) -> None:
+        with self._cv:
+            if self._stopping:
+                return
+            self.posted += 1
+            if notification.kind is not None:
+                for idx, queued in enumerate(self._queue):
+                    if queued.kind == notification.kind:
+                        del self._queue[idx]
+                        self.dropped += 1
+                        break
+            if len(self._queue) >= self._maxQueue:
+                self._queue.popleft()
+                self.dropped += 1
+            self._queue.append(notification)
+            self._cv.notify()
+
+    def stop(self, timeoutSec: float = 2.0) -> None:
+        # Deliver what is queued (within the timeout) and stop the thread
+        with self._cv:
+            self._stopping = True
+            self._cv.notify()
+        self._thread.join(timeoutSec)
+
+    def _run(self) -> None:
+        while True:
+            with self._cv:
+                while not self._queue and not self._stopping:
+                    self._cv.wait()
+                if not self._queue:
+                    return
+                notification = self._queue.popleft()
+            try:
+                self._sink.show(notification)
+                self.delivered += 1
+            except Exception as ex:
+                print(f'Notification failed: {ex}')
@@ -1,9 +1,13 @@
-from typing import Tuple, Optional
+from typing import Sequence, Tuple, Optional
 from PySide6 import QtCore, QtGui, QtWidgets
 from GUI.AppColors import Colors
 
 class QGaugeTrayIcon(QtGui.QPixmap):
-    def __init__(self, tempColorLimits: Optional[Tuple[Tuple[int,int], Tuple[int,int]]]) -> None:
+    # Draws one row per temperature, top to bottom. A tray icon is too small for more than MAX_ROWS readable
+    # rows: with more temperatures only the MAX_ROWS hottest are drawn, in their order (the tray tooltip lists all)
+    MAX_ROWS = 2
+
+    def __init__(self, tempColorLimits: Optional[Sequence[Tuple[int,int]]]) -> None:
         self._SIZE = QGaugeTrayIcon._bestTrayIconSize()
         super().__init__(*self._SIZE)
         self.fill(QtCore.Qt.transparent)
@@ -14,13 +18,20 @@ class QGaugeTrayIcon(QtGui.QPixmap):
             return None
         return QGaugeTrayIcon(self._tempColorLimits)
 
-    def update(self, temps: Tuple[int, int], stars: bool = False) -> None:
+    def update(self, temps: Sequence[Optional[int]], stars: bool = False) -> None:
         self.fill(QtCore.Qt.transparent)
         painter = QtGui.QPainter(self)
-        font = QtGui.QFont("Consolas", self._SIZE[1] // 2)
+        shown = range(len(temps))
+        if len(temps) > self.MAX_ROWS:
+            hottest = sorted(shown, key= lambda idx: -1 if temps[idx] is None else temps[idx], reverse= True)[:self.MAX_ROWS]
+            shown = sorted(hottest)
+        rows = max(1, len(shown))
+        font = QtGui.QFont("Consolas", max(1, self._SIZE[1] // rows))
         painter.setFont(font)
 
-        def drawVal(y: int, val: int, limits: Optional[Tuple[int,int]]):
+        def drawVal(y: int, val: Optional[int], limits: Optional[Tuple[int,int]]):
+            if val is None:
+                return
             color = Colors.GREEN
             if limits:
                 if val >= limits[1]: color = Colors.RED
@@ -29,8 +40,10 @@ class QGaugeTrayIcon(QtGui.QPixmap):
             x = 2 if val < 100 else -1
             painter.drawText(x, y, str(val))
 
-        drawVal(self._SIZE[1] // 2 - 1, temps[0], self._tempColorLimits[0] if self._tempColorLimits else None)
-        drawVal(self._SIZE[1], temps[1], self._tempColorLimits[1] if self._tempColorLimits else None)
+        for row, idx in enumerate(shown):
+            y = self._SIZE[1] * (row + 1) // rows - (1 if row + 1 < rows else 0)
+            limits = self._tempColorLimits[idx] if self._tempColorLimits and idx < len(self._tempColorLimits) else None
+            drawVal(y, temps[idx], limits)
 
         if stars:
             painter.setPen(QtGui.QColor.fromRgb(*Colors.WHITE.rgb()))
@@ -5,10 +5,12 @@ class QRadioButtonSet(QtWidgets.QWidget):
     _buttons: dict[str, QtWidgets.QRadioButton]
     _userCallback: Optional[Callable[[str], None]]
 
-    def __init__(self, parent: Optional[QtWidgets.QWidget], title: Optional[str], options: list[Tuple[str, str]], layout: Union[QtWidgets.QHBoxLayout, QtWidgets.QVBoxLayout] = QtWidgets.QHBoxLayout()) -> None:
+    def __init__(self, parent: Optional[QtWidgets.QWidget], title: Optional[str], options: list[Tuple[str, str]], layout: Optional[Union[QtWidgets.QHBoxLayout, QtWidgets.QVBoxLayout]] = None) -> None:
         super().__init__(parent)
         if len(options) == 0:
             raise RuntimeError('"options" list length can not be 0')
+        if layout is None:
+            layout = QtWidgets.QHBoxLayout()
 
         self.setLayout(layout)
 
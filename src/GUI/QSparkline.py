@@ -0,0 +1,136 @@
+from collections import deque
+from typing import Deque, Iterable, Optional, Sequence, Tuple
+from PySide6 import QtCore, QtGui, QtWidgets
+from GUI.AppColors import Colors
+
+class QSparkline(QtWidgets.QWidget):
+    # Scrolling history graph.
+    # The backing pixmap is a ring buffer of columns: each new sample paints only the newest column at a moving
+    # write position, nothing is scrolled or copied. `paintEvent` draws the ring unrolled, in two blits
+    # (from the write position to the end, then from the start to the write position).
+    # Adding a sample costs the same for any width; showing it is one copy of the visible area.
+    # While the widget (or its window) is hidden/minimized, samples are only queued,
+    # and the pixmap is rebuilt once when it is shown again.
+
+    class Series:
+        def __init__(self, minMax: Tuple[int, int], color: str, colorScheme: Optional[dict[int, str]] = None) -> None:
+            self.minMax = minMax
+            self.color = color
+            self.colorScheme = colorScheme
+            self._pens: dict[str, QtGui.QPen] = {}
+
+        def pen(self, value: int) -> QtGui.QPen:
+            color = self.color
+            if self.colorScheme:
+                for lim, c in self.colorScheme.items():
+                    color = c
+                    if value < lim: break
+            pen = self._pens.get(color)
+            if pen is None:
+                pen = self._pens[color] = QtGui.QPen(QtGui.QColor(color), 1)
+            return pen
+
+    def __init__(self, parent: Optional[QtWidgets.QWidget], series: Sequence["QSparkline.Series"], height: int = 40, step: int = 2) -> None:
+        super().__init__(parent)
+        self._series = tuple(series)
+        self._step = step
+        self._background = QtGui.QColor(Colors.DARK_GREY.value)
+        self._grid = QtGui.QPen(QtGui.QColor(Colors.GREY.value), 1, QtCore.Qt.DotLine)
+        self._history: Deque[Tuple[Optional[int], ...]] = deque(maxlen=4096) # Trimmed to the widget width on resize
+        self._pixmap = QtGui.QPixmap(1, 1)
+        self._head = 0  # Pixmap x of the next column; the oldest column starts here
+        self._dirty = True
+        self.setFixedHeight(height)
+        self.setSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Fixed)
+        self.setAttribute(QtCore.Qt.WA_OpaquePaintEvent)
+
+    def addSample(self, values: Sequence[Optional[int]]) -> None:
+        sample = tuple(values)
+        prev = self._history[-1] if self._history else None
+        self._history.append(sample)
+        if not self._isShown():
+            self._dirty = True
+            return
+        if self._dirty:
+            self._rebuild()
+            self.update()
+            return
+        painter = QtGui.QPainter(self._pixmap)
+        self._paintColumn(painter, self._head, prev, sample)
+        painter.end()
+        self._head = (self._head + self._step) % self._pixmap.width()
+        self.update()
+
+    def setHistory(self, samples: Iterable[Sequence[Optional[int]]]) -> None:
+        self._history.clear()
+        self._history.extend(tuple(sample) for sample in samples)
+        self._dirty = True
+        self.update()
+
+    def clear(self) -> None:
+        self._history.clear()
+        self._dirty = True
+        self.update()
+
+    def _isShown(self) -> bool:
+        return self.isVisible() and not self.window().isMinimized()
+
+    def _y(self, series: "QSparkline.Series", value: int) -> int:
+        lo, hi = series.minMax
+        h = self._pixmap.height() - 1
+        frac = (min(max(value, lo), hi) - lo) / (hi - lo) if hi > lo else 0
+        return h - int(frac * h)
+
+    def _paintColumn(self, painter: QtGui.QPainter, x: int, prev: Optional[Tuple[Optional[int], ...]], cur: Tuple[Optional[int], ...]) -> None:
+        h = self._pixmap.height()
+        painter.fillRect(x, 0, self._step, h, self._background)
+        painter.setPen(self._grid)
+        painter.drawPoint(x, h // 2)
+        for idx, series in enumerate(self._series):
+            val = cur[idx] if idx < len(cur) else None
+            if val is None: continue
+            pval = prev[idx] if prev is not None and idx < len(prev) else None
+            y = self._y(series, val)
+            painter.setPen(series.pen(val))
+            painter.drawLine(x - 1, self._y(series, pval) if pval is not None else y, x + self._step - 1, y)
+
+    def _rebuild(self) -> None:
+        # Full redraw, only on resize and when becoming visible
+        self._dirty = False
+        self._head = 0
+        self._pixmap.fill(self._background)
+        painter = QtGui.QPainter(self._pixmap)
+        w = self._pixmap.width()
+        x = w - len(self._history) * self._step
+        prev = None
+        for sample in self._history:
+            if x > -self._step:
+                self._paintColumn(painter, x, prev, sample)
+            prev = sample
+            x += self._step
+        painter.end()
+
+    def resizeEvent(self, event: QtGui.QResizeEvent) -> None:
+        size = event.size()
+        # Whole columns, so that the write position wraps around to 0
+        columns = max(1, -(-size.width() // self._step))
+        self._pixmap = QtGui.QPixmap(columns * self._step, max(1, size.height()))
+        self._history = deque(self._history, maxlen= size.width() // self._step + 1)
+        self._dirty = True
+        super().resizeEvent(event)
+
+    def showEvent(self, event: QtGui.QShowEvent) -> None:
+        self._dirty = True
+        super().showEvent(event)
+
+    def paintEvent(self, event: QtGui.QPaintEvent) -> None:
+        if self._dirty:
+            self._rebuild()
+        # Unrolled ring, aligned so that the newest column ends at the right edge
+        pw, ph, head = self._pixmap.width(), self._pixmap.height(), self._head
+        left = self.width() - pw
+        painter = QtGui.QPainter(self)
+        painter.drawPixmap(QtCore.QPoint(left, 0), self._pixmap, QtCore.QRect(head, 0, pw - head, ph))
+        if head:
+            painter.drawPixmap(QtCore.QPoint(left + pw - head, 0), self._pixmap, QtCore.QRect(0, 0, head, ph))
+        painter.end()
@@ -1,6 +1,7 @@
-from typing import Callable, Optional, Tuple
+from typing import Callable, Iterable, Optional, Tuple
 from PySide6 import QtCore, QtWidgets
 from GUI.QGauge import QGauge
+from GUI.QSparkline import QSparkline
 from GUI.AppColors import Colors
 
 class ThermalUnitWidget(QtWidgets.QWidget):
@@ -14,9 +15,15 @@ class ThermalUnitWidget(QtWidgets.QWidget):
         self._subTitle.setTextInteractionFlags(QtCore.Qt.TextSelectableByMouse)
         self._subTitle.setToolTip("Triple left-click and Crtl+C to copy")
 
-        self._tempBar, _tempBarLabel = self._makeGaugeWithLabel(tempMinMax, ' °C', tempColorLimits)
+        self._tempBar, self._tempBarLabel = self._makeGaugeWithLabel(tempMinMax, ' °C', tempColorLimits)
 
-        self._fanBar, _fanBarLabel = self._makeGaugeWithLabel(fanMinMax, ' RPM')
+        self._fanBar, self._fanBarLabel = self._makeGaugeWithLabel(fanMinMax, ' RPM')
+
+        self._history = QSparkline(self, [
+            QSparkline.Series(tempMinMax, Colors.GREEN.value, self._makeColorScheme(tempMinMax, tempColorLimits) if tempColorLimits else None),
+            QSparkline.Series(fanMinMax, Colors.BLUE.value)
+        ])
+        self._history.setToolTip("Temperature and fan RPM history")
 
         self._speedSliderCallback = None
         self._speedSlider = QtWidgets.QSlider(QtCore.Qt.Orientation.Horizontal, self)
@@ -24,7 +31,7 @@ class ThermalUnitWidget(QtWidgets.QWidget):
         self._speedSlider.setTickInterval(sliderMaxAndTick[1])
         self._speedSlider.setTickPosition(QtWidgets.QSlider.TicksBelow)
         _speedSliderLabel = QtWidgets.QLabel("Fan Speed")
-        self._speedSliderDebounce = QtCore.QTimer()
+        self._speedSliderDebounce = QtCore.QTimer(self)
         self._speedSliderDebounce.setInterval(500)
         self._speedSliderDebounce.setSingleShot(True)
         self._speedSliderDebounce.timeout.connect(self._onSpeedSliderChange)
@@ -34,11 +41,12 @@ class ThermalUnitWidget(QtWidgets.QWidget):
         grid.addWidget(self._title,         0, 0, QtCore.Qt.AlignCenter)
         grid.addWidget(self._subTitle,      1, 0, 1, 2, QtCore.Qt.AlignLeft)
         grid.addWidget(self._tempBar,       2, 0, QtCore.Qt.AlignTop)
-        grid.addWidget(_tempBarLabel,       2, 1, QtCore.Qt.AlignLeft)
+        grid.addWidget(self._tempBarLabel,  2, 1, QtCore.Qt.AlignLeft)
         grid.addWidget(self._fanBar,        3, 0, QtCore.Qt.AlignTop)
-        grid.addWidget(_fanBarLabel,        3, 1, QtCore.Qt.AlignLeft)
+        grid.addWidget(self._fanBarLabel,   3, 1, QtCore.Qt.AlignLeft)
         grid.addWidget(self._speedSlider,   4, 0, QtCore.Qt.AlignTop)
         grid.addWidget(_speedSliderLabel,   4, 1, QtCore.Qt.AlignLeft)
+        grid.addWidget(self._history,       5, 0, 1, 2)
         grid.setColumnStretch(0, 1)
         grid.setColumnStretch(1, 0)
         self.setLayout(grid)
@@ -49,10 +57,14 @@ class ThermalUnitWidget(QtWidgets.QWidget):
         g.setMinimum(minMax[0])
         g.setMaximum(minMax[1])
         if colorLimits:
-            g.setColorScheme({colorLimits[0]: Colors.GREEN.value, colorLimits[1]: Colors.YELLOW.value, minMax[1]: Colors.RED.value})
+            g.setColorScheme(self._makeColorScheme(minMax, colorLimits))
         g.setFormat(f'%v{units}')
         return (g, g.createLabel())
     
+    @staticmethod
+    def _makeColorScheme(minMax: Tuple[int,int], colorLimits: Tuple[int,int]) -> dict[int, str]:
+        return {colorLimits[0]: Colors.GREEN.value, colorLimits[1]: Colors.YELLOW.value, minMax[1]: Colors.RED.value}
+
     def setTitle(self, title: str) -> None:
         if len(title) < 10:
             self._title.setText(title)
@@ -72,6 +84,18 @@ class ThermalUnitWidget(QtWidgets.QWidget):
     def setFanRPM(self, rpm: int) -> None:
         self._fanBar.setValue(rpm)
 
+    def addHistorySample(self, temp: Optional[int], rpm: Optional[int]) -> None:
+        self._history.addSample((temp, rpm))
+
+    def setHistory(self, samples: Iterable[Tuple[Optional[int], Optional[int]]]) -> None:
+        self._history.setHistory(samples)
+
+    def setStatsToolTips(self, tempStats: str, fanStats: str) -> None:
+        self._tempBar.setToolTip(tempStats)
+        self._tempBarLabel.setToolTip(tempStats)
+        self._fanBar.setToolTip(fanStats)
+        self._fanBarLabel.setToolTip(fanStats)
+
     def speedSliderChanged(self, callback: Callable) -> None:
         self._speedSliderCallback = callback
 
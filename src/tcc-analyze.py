@@ -0,0 +1,64 @@
+# (c) github.com/AlexIII
+# GPLv3
+
+# Offline analysis of the telemetry recorded with `tcc-g15 --record=<dir>`.
+# Prints a JSON report per laptop (host + topology):
+#   python src/tcc-analyze.py <dir or file>... [--out report.json]
+# With --tune the report also has the fitted thermal model of every sensor and the lowest Custom mode
+# fan speeds that keep the temperatures under the targets:
+#   python src/tcc-analyze.py <dir> --tune CPU=85 --tune GPU=75
+# Burst captures (`tcc-g15 --burst-capture=<dir>`, *.tccb) found among the paths are summarized under "bursts".
+
+import sys, json, time, argparse
+from Backend.TelemetryAnalysis import loadRecordings, analyze, loadBursts, summarizeBurst
+from Backend.ThermalModelFit import fitSensorModels, suggestFanSpeeds
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Analyze recorded TCC telemetry")
+    parser.add_argument("paths", nargs="+", help="Telemetry files or directories")
+    parser.add_argument("--out", help="Write the JSON report to this file instead of stdout")
+    parser.add_argument("--max-gap", type=float, default=10, help="Gaps between samples longer than this (sec) are not counted")
+    parser.add_argument("--rpm-max", type=int, default=5500, help="RPM that corresponds to 100%% duty cycle")
+    parser.add_argument("--temp-bin", type=int, default=5, help="Temperature bin width (°C) of the RPM vs temperature curves")
+    parser.add_argument("--duty-bins", type=int, default=10, help="Number of duty cycle bins")
+    parser.add_argument("--tune", action="append", default=[], metavar="FAN=TEMP", help="Fit the thermal model and suggest fan speeds for this target temperature (°C), repeatable")
+    parser.add_argument("--load-quantile", type=float, default=0.99, help="Workload to tune for, as a quantile of the recorded heat input")
+    args = parser.parse_args()
+
+    targets = {}
+    for item in args.tune:
+        name, _, temp = item.partition("=")
+        try:
+            targets[name] = float(temp)
+        except ValueError:
+            parser.error(f"--tune: expected FAN=TEMP, got {item!r}")
+
+    t0 = time.perf_counter()
+    try:
+        recordings = loadRecordings(args.paths)
+        bursts = loadBursts(args.paths)
+    except (OSError, ValueError) as ex:
+        print(f'Error: {ex}', file=sys.stderr)
+        return 2
+    reports = []
+    for header, rec, thresholds in recordings:
+        report = analyze(header, rec, thresholds, args.max_gap, args.rpm_max, args.temp_bin, args.duty_bins)
+        if targets:
+            models = fitSensorModels(header, rec, maxGapSec= args.max_gap)
+            report['thermalModel'] = [ m.summary() if m is not None else None for m in models ]
+            report['fanSpeeds'] = suggestFanSpeeds(header, rec, models, targets, args.load_quantile)
+        reports.append(report)
+    result = { 'elapsedSec': round(time.perf_counter() - t0, 3), 'recordings': reports }
+    if bursts:
+        result['bursts'] = [ dict(file= path, **summarizeBurst(header, rec)) for path, header, rec in bursts ]
+
+    text = json.dumps(result, indent=2)
+    if args.out:
+        with open(args.out, 'w') as f:
+            f.write(text)
+    else:
+        print(text)
+    return 0 if reports or bursts else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,7 +2,10 @@
 # GPLv3
 
 import sys
-from GUI.AppGUI import runApp, errorExit
+from typing import Optional, Tuple
+from Backend.ThermalBackend import ThermalBackend
+from Backend.ThermalState import ThermalState, defaultThermalStatePath, loadThermalState, applyThermalState
+# GUI (Qt) is imported only after the last thermal state is restored, see restoreThermalState()
 # from pyuac import main_requires_admin
 
 def createAppLockFile():
@@ -18,17 +21,66 @@ def createAppLockFile():
     if os.path.exists(lockfile):
         os.unlink(lockfile)
     os.open(lockfile, os.O_CREAT | os.O_EXCL | os.O_RDWR)
-        
+
+def restoreThermalState() -> Tuple[Optional[ThermalBackend], Optional[ThermalState]]:
+    # Fast path: apply the last saved mode and fan speeds before Qt and the GUI are loaded, so at logon the fans
+    # do not stay in the BIOS default for the whole GUI start-up. The GUI then adopts the backend and the state.
+    # Any failure is left to the GUI start-up to report: (None, None)
+    state = loadThermalState(defaultThermalStatePath())
+    if state is None:
+        return None, None
+    try:
+        if sys.platform.startswith('linux'):
+            from Backend.HwmonThermal import HwmonThermal
+            backend = HwmonThermal()
+        else:
+            from Backend.AWCCThermal import AWCCThermal
+            backend = AWCCThermal()
+    except Exception as ex:
+        print(f'Fast restore: no backend ({ex})')
+        return None, None
+    if not applyThermalState(backend, state):
+        print(f'Fast restore: failed to apply {state}')
+        return backend, None
+    print(f'Fast restore: {state.mode} {list(state.fanSpeeds)}')
+    return backend, state
+
 
 # @main_requires_admin
 def main():
     try:
         createAppLockFile()
     except:
+        from GUI.AppGUI import errorExit
         errorExit("Another instance of this app is already running")
         return 1
+    awcc, restoredState = restoreThermalState()
+    from GUI.AppGUI import TCC_GUI, runApp, errorExit
+    from Backend.SnapshotPublisher import DEFAULT_NAME as DEFAULT_SNAPSHOT_NAME
     startMinimized = "--minimized" in sys.argv
-    return runApp(startMinimized)
+    # Self-overhead profiling for soak tests: --profile-log=<file> [--profile-heap]
+    profileLogPath = next((arg.split("=", 1)[1] for arg in sys.argv if arg.startswith("--profile-log=")), None)
+    profileHeap = "--profile-heap" in sys.argv
+    # Telemetry recording for the offline analysis (tcc-analyze.py): --record=<dir>
+    recordDir = next((arg.split("=", 1)[1] for arg in sys.argv if arg.startswith("--record=")), None)
+    # Shared memory snapshots for external readers: --publish-snapshots[=<segment name>]
+    publishName = next((arg.split("=", 1)[1] if "=" in arg else DEFAULT_SNAPSHOT_NAME for arg in sys.argv if arg.startswith("--publish-snapshots")), None)
+    # Per-process thermal profiles: --process-rules=<rules.json> (see Backend/ProcessRules.py for the format)
+    processRulesPath = next((arg.split("=", 1)[1] for arg in sys.argv if arg.startswith("--process-rules=")), None)
+    # Burst capture around fail-safe events: --burst-capture=<dir> [--burst-post-sec=<seconds after the trigger>]
+    burstCaptureDir = next((arg.split("=", 1)[1] for arg in sys.argv if arg.startswith("--burst-capture=")), None)
+    burstPostSec = next((arg.split("=", 1)[1] for arg in sys.argv if arg.startswith("--burst-post-sec=")), None)
+    burstPostTriggerSec = None
+    if burstPostSec:
+        try:
+            burstPostTriggerSec = float(burstPostSec)
+        except ValueError:
+            pass
+        # Longer than the whole capture may last makes no sense (NaN and inf are rejected as well)
+        if burstPostTriggerSec is None or not 0 < burstPostTriggerSec <= TCC_GUI.BURST_MAX_SEC:
+            errorExit(f"Invalid --burst-post-sec value, expected 0 < seconds <= {TCC_GUI.BURST_MAX_SEC}", burstPostSec)
+            return 1
+    return runApp(startMinimized, profileLogPath, profileHeap, recordDir, publishName, processRulesPath, burstCaptureDir, burstPostTriggerSec, awcc, restoredState)
 
 if __name__ == "__main__":
     print("Starting")